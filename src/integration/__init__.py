@@ -1,4 +1,12 @@
-from .predictor import IntegrationPredictor
-from .target import IntegrationTarget
+from .lazy import lazy_exports
 
-__all__ = ['IntegrationPredictor', 'IntegrationTarget']
+# Модули загружаются при первом обращении к имени - см. lazy_exports
+_EXPORTS = {
+    'IntegrationPredictor': '.predictor',
+    'IntegrationTarget': '.target',
+    'ComponentRegistry': '.registry',
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,15 +1,31 @@
-from .smart_agent import IntegrationSmartAgent
-from .rules import Action, decide_resource_allocation
-from .resource_manager import ResourceManager, Resource
-from .ml_predictor import MLPredictor
-from .historical_db import HistoricalDatabase
+from ..lazy import lazy_exports
 
-__all__ = [
-    'IntegrationSmartAgent',
-    'Action',
-    'decide_resource_allocation',
-    'ResourceManager',
-    'Resource',
-    'MLPredictor',
-    'HistoricalDatabase'
-]
+# Модули загружаются при первом обращении к имени - см. lazy_exports
+_EXPORTS = {
+    'IntegrationSmartAgent': '.smart_agent',
+    'Action': '.rules',
+    'decide_resource_allocation': '.rules',
+    'ResourceManager': '.resource_manager',
+    'Resource': '.resource_pool',
+    'ResourcePool': '.resource_pool',
+    'Reservation': '.resource_pool',
+    'ReservationError': '.resource_pool',
+    'AllocationSolver': '.allocation',
+    'AllocationPlan': '.allocation',
+    'StepDemand': '.allocation',
+    'ScheduleSimulator': '.schedule_simulator',
+    'PortfolioSchedule': '.schedule_simulator',
+    'MLPredictor': '.ml_predictor',
+    'FeatureSchema': '.features',
+    'HistoricalDatabase': '.historical_db',
+    'PortfolioRunner': '.portfolio_runner',
+    'ModelStore': '.model_store',
+    'ModelArtifact': '.model_store',
+    'IncrementalTrainer': '.incremental_trainer',
+    'AsyncIntegrationAgent': '.async_agent',
+    'PredictionBatcher': '.micro_batcher',
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,73 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+import copy
+from ..utils.context import RequestContext
+
+_MISSING = object()
+
+
+def snapshot_inputs(source_data: Dict) -> Dict[str, Any]:
+    # Копия входных полей: characteristics и каждое поле current_progress отдельно
+    inputs = {'characteristics': copy.deepcopy(source_data.get('characteristics'))}
+    for field, value in source_data['current_progress'].items():
+        inputs[field] = copy.deepcopy(value)
+    return inputs
+
+
+@dataclass
+class CachedAnalysis:
+    # Результат прошлого запуска цепочки по интеграции
+    inputs: Dict[str, Any]
+    # Состояние моделей на момент запуска - при его смене кэш недействителен
+    state: Tuple
+    outputs: Dict[str, Any]
+    context: RequestContext
+
+
+class AnalysisCache:
+    """Прошлые результаты цепочки обработчиков по интеграциям (LRU).
+
+    ``lookup`` возвращает прошлый результат и набор изменившихся входных
+    полей - по нему агент перезапускает только зависящие от них обработчики.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, CachedAnalysis]' = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: Hashable, inputs: Dict[str, Any],
+               state: Tuple) -> Tuple[Optional[CachedAnalysis], Set[str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None or len(entry.state) != len(state) or not all(
+            old is new or old == new for old, new in zip(entry.state, state)
+        ):
+            return None, set(inputs)
+        changed = {
+            field for field in entry.inputs.keys() | inputs.keys()
+            if entry.inputs.get(field, _MISSING) != inputs.get(field, _MISSING)
+        }
+        return entry, changed
+
+    def store(self, key: Hashable, entry: CachedAnalysis) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,89 @@
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, Hashable, Optional
+import asyncio
+import copy
+import hashlib
+import json
+from .smart_agent import IntegrationSmartAgent
+from ..utils.context import CONTEXT_KEY
+
+
+class AsyncIntegrationAgent:
+    """Asyncio-вход в IntegrationSmartAgent.
+
+    Расчёт выполняется в пуле (``executor``), цикл событий не блокируется.
+    Одновременные запросы с тем же ``source_id`` и тем же снимком входных
+    данных объединяются в один расчёт - все ожидающие получают один и тот же
+    результат. Семафор ограничивает число одновременных расчётов.
+    """
+
+    def __init__(self, agent: Optional[IntegrationSmartAgent] = None,
+                 max_concurrency: int = 4, executor: Optional[Executor] = None):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be positive")
+        self.agent = agent if agent is not None else IntegrationSmartAgent()
+        self.max_concurrency = max_concurrency
+        self._own_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix='async-agent'
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.computed = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def request_key(source_data: Dict) -> Hashable:
+        # Ключ объединения: source_id + хэш снимка входных данных (без служебного контекста)
+        snapshot = {key: value for key, value in source_data.items() if key != CONTEXT_KEY}
+        digest = hashlib.sha256(
+            json.dumps(snapshot, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return source_data.get('source_id'), digest
+
+    async def analyze(self, source_data: Dict) -> Dict:
+        key = self.request_key(source_data)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.computed += 1
+            # Считаем на копии: исходный словарь вызывающего не меняется,
+            # а более поздние изменения в нём не влияют на уже начатый расчёт
+            snapshot = copy.deepcopy({k: v for k, v in source_data.items() if k != CONTEXT_KEY})
+            future = asyncio.ensure_future(self._compute(snapshot))
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._finish(key, done))
+        # shield: отмена одного ожидающего не отменяет расчёт для остальных
+        return await asyncio.shield(future)
+
+    async def _compute(self, source_data: Dict) -> Dict:
+        async with self._get_semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self.agent.analyze_integration, source_data)
+
+    def _finish(self, key: Hashable, future: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        # Ошибку получат ожидающие; если все они отменились - не пишем "exception was never retrieved"
+        if not future.cancelled():
+            future.exception()
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Семафор создаётся внутри работающего цикла событий
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {'computed': self.computed, 'coalesced': self.coalesced, 'inflight': len(self._inflight)}
+
+    def close(self) -> None:
+        if self._own_executor:
+            self.executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> 'AsyncIntegrationAgent':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,104 @@
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+FEATURE_DTYPE = np.float32
+
+
+def _active_steps(source_data: Dict) -> List[str]:
+    return source_data['current_progress']['active_parallel_steps']
+
+
+def _current_step(source_data: Dict) -> float:
+    # Берем максимальный номер шага из активных
+    return max(int(''.join(filter(str.isdigit, step))) for step in _active_steps(source_data))
+
+
+def _days_spent(source_data: Dict) -> float:
+    # Берем максимальное время из активных шагов
+    steps_time = source_data['current_progress'].get('steps_time', {})
+    return max(steps_time.get(step, 0) for step in _active_steps(source_data))
+
+
+def _parallel_steps_count(source_data: Dict) -> float:
+    return len(source_data['current_progress'].get('active_parallel_steps', []))
+
+
+def _characteristic(name: str) -> Callable[[Dict], float]:
+    return lambda source_data: source_data['characteristics'][name]
+
+
+# Извлекатели признаков из source_data по имени колонки
+FEATURE_EXTRACTORS: Dict[str, Callable[[Dict], float]] = {
+    'data_volume': _characteristic('data_volume'),
+    'api_complexity': _characteristic('api_complexity'),
+    'data_quality': _characteristic('data_quality'),
+    'current_step': _current_step,
+    'days_spent': _days_spent,
+    'parallel_steps_count': _parallel_steps_count,
+}
+
+
+class FeatureSchema:
+    """Скомпилированная схема признаков MLPredictor.
+
+    Порядок колонок фиксирован (``columns``), признаки пишутся сразу в
+    заранее выделенный массив float32 - тот же тип, в котором деревья
+    sklearn сравнивают пороги, поэтому при прогнозе копирования нет.
+    """
+
+    def __init__(self, columns: Sequence[str]):
+        unknown = [column for column in columns if column not in FEATURE_EXTRACTORS]
+        if unknown:
+            raise ValueError(f"Unknown feature columns: {unknown}")
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self.index = {column: i for i, column in enumerate(self.columns)}
+        self._extractors = tuple(FEATURE_EXTRACTORS[column] for column in self.columns)
+
+    @classmethod
+    def for_columns(cls, columns: Sequence[str]) -> 'FeatureSchema':
+        return _compile(tuple(columns))
+
+    @property
+    def width(self) -> int:
+        return len(self.columns)
+
+    def write(self, source_data: Dict, out: np.ndarray) -> np.ndarray:
+        for i, extract in enumerate(self._extractors):
+            out[i] = extract(source_data)
+        return out
+
+    def vector(self, source_data: Dict, out: Optional[np.ndarray] = None) -> np.ndarray:
+        if out is None:
+            out = np.empty(self.width, dtype=FEATURE_DTYPE)
+        return self.write(source_data, out)
+
+    def matrix(self, batch: Iterable[Dict]) -> np.ndarray:
+        items = batch if isinstance(batch, list) else list(batch)
+        out = np.empty((len(items), self.width), dtype=FEATURE_DTYPE)
+        for row, source_data in zip(out, items):
+            self.write(source_data, row)
+        return out
+
+    def stack(self, rows: Sequence[Sequence[float]]) -> np.ndarray:
+        # Готовые векторы (см. vector) -> матрица прогноза
+        out = np.empty((len(rows), self.width), dtype=FEATURE_DTYPE)
+        for i, row in enumerate(rows):
+            out[i] = row
+        return out
+
+    def from_records(self, records: Sequence[Dict]) -> np.ndarray:
+        # Записи обучения уже содержат признаки по именам колонок
+        out = np.empty((len(records), self.width), dtype=FEATURE_DTYPE)
+        for row, record in zip(out, records):
+            for i, column in enumerate(self.columns):
+                row[i] = record[column]
+        return out
+
+    def __repr__(self) -> str:
+        return f"FeatureSchema({list(self.columns)})"
+
+
+@lru_cache(maxsize=32)
+def _compile(columns: Tuple[str, ...]) -> FeatureSchema:
+    return FeatureSchema(columns)
@@ -1,14 +1,63 @@
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+import os
 import sqlite3
+import threading
 from datetime import datetime
+import numpy as np
+
+INTEGRATION_COLUMNS = (
+    'source_id', 'start_date', 'completion_date', 'steps_data', 'resources_used', 'status'
+)
+STEP_EXECUTION_COLUMNS = ('source_id', 'step', 'days', 'started', 'finished', 'resources')
+TRAINING_FEATURE_COLUMNS = ('source_id', 'name', 'value')
+# Интеграции, для которых признаки ещё не разложены по training_features
+# (база прежней схемы или строки, записанные в обход add_integrations)
+_WITHOUT_FEATURES = (
+    "NOT EXISTS (SELECT 1 FROM training_features f WHERE f.source_id = integrations.source_id)"
+)
 
 class HistoricalDatabase:
-    def __init__(self):
-        self.db_path = 'integration_history.db'
+    """История интеграций в SQLite.
+
+    Одно постоянное соединение на поток (режим WAL - читатели не блокируют
+    писателя), пакетная вставка через executemany и потоковое чтение курсором.
+    Выполнение шагов хранится нормализованно в ``step_executions``, числовые
+    признаки обучения - в ``training_features``; и то и другое выгружается
+    колонками NumPy/Arrow для обучения моделей без разбора JSON.
+    """
+
+    def __init__(self, db_path: str = 'integration_history.db'):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         self.init_db()
-        
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        # Соединение не переживает fork - в дочернем процессе открываем новое
+        if conn is None or self._local.pid != os.getpid():
+            # check_same_thread=False только ради close() из другого потока; запросы идут из потока-владельца
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
     def init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS integrations (
                     source_id TEXT PRIMARY KEY,
@@ -16,13 +65,360 @@ class HistoricalDatabase:
                     completion_date TEXT,
                     steps_data TEXT,
                     resources_used TEXT,
-                    status TEXT
+                    status TEXT,
+                    inserted_seq INTEGER
+                )
+            """)
+            if 'inserted_seq' not in self._columns(conn, 'integrations'):
+                # База прежней схемы: порядок вставки восстанавливаем по rowid
+                conn.execute("ALTER TABLE integrations ADD COLUMN inserted_seq INTEGER")
+                conn.execute("UPDATE integrations SET inserted_seq = rowid")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_integrations_status ON integrations (status)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_integrations_inserted_seq ON integrations (inserted_seq)"
+            )
+            # Строки, вставленные в обход add_integrations, тоже получают номер
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_integrations_inserted_seq
+                AFTER INSERT ON integrations WHEN NEW.inserted_seq IS NULL
+                BEGIN
+                    UPDATE integrations
+                    SET inserted_seq = (SELECT COALESCE(MAX(inserted_seq), 0) + 1 FROM integrations)
+                    WHERE rowid = NEW.rowid;
+                END
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_integrations_completion_date "
+                "ON integrations (completion_date)"
+            )
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS step_executions (
+                    source_id TEXT NOT NULL,
+                    step TEXT NOT NULL,
+                    days REAL NOT NULL,
+                    started TEXT,
+                    finished TEXT,
+                    resources TEXT,
+                    PRIMARY KEY (source_id, step)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_step_executions_step ON step_executions (step, days)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_step_executions_finished ON step_executions (finished)")
+            # Числовые признаки обучения (характеристики, completion_time и т.п.) по интеграции
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS training_features (
+                    source_id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    value REAL NOT NULL,
+                    PRIMARY KEY (source_id, name)
                 )
             """)
-            
+            # Контрольные точки дообучения моделей: до какого номера вставки данные уже учтены
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS training_checkpoints (
+                    name TEXT PRIMARY KEY,
+                    inserted_seq INTEGER,
+                    updated_at TEXT
+                )
+            """)
+            rows = conn.execute(
+                "SELECT source_id, start_date, completion_date, steps_data FROM integrations "
+                f"WHERE {_WITHOUT_FEATURES}"
+            ).fetchall()
+            if rows:
+                self._replace_feature_rows(
+                    conn, [(row['source_id'],) for row in rows],
+                    [feature for row in rows for feature in self._feature_rows(dict(row))]
+                )
+
+    @staticmethod
+    def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
+        return [row['name'] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+    def add_integrations(self, integrations: Iterable[Dict]) -> int:
+        # Пакетная вставка одной подготовленной командой в одной транзакции.
+        # Если у интеграции есть 'steps' (шаг -> дни или словарь с days/started/finished/resources),
+        # шаги пишутся и в step_executions, числовые поля steps_data - в training_features. Каждая вставка (и замена) получает следующий
+        # номер inserted_seq - по нему дообучение находит новые строки независимо от дат.
+        rows = []
+        step_rows = []
+        feature_rows = []
+        for integration in integrations:
+            rows.append(self._to_row(integration))
+            step_rows.extend(self._step_rows(integration['source_id'], integration.get('steps', {})))
+            feature_rows.extend(self._feature_rows(integration))
+        with self.connection() as conn:
+            cursor = conn.executemany(
+                f"INSERT OR REPLACE INTO integrations ({', '.join(INTEGRATION_COLUMNS)}, inserted_seq) "
+                f"VALUES ({', '.join('?' for _ in INTEGRATION_COLUMNS)}, "
+                f"(SELECT COALESCE(MAX(inserted_seq), 0) + 1 FROM integrations))",
+                rows
+            )
+            count = cursor.rowcount
+            self._insert_step_rows(conn, step_rows)
+            self._replace_feature_rows(conn, [(row[0],) for row in rows], feature_rows)
+            return count
+
+    def add_step_executions(self, executions: Iterable[Dict]) -> int:
+        rows = [
+            self._step_row(execution['source_id'], execution['step'], execution)
+            for execution in executions
+        ]
+        with self.connection() as conn:
+            return self._insert_step_rows(conn, rows)
+
+    def _insert_step_rows(self, conn: sqlite3.Connection, rows: List[tuple]) -> int:
+        if not rows:
+            return 0
+        cursor = conn.executemany(
+            f"INSERT OR REPLACE INTO step_executions ({', '.join(STEP_EXECUTION_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in STEP_EXECUTION_COLUMNS)})",
+            rows
+        )
+        return cursor.rowcount
+
+    def _step_rows(self, source_id: str, steps: Dict) -> Iterator[tuple]:
+        for step, execution in steps.items():
+            if not isinstance(execution, dict):
+                execution = {'days': execution}
+            yield self._step_row(source_id, step, execution)
+
+    def _step_row(self, source_id: str, step: str, execution: Dict) -> tuple:
+        resources = execution.get('resources')
+        if resources is not None and not isinstance(resources, str):
+            resources = json.dumps(resources)
+        return (source_id, step, float(execution['days']),
+                execution.get('started'), execution.get('finished'), resources)
+
+    def _feature_rows(self, row: Dict) -> Iterator[tuple]:
+        # Числовые поля steps_data (вложенные 'characteristics' - на верхнем уровне).
+        # completion_time по умолчанию - длительность интеграции в днях.
+        record = row.get('steps_data')
+        record = json.loads(record or '{}') if isinstance(record, (str, type(None))) else record
+        if not isinstance(record, dict):
+            return
+        record = dict(record)
+        characteristics = record.pop('characteristics', {})
+        if isinstance(characteristics, dict):
+            record.update(characteristics)
+        if 'completion_time' not in record and row.get('start_date') and row.get('completion_date'):
+            started = datetime.fromisoformat(row['start_date'])
+            finished = datetime.fromisoformat(row['completion_date'])
+            record['completion_time'] = (finished - started).days
+        for name, value in record.items():
+            if isinstance(value, (int, float)):
+                yield (row['source_id'], name, float(value))
+
+    def _replace_feature_rows(self, conn: sqlite3.Connection, source_ids: List[tuple],
+                              rows: List[tuple]) -> None:
+        # Признаки заменяются целиком вместе со строкой интеграции
+        conn.executemany("DELETE FROM training_features WHERE source_id = ?", source_ids)
+        conn.executemany(
+            f"INSERT INTO training_features ({', '.join(TRAINING_FEATURE_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in TRAINING_FEATURE_COLUMNS)})",
+            rows
+        )
+
+    def migrate_steps_data(self) -> int:
+        # Разовый перенос данных из JSON-колонки steps_data: шаги (ключ 'steps') переносятся
+        # в step_executions и удаляются из JSON, числовые признаки копируются в training_features
+        step_rows = []
+        feature_rows = []
+        migrated = []
+        source_ids = []
+        for row in self.connection().execute(
+            "SELECT source_id, start_date, completion_date, steps_data FROM integrations"
+        ):
+            source_ids.append((row['source_id'],))
+            feature_rows.extend(self._feature_rows(dict(row)))
+            steps_data = json.loads(row['steps_data'] or '{}')
+            if isinstance(steps_data, dict) and 'steps' in steps_data:
+                step_rows.extend(self._step_rows(row['source_id'], steps_data.pop('steps')))
+                migrated.append((json.dumps(steps_data) if steps_data else None, row['source_id']))
+        with self.connection() as conn:
+            count = self._insert_step_rows(conn, step_rows)
+            conn.executemany("UPDATE integrations SET steps_data = ? WHERE source_id = ?", migrated)
+            self._replace_feature_rows(conn, source_ids, feature_rows)
+            return count
+
+    def _to_row(self, integration: Dict) -> tuple:
+        row = dict(integration)
+        row.setdefault('status', 'completed')
+        for column in ('steps_data', 'resources_used'):
+            if not isinstance(row.get(column), (str, type(None))):
+                row[column] = json.dumps(row[column])
+        return tuple(row.get(column) for column in INTEGRATION_COLUMNS)
+
+    def iter_completed_integrations(self, since: Optional[str] = None, batch_size: int = 1000,
+                                    after_seq: Optional[int] = None) -> Iterator[Dict]:
+        # Строки читаются порциями по batch_size - вся таблица в память не загружается.
+        # since - по completion_date, after_seq - только вставленные после этого номера.
+        query = "SELECT * FROM integrations WHERE status = 'completed'"
+        params = ()
+        if since is not None:
+            query += " AND completion_date > ?"
+            params += (since,)
+        if after_seq is not None:
+            query += " AND inserted_seq > ?"
+            params += (after_seq,)
+        query += " ORDER BY completion_date"
+        cursor = self.connection().execute(query, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield dict(row)
+        finally:
+            cursor.close()
+
     def get_completed_integrations(self) -> List[Dict]:
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT * FROM integrations WHERE status = 'completed'"
+        return list(self.iter_completed_integrations())
+
+    def get_training_records(self, columns: List[str], after_seq: Optional[int] = None) -> List[Dict]:
+        columns = list(dict.fromkeys(columns))
+        matrix = self._training_matrix(columns, after_seq)
+        return [dict(zip(columns, values)) for values in matrix[:, 1:].tolist()]
+
+    def _training_matrix(self, columns: List[str], after_seq: Optional[int],
+                         batch_size: int = 50000) -> np.ndarray:
+        # Разворот training_features в строки средствами SQL: первая колонка - inserted_seq,
+        # далее значения columns. Интеграции без какого-либо из признаков пропускаются.
+        # Строки, у которых признаков в training_features нет, читаются из JSON steps_data.
+        query = (
+            "SELECT i.inserted_seq, "
+            + ', '.join("MAX(CASE WHEN f.name = ? THEN f.value END)" for _ in columns)
+            + " FROM integrations i JOIN training_features f ON f.source_id = i.source_id"
+            " WHERE i.status = 'completed'"
+            f" AND f.name IN ({', '.join('?' for _ in columns)})"
+        )
+        params = tuple(columns) * 2
+        if after_seq is not None:
+            query += " AND i.inserted_seq > ?"
+            params += (after_seq,)
+        query += " GROUP BY i.source_id HAVING COUNT(*) = ? ORDER BY i.completion_date"
+        params += (len(columns),)
+        batches = []
+        cursor = self.connection().cursor()
+        cursor.row_factory = None
+        cursor.execute(query, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                batches.append(np.array(rows, dtype=float))
+        finally:
+            cursor.close()
+        fallback = self._json_training_rows(columns, after_seq)
+        if fallback:
+            batches.append(np.array(fallback, dtype=float))
+        if not batches:
+            return np.empty((0, len(columns) + 1))
+        return np.concatenate(batches)
+
+    def _json_training_rows(self, columns: List[str], after_seq: Optional[int]) -> List[List[float]]:
+        query = (
+            "SELECT inserted_seq, source_id, start_date, completion_date, steps_data FROM integrations "
+            f"WHERE status = 'completed' AND {_WITHOUT_FEATURES}"
+        )
+        params = ()
+        if after_seq is not None:
+            query += " AND inserted_seq > ?"
+            params = (after_seq,)
+        rows = []
+        for row in self.connection().execute(query + " ORDER BY completion_date", params):
+            features = {name: value for _, name, value in self._feature_rows(dict(row))}
+            if all(column in features for column in columns):
+                rows.append([row['inserted_seq']] + [features[column] for column in columns])
+        return rows
+
+    def export_step_columns(self, step: Optional[str] = None,
+                            columns: Tuple[str, ...] = ('source_id', 'step', 'days'),
+                            batch_size: int = 50000) -> Dict[str, np.ndarray]:
+        # Колоночная выгрузка step_executions (по умолчанию source_id, step, days)
+        unknown = set(columns) - set(STEP_EXECUTION_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown step_executions columns: {sorted(unknown)}")
+        query = f"SELECT {', '.join(columns)} FROM step_executions"
+        params = ()
+        if step is not None:
+            query += " WHERE step = ?"
+            params = (step,)
+        query += " ORDER BY step"
+        values = [[] for _ in columns]
+        cursor = self.connection().cursor()
+        cursor.row_factory = None
+        cursor.execute(query, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for target, batch in zip(values, zip(*rows)):
+                    target.extend(batch)
+        finally:
+            cursor.close()
+        return {
+            column: np.array(column_values, dtype=float if column == 'days' else object)
+            for column, column_values in zip(columns, values)
+        }
+
+    def export_step_table(self, step: Optional[str] = None):
+        # Та же выгрузка в виде pyarrow.Table (pyarrow - необязательная зависимость)
+        try:
+            import pyarrow as pa
+        except ImportError as exc:
+            raise ImportError("export_step_table requires pyarrow") from exc
+        columns = self.export_step_columns(step)
+        return pa.table({
+            'source_id': pa.array(columns['source_id'], type=pa.string()),
+            'step': pa.array(columns['step'], type=pa.string()).dictionary_encode(),
+            'days': pa.array(columns['days'], type=pa.float64())
+        })
+
+    def step_durations(self) -> Dict[str, np.ndarray]:
+        # Длительности по шагам - вход для StatisticalModel.load_durations.
+        # Оба запроса читают только покрывающий индекс (step, days).
+        conn = self.connection()
+        steps = [row[0] for row in conn.execute("SELECT DISTINCT step FROM step_executions")]
+        return {
+            step: np.fromiter(
+                (row[0] for row in conn.execute("SELECT days FROM step_executions WHERE step = ?", (step,))),
+                dtype=float
+            )
+            for step in steps
+        }
+
+    def export_training_arrays(self, feature_columns: List[str], target_column: str,
+                               after_seq: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        # Матрица признаков и целевой вектор для MLPredictor.train_arrays
+        X, y, _ = self.export_training_batch(feature_columns, target_column, after_seq)
+        return X, y
+
+    def export_training_batch(self, feature_columns: List[str], target_column: str,
+                              after_seq: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, Optional[int]]:
+        # То же, что export_training_arrays, плюс максимальный inserted_seq среди выгруженных строк -
+        # его сохраняют как контрольную точку. Даты для этого не годятся: строка, вставленная
+        # позже с той же completion_date, оказалась бы за контрольной точкой.
+        columns = list(dict.fromkeys(list(feature_columns) + [target_column]))
+        matrix = self._training_matrix(columns, after_seq)
+        X = matrix[:, [1 + columns.index(column) for column in feature_columns]]
+        y = matrix[:, 1 + columns.index(target_column)]
+        watermark = int(matrix[:, 0].max()) if len(matrix) else after_seq
+        return X, y, watermark
+
+    def get_checkpoint(self, name: str) -> Optional[int]:
+        row = self.connection().execute(
+            "SELECT inserted_seq FROM training_checkpoints WHERE name = ?", (name,)
+        ).fetchone()
+        return row['inserted_seq'] if row else None
+
+    def set_checkpoint(self, name: str, inserted_seq: Optional[int]) -> None:
+        with self.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO training_checkpoints (name, inserted_seq, updated_at) "
+                "VALUES (?, ?, ?)",
+                (name, inserted_seq, datetime.now().isoformat())
             )
-            return [dict(row) for row in cursor.fetchall()]
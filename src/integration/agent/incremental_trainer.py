@@ -0,0 +1,74 @@
+from threading import Event, Lock, Thread
+from typing import Optional
+from .historical_db import HistoricalDatabase
+from .ml_predictor import MLPredictor
+
+
+class IncrementalTrainer:
+    """Фоновое дообучение MLPredictor на новых завершённых интеграциях.
+
+    Каждый запуск выгружает из HistoricalDatabase только строки, вставленные
+    после контрольной точки (номер inserted_seq), добавляет к лесу несколько
+    деревьев (``MLPredictor.update``) и сдвигает контрольную точку.
+    Прогнозы не останавливаются: модель подменяется целиком после обучения.
+    """
+
+    def __init__(self, predictor: MLPredictor, database: HistoricalDatabase,
+                 checkpoint: str = 'ml_predictor', trees_per_update: int = 10,
+                 max_estimators: Optional[int] = 500, min_new_rows: int = 1,
+                 interval: float = 300.0):
+        self.predictor = predictor
+        self.database = database
+        self.checkpoint = checkpoint
+        self.trees_per_update = trees_per_update
+        self.max_estimators = max_estimators
+        self.min_new_rows = min_new_rows
+        self.interval = interval
+        self._run_lock = Lock()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    def run_once(self) -> int:
+        # Возвращает число строк, на которых модель дообучена (0 - новых данных мало)
+        with self._run_lock:
+            after_seq = self.database.get_checkpoint(self.checkpoint)
+            X, y, watermark = self.database.export_training_batch(
+                self.predictor.feature_columns, self.predictor.target_column, after_seq
+            )
+            if len(y) < self.min_new_rows:
+                return 0
+            if after_seq is None:
+                # Первый запуск: лес строится заново на всей истории, а не поверх
+                # модели по умолчанию (её могли уже обучить на начальных данных)
+                self.predictor.train_arrays(X, y)
+            else:
+                self.predictor.update(X, y, n_new_trees=self.trees_per_update,
+                                      max_estimators=self.max_estimators)
+            self.database.set_checkpoint(self.checkpoint, watermark)
+            return len(y)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._loop, name='incremental-trainer', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                # Ошибка дообучения не должна останавливать агента - старая модель продолжает работать
+                print(f"Incremental training failed: {e}")
+            self._stop.wait(self.interval)
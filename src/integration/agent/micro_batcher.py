@@ -0,0 +1,159 @@
+from concurrent.futures import Future, InvalidStateError
+from threading import Lock, Thread
+from typing import Dict, Iterable, List, Optional
+import queue
+import time
+from .ml_predictor import MLPredictor
+from ..models.streaming import QuantileSketch
+
+LATENCY_QUANTILES = (0.5, 0.9, 0.99)
+
+_STOP = object()
+
+
+class _Request:
+    __slots__ = ('row', 'future', 'enqueued')
+
+    def __init__(self, row: List[float]):
+        self.row = row
+        self.future: Future = Future()
+        self.enqueued = time.perf_counter()
+
+
+def _resolve(setter, value) -> None:
+    # Ошибка одного запроса не должна останавливать поток пакетов
+    try:
+        setter(value)
+    except InvalidStateError:
+        pass
+
+
+class PredictionBatcher:
+    """Микробатчинг одиночных прогнозов MLPredictor.
+
+    Одновременные вызовы ``analyze_patterns`` из разных потоков собираются в
+    пакет - до ``max_batch_size`` строк или ``max_wait_ms`` миллисекунд с
+    момента первого запроса - и считаются одним ``model.predict``. Признаки
+    извлекаются в потоке вызывающего, ошибки входных данных до пакета не доходят.
+    Подставляется вместо MLPredictor в MLPredictorHandler.
+
+    Задержки (ожидание в очереди, predict, полная) и размеры пакетов
+    собираются в QuantileSketch - см. ``latency_stats``.
+    """
+
+    def __init__(self, predictor: Optional[MLPredictor] = None,
+                 max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be positive")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be non-negative")
+        self.predictor = predictor or MLPredictor()
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[Thread] = None
+        self._lock = Lock()
+        self._stats_lock = Lock()
+        self._closed = False
+        self.batches = 0
+        self.queue_latency = QuantileSketch()
+        self.predict_latency = QuantileSketch()
+        self.total_latency = QuantileSketch()
+        self.batch_sizes = QuantileSketch()
+
+    def submit(self, source_data: Dict) -> Future:
+        request = _Request(self.predictor.feature_row(source_data))
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("PredictionBatcher is closed")
+            if self._thread is None:
+                self._thread = Thread(target=self._loop, name='prediction-batcher', daemon=True)
+                self._thread.start()
+            self._queue.put(request)
+        return request.future
+
+    def analyze_patterns(self, source_data: Dict) -> List[Dict]:
+        return self.submit(source_data).result()
+
+    def analyze_patterns_batch(self, batch: Iterable[Dict]) -> List[List[Dict]]:
+        # Пакет уже собран вызывающим - очередь не нужна
+        return self.predictor.analyze_patterns_batch(batch)
+
+    def _loop(self) -> None:
+        max_wait = self.max_wait_ms / 1000
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = first.enqueued + max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                try:
+                    request = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is _STOP:
+                    stopping = True
+                    break
+                batch.append(request)
+            self._run(batch)
+
+    def _run(self, batch: List[_Request]) -> None:
+        # Отменённые вызывающим запросы не считаем; остальные больше нельзя отменить
+        batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        started = time.perf_counter()
+        try:
+            results = self.predictor.analyze_feature_rows([request.row for request in batch])
+        except BaseException as e:
+            for request in batch:
+                _resolve(request.future.set_exception, e)
+            return
+        finished = time.perf_counter()
+        for request, patterns in zip(batch, results):
+            _resolve(request.future.set_result, patterns)
+        with self._stats_lock:
+            self.batches += 1
+            self.batch_sizes.add(len(batch))
+            self.predict_latency.add((finished - started) * 1000)
+            for request in batch:
+                self.queue_latency.add((started - request.enqueued) * 1000)
+                self.total_latency.add((finished - request.enqueued) * 1000)
+
+    def latency_stats(self) -> Dict[str, Dict[str, float]]:
+        # Квантили задержек в миллисекундах и размеров пакетов
+        with self._stats_lock:
+            sketches = {
+                'queue_ms': self.queue_latency,
+                'predict_ms': self.predict_latency,
+                'total_ms': self.total_latency,
+                'batch_size': self.batch_sizes
+            }
+            stats = {
+                name: {f"p{int(q * 100)}": sketch.quantile(q) for q in LATENCY_QUANTILES}
+                for name, sketch in sketches.items()
+            }
+            stats['batch_size']['max'] = self.batch_sizes.max if self.batches else 0
+            stats['batches'] = {'count': self.batches, 'requests': self.total_latency.count}
+        return stats
+
+    def close(self) -> None:
+        # Запросы, поставленные до close, будут обработаны
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join()
+
+    def __enter__(self) -> 'PredictionBatcher':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
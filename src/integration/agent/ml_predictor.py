@@ -1,13 +1,31 @@
 import numpy as np
-import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
-from typing import List, Dict
-from ..utils.calculations import load_settings
+from threading import Lock
+import copy
+import hashlib
+import json
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+from ..utils.settings import get_settings
+from .features import FEATURE_DTYPE, FeatureSchema
+
+if TYPE_CHECKING:
+    from sklearn.ensemble import RandomForestRegressor
+
+MODEL_CLASS = 'RandomForestRegressor'
+
+
+def _new_model(random_state: Optional[int]) -> 'RandomForestRegressor':
+    # sklearn импортируется только при обучении - импорт модуля остаётся дешёвым
+    from sklearn.ensemble import RandomForestRegressor
+    return RandomForestRegressor(random_state=random_state)
 
 class MLPredictor:
-    def __init__(self):
-        self.settings = load_settings()
-        self.model = RandomForestRegressor()
+    target_column = 'completion_time'
+
+    def __init__(self, random_state: Optional[int] = 0):
+        # Фиксированный random_state - одинаковые данные дают одинаковую модель в любом процессе
+        self.random_state = random_state
+        self._model: Optional['RandomForestRegressor'] = None
+        self._train_lock = Lock()
         self.feature_columns = [
             'data_volume',
             'api_complexity',
@@ -17,7 +35,7 @@ class MLPredictor:
             'parallel_steps_count' 
         ]
         # Initial training data
-        initial_data = [
+        self.initial_data = [
             {
                 'data_volume': 2,        # Большой объем
                 'api_complexity': 2,     # Сложный API
@@ -46,29 +64,70 @@ class MLPredictor:
                 'parallel_steps_count': 0
             }
         ]
-        self.train(initial_data)
 
-    def extract_features(self, source_data: Dict) -> pd.DataFrame:
-        active_steps = source_data['current_progress']['active_parallel_steps']
-        steps_time = source_data['current_progress'].get('steps_time', {})
-    
-        features = {
-            'data_volume': source_data['characteristics']['data_volume'],
-            'api_complexity': source_data['characteristics']['api_complexity'],
-            'data_quality': source_data['characteristics']['data_quality'],
-            # Берем максимальный номер шага из активных
-            'current_step': max(int(''.join(filter(str.isdigit, step))) for step in active_steps),
-            # Берем максимальное время из активных шагов
-            'days_spent': max(steps_time.get(step, 0) for step in active_steps),
-            'parallel_steps_count': len(source_data['current_progress'].get('active_parallel_steps', []))
+    @property
+    def model(self) -> 'RandomForestRegressor':
+        # Обучение откладывается до первого прогноза - конструктор остаётся дешёвым
+        if self._model is None:
+            with self._train_lock:
+                if self._model is None:
+                    self.train(self.initial_data)
+        return self._model
+
+    @property
+    def is_trained(self) -> bool:
+        return self._model is not None
+
+    @property
+    def schema_hash(self) -> str:
+        # Хэш схемы признаков: сохранённая модель совместима только с той же схемой
+        schema = {
+            'model': MODEL_CLASS,
+            'features': self.feature_columns,
+            'target': self.target_column
         }
-        return pd.DataFrame([features])
+        return hashlib.sha256(json.dumps(schema, sort_keys=True).encode()).hexdigest()
+
+    def set_model(self, model: 'RandomForestRegressor') -> None:
+        self._model = model
+
+    @property
+    def settings(self):
+        return get_settings()
+
+    @property
+    def schema(self) -> FeatureSchema:
+        return FeatureSchema.for_columns(self.feature_columns)
+
+    def extract_features(self, source_data: Dict) -> np.ndarray:
+        # Матрица из одной строки в порядке feature_columns
+        return self.schema.vector(source_data).reshape(1, -1)
+
+    def extract_features_batch(self, batch: Iterable[Dict]) -> np.ndarray:
+        # Один массив float32 на весь пакет
+        return self.schema.matrix(batch)
+
+    def feature_row(self, source_data: Dict) -> np.ndarray:
+        return self.schema.vector(source_data)
 
     def analyze_patterns(self, source_data: Dict) -> List[Dict]:
         features = self.extract_features(source_data)
         predictions = self.model.predict(features)
         return self.convert_predictions_to_patterns(predictions)
 
+    def analyze_patterns_batch(self, batch: Iterable[Dict]) -> List[List[Dict]]:
+        # Один вызов predict на весь пакет; по одному списку паттернов на интеграцию
+        items = list(batch)
+        if not items:
+            return []
+        predictions = self.model.predict(self.extract_features_batch(items))
+        return [self.convert_predictions_to_patterns([pred]) for pred in predictions]
+
+    def analyze_feature_rows(self, rows: List[np.ndarray]) -> List[List[Dict]]:
+        # Прогноз по уже извлечённым строкам признаков (см. feature_row)
+        predictions = self.model.predict(self.schema.stack(rows))
+        return [self.convert_predictions_to_patterns([pred]) for pred in predictions]
+
     def convert_predictions_to_patterns(self, predictions) -> List[Dict]:
         patterns = []
         for pred in predictions:
@@ -81,13 +140,59 @@ class MLPredictor:
             })
         return patterns
 
-    def train(self, historical_data: List[Dict]) -> None:
-        X = pd.DataFrame(historical_data)[self.feature_columns]
-        y = pd.DataFrame(historical_data)['completion_time']
-        self.model.fit(X, y)
+    def train(self, historical_data) -> None:
+        # Список записей или pandas.DataFrame (офлайн-обучение); pandas здесь не импортируется
+        if hasattr(historical_data, 'columns'):
+            X = historical_data[self.feature_columns].to_numpy(dtype=FEATURE_DTYPE)
+            y = historical_data[self.target_column].to_numpy(dtype=float)
+        else:
+            X = self.schema.from_records(historical_data)
+            y = np.array([record[self.target_column] for record in historical_data], dtype=float)
+        self.train_arrays(X, y)
+
+    def train_arrays(self, X: np.ndarray, y: np.ndarray) -> None:
+        # Обучение сразу на колоночных массивах (порядок колонок - feature_columns)
+        model = _new_model(self.random_state)
+        model.fit(np.asarray(X, dtype=FEATURE_DTYPE), y)
+        self._model = model
+
+    def update(self, X: np.ndarray, y: np.ndarray, n_new_trees: int = 10,
+               max_estimators: Optional[int] = None) -> None:
+        # Дообучение: к копии текущего леса добавляются n_new_trees деревьев,
+        # обученных только на новых строках (warm_start). Старые деревья сверх
+        # max_estimators отбрасываются. Готовая модель подменяется одной операцией
+        # присваивания - прогнозы во время дообучения идут по старой модели.
+        if self._model is None:
+            self.train_arrays(X, y)
+            return
+        model = copy.deepcopy(self._model)
+        model.set_params(warm_start=True, n_estimators=len(model.estimators_) + n_new_trees)
+        model.fit(np.asarray(X, dtype=FEATURE_DTYPE), y)
+        if max_estimators is not None and len(model.estimators_) > max_estimators:
+            model.estimators_ = model.estimators_[-max_estimators:]
+            model.n_estimators = max_estimators
+        model.set_params(warm_start=False)
+        self._model = model
+
+    def train_from_database(self, database) -> int:
+        # Обучение на завершённых интеграциях из HistoricalDatabase
+        X, y = database.export_training_arrays(self.feature_columns, self.target_column)
+        if not len(y):
+            raise ValueError("No completed integrations with training features in the database")
+        self.train_arrays(X, y)
+        return len(y)
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state['_train_lock']
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._train_lock = Lock()
         
     def estimate_delay(self, risk_pattern: Dict, current_step: int) -> float:
-        steps = self.settings['integration']['steps']
+        steps = self.settings.integration.steps
         # Преобразуем current_step в число, если это строка
         if isinstance(current_step, str):
             current_step = int(current_step.replace('step', ''))
@@ -102,10 +207,10 @@ class MLPredictor:
 
     def get_step_time(self, step: int) -> int:
         step_key = f'step{step}'
-        return self.settings['integration']['steps'][step_key]
+        return self.settings.integration.steps[step_key]
 
     def estimate_resource_needs(self, risk_pattern: Dict, current_step: int) -> float:
-        steps = self.settings['integration']['steps']
+        steps = self.settings.integration.steps
     
         # Преобразуем current_step в число, если это строка
         if isinstance(current_step, str):
@@ -125,9 +230,9 @@ class MLPredictor:
     def calculate_impact(self, risk_pattern: Dict, current_step: int) -> Dict:
         # Получаем веса для текущего шага
         step_weights = {
-            'schedule': self.settings['factors']['weights']['data_volume'],
-            'resource': self.settings['factors']['weights']['api_complexity'],
-            'quality': self.settings['factors']['weights']['data_quality']
+            'schedule': self.settings.factors.weights['data_volume'],
+            'resource': self.settings.factors.weights['api_complexity'],
+            'quality': self.settings.factors.weights['data_quality']
         }
         return {
             'schedule_impact': self.estimate_delay(risk_pattern, current_step) * step_weights['schedule'],
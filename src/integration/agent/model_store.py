@@ -0,0 +1,120 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+import json
+import os
+import re
+import shutil
+from .ml_predictor import MLPredictor
+
+MODEL_FILE = 'model.joblib'
+METADATA_FILE = 'metadata.json'
+# Автоматически нумеруемые версии; прочие имена (например, 'prod') сохраняются только явно
+_NUMBERED_VERSION = re.compile(r'v(\d+)')
+
+
+def _version_number(version: str) -> int:
+    return int(_NUMBERED_VERSION.fullmatch(version).group(1))
+
+
+@dataclass(frozen=True)
+class ModelArtifact:
+    version: str
+    schema_hash: str
+    feature_columns: List[str]
+    created_at: str
+    path: Path
+
+
+class ModelStore:
+    """Хранилище обученных моделей MLPredictor с версиями.
+
+    Каждая версия - каталог с моделью (joblib, без сжатия) и метаданными
+    (версия, хэш схемы признаков). mmap при загрузке память не экономит:
+    деревья sklearn копируют свои массивы при распаковке. Чтобы рабочие
+    процессы делили одну копию модели, её загружают один раз в родительском
+    процессе до fork - страницы наследуются без копирования. PortfolioRunner
+    для этого обращается к модели агента перед запуском пула.
+    Жизненный цикл: ``train_from_database`` -> ``save`` -> ``load``.
+    """
+
+    def __init__(self, root: os.PathLike):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def versions(self) -> List[str]:
+        # Нумерованные версии по возрастанию номера
+        numbered = [
+            path.name for path in self.root.iterdir()
+            if _NUMBERED_VERSION.fullmatch(path.name) and path.is_dir() and (path / METADATA_FILE).exists()
+        ]
+        return sorted(numbered, key=_version_number)
+
+    def latest_version(self) -> Optional[str]:
+        versions = self.versions()
+        return versions[-1] if versions else None
+
+    def _next_version(self) -> str:
+        latest = self.latest_version()
+        number = _version_number(latest) + 1 if latest else 1
+        return f"v{number:04d}"
+
+    def save(self, predictor: MLPredictor, version: Optional[str] = None) -> ModelArtifact:
+        version = version or self._next_version()
+        target = self.root / version
+        if target.exists():
+            raise FileExistsError(f"Model version {version} already exists")
+
+        # Пишем во временный каталог и переименовываем - читатели не увидят половину версии
+        staging = self.root / f".{version}.tmp"
+        staging.mkdir()
+        try:
+            import joblib
+            joblib.dump(predictor.model, staging / MODEL_FILE)
+            artifact = ModelArtifact(
+                version=version,
+                schema_hash=predictor.schema_hash,
+                feature_columns=list(predictor.feature_columns),
+                created_at=datetime.now(timezone.utc).isoformat(),
+                path=target
+            )
+            (staging / METADATA_FILE).write_text(json.dumps({
+                'version': artifact.version,
+                'schema_hash': artifact.schema_hash,
+                'feature_columns': artifact.feature_columns,
+                'created_at': artifact.created_at
+            }, indent=2))
+            os.replace(staging, target)
+        except BaseException:
+            # Неудачная запись не должна блокировать повторный save той же версии
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return artifact
+
+    def artifact(self, version: Optional[str] = None) -> ModelArtifact:
+        version = version or self.latest_version()
+        if version is None:
+            raise FileNotFoundError(f"No saved models in {self.root}")
+        path = self.root / version
+        metadata = json.loads((path / METADATA_FILE).read_text())
+        return ModelArtifact(
+            version=metadata['version'],
+            schema_hash=metadata['schema_hash'],
+            feature_columns=metadata['feature_columns'],
+            created_at=metadata['created_at'],
+            path=path
+        )
+
+    def load(self, version: Optional[str] = None, predictor: Optional[MLPredictor] = None,
+             mmap_mode: Optional[str] = None) -> MLPredictor:
+        artifact = self.artifact(version)
+        predictor = predictor or MLPredictor()
+        if artifact.schema_hash != predictor.schema_hash:
+            raise ValueError(
+                f"Model {artifact.version} was trained with a different feature schema: "
+                f"{artifact.feature_columns}"
+            )
+        import joblib
+        predictor.set_model(joblib.load(artifact.path / MODEL_FILE, mmap_mode=mmap_mode))
+        return predictor
@@ -0,0 +1,77 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import multiprocessing
+import os
+from .smart_agent import IntegrationSmartAgent
+
+# Агент рабочего процесса: передаётся один раз при старте воркера
+# (при fork - просто наследуется), а не с каждой задачей
+_worker_agent: Optional[IntegrationSmartAgent] = None
+
+
+def _init_worker(agent: IntegrationSmartAgent) -> None:
+    global _worker_agent
+    _worker_agent = agent
+
+
+def _analyze_chunk(chunk: List[Tuple[int, Dict]]) -> List[Tuple[int, Dict]]:
+    indices = [index for index, _ in chunk]
+    results = _worker_agent.analyze_batch(source_data for _, source_data in chunk)
+    return list(zip(indices, results))
+
+
+class PortfolioRunner:
+    """Скоринг большого портфеля интеграций на пуле процессов.
+
+    Портфель режется на чанки по ``chunk_size``, каждый чанк обрабатывается
+    ``analyze_batch`` в воркере. Обученные модели и настройки попадают в воркеры
+    один раз через initializer. Результаты отдаются по мере готовности.
+    """
+
+    def __init__(self, agent: Optional[IntegrationSmartAgent] = None,
+                 max_workers: Optional[int] = None, chunk_size: int = 500,
+                 mp_context=None):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.agent = agent if agent is not None else IntegrationSmartAgent()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        if mp_context is None and 'fork' in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context('fork')
+        self.mp_context = mp_context
+
+    def run(self, portfolio: Iterable[Dict]) -> Iterator[Tuple[int, Dict]]:
+        # Отдаёт пары (индекс во входе, результат) в порядке завершения чанков
+        chunks = self._chunks(portfolio)
+        # Ограничиваем число чанков "в полёте", чтобы не держать в памяти весь портфель
+        max_pending = self.max_workers * 2
+        # MLPredictor обучается лениво: обучаем в родителе до fork, иначе каждый воркер
+        # обучит свой лес при первом прогнозе
+        self.agent.ml_model.model
+        with ProcessPoolExecutor(max_workers=self.max_workers,
+                                 mp_context=self.mp_context,
+                                 initializer=_init_worker,
+                                 initargs=(self.agent,)) as executor:
+            pending = {executor.submit(_analyze_chunk, chunk)
+                       for chunk in islice(chunks, max_pending)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+                for chunk in islice(chunks, len(done)):
+                    pending.add(executor.submit(_analyze_chunk, chunk))
+
+    def run_ordered(self, portfolio: Iterable[Dict]) -> List[Dict]:
+        results = {}
+        for index, result in self.run(portfolio):
+            results[index] = result
+        return [results[index] for index in range(len(results))]
+
+    def _chunks(self, portfolio: Iterable[Dict]) -> Iterator[List[Tuple[int, Dict]]]:
+        indexed = enumerate(portfolio)
+        while True:
+            chunk = list(islice(indexed, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
@@ -1,13 +1,7 @@
-from typing import Dict, List, Optional
-from dataclasses import dataclass
-
-@dataclass
-class Resource:
-    id: str
-    type: str
-    skill_level: int
-    availability: float
-    current_project: Optional[str] = None
+from typing import Dict, Iterable, List, Mapping, Optional
+from .allocation import AllocationPlan, AllocationSolver, StepDemand
+from .resource_pool import Reservation, ReservationError, Resource, ResourcePool
+from ..utils.context import RequestContext
 
 class ResourceManager:
     def __init__(self):
@@ -17,16 +11,42 @@ class ResourceManager:
             'R3': Resource('R3', 'analyst', 7, 0.8)
         }
         self.assignments = {}
+        self.solver = AllocationSolver()
+
+    @property
+    def resources(self) -> ResourcePool:
+        return self._resources
+
+    @resources.setter
+    def resources(self, resources: Mapping[str, Resource]) -> None:
+        # Любой словарь ресурсов превращается в индексированный пул
+        self._resources = resources if isinstance(resources, ResourcePool) else ResourcePool(resources.values())
         
     def find_available(self) -> List[Resource]:
-        return [r for r in self.resources.values() if r.availability > 0.3]
+        return self.resources.available(0.3)
     
-    def assign_senior(self, resources: List[Resource]) -> bool:
-        senior = next((r for r in resources if r.skill_level > 7), None)
-        if senior:
-            senior.availability -= 0.5
-            return True
-        return False
+    def assign_senior(self, resources: List[Resource], owner: Optional[str] = None) -> Optional[Reservation]:
+        # Проверка и списание доступности атомарны - параллельные агенты не забронируют одного человека дважды.
+        # Назначение возвращается (и запоминается за владельцем) - по нему доля возвращается через release.
+        for senior in resources:
+            if senior.skill_level <= 7 or senior.id not in self.resources:
+                continue
+            try:
+                reservation = self.resources.reserve({senior.id: 0.5}, owner)
+            except ReservationError:
+                continue
+            self.resources.commit(reservation)
+            if owner is not None:
+                self.assignments.setdefault(owner, []).append(reservation)
+            return reservation
+        return None
+
+    def release_assignments(self, owner: str) -> int:
+        # Освобождение всех назначений владельца (например, по завершении интеграции)
+        reservations = self.assignments.pop(owner, [])
+        for reservation in reservations:
+            self.resources.release(reservation)
+        return len(reservations)
 
     def get_current_allocation(self) -> Dict:
         return {
@@ -57,7 +77,7 @@ class ResourceManager:
 
     def identify_bottlenecks(self) -> List[str]:
         bottlenecks = []
-        for resource in self.resources.values():
+        for resource in self.resources.below(0.3):
             if resource.availability < 0.1:
                 bottlenecks.append(f"Critical utilization of {resource.type} (ID: {resource.id})")
             elif resource.availability < 0.3:
@@ -77,18 +97,47 @@ class ResourceManager:
         return requirements.get(step, {'min_skill': 5, 'preferred_type': 'any'})
 
     def optimize_allocation(self, available: List[Resource], critical_steps: List[str]) -> Dict:
-        optimization_plan = {}
-        for step in critical_steps:
-            required_skills = self.get_step_requirements(step)
-            best_match = self.find_best_resource(available, required_skills)
-            if best_match:
-                optimization_plan[step] = {
-                    'resource': best_match,
-                    'allocation': self.calculate_optimal_allocation(step, best_match)
-                }
-        return optimization_plan
+        # Шаги в порядке важности; доступность каждого ресурса расходуется, а не переиспользуется
+        demands = [self.step_demand(step, slack=index) for index, step in enumerate(critical_steps)]
+        plan = self.solver.solve(demands, available)
+        return {
+            assignment.step: {
+                'resource': self.resources[assignment.resource_id],
+                'allocation': assignment.allocation
+            }
+            for assignment in plan.assignments
+        }
+
+    def step_demand(self, step: str, integration_id: Optional[str] = None, slack: float = 0.0) -> StepDemand:
+        requirements = self.get_step_requirements(step)
+        return StepDemand(
+            integration_id=integration_id,
+            step=step,
+            min_skill=requirements['min_skill'],
+            preferred_type=requirements['preferred_type'],
+            slack=slack
+        )
+
+    def step_demands(self, source_data: Dict) -> List[StepDemand]:
+        # Активные шаги интеграции; приоритет - по резерву шага на критическом пути
+        progress = source_data['current_progress']
+        schedule = RequestContext.of(source_data).schedule(
+            progress['steps_dependencies'], progress.get('steps_time', {})
+        )
+        return [
+            self.step_demand(step, source_data.get('source_id'), schedule.slack.get(step, 0.0))
+            for step in progress.get('active_parallel_steps', [])
+        ]
+
+    def plan_allocation(self, portfolio: Iterable[Dict]) -> AllocationPlan:
+        # Единый план по всему портфелю интеграций
+        demands = [demand for source_data in portfolio for demand in self.step_demands(source_data)]
+        return self.solver.solve(demands, self.resources.values())
 
-    def find_best_resource(self, available: List[Resource], requirements: Dict) -> Optional[Resource]:
+    def find_best_resource(self, available: Optional[List[Resource]], requirements: Dict) -> Optional[Resource]:
+        # available=None - поиск по индексу пула среди ресурсов с доступностью > 0.3
+        if available is None:
+            return self.resources.best(requirements['preferred_type'], requirements['min_skill'], 0.3)
         suitable = [
             r for r in available
             if r.skill_level >= requirements['min_skill'] and
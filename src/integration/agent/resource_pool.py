@@ -0,0 +1,323 @@
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Mapping as MappingABC
+from contextlib import contextmanager
+from dataclasses import dataclass
+from threading import RLock
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+import itertools
+
+# Больше любого id - верхняя граница ключей (availability, id) при двоичном поиске
+_MAX_ID = chr(0x10FFFF)
+# Доступность хранится с этой точностью - резервирование и возврат не накапливают ошибку округления
+_PRECISION = 9
+_EPSILON = 1e-9
+
+PENDING = 'pending'
+COMMITTED = 'committed'
+RELEASED = 'released'
+
+
+class ReservationError(RuntimeError):
+    # Резерв невозможен: не хватает доступности, ресурс изменился или резерв уже закрыт
+    pass
+
+
+class Resource:
+    """Исполнитель: компактный объект со ``__slots__`` (пулы на 10k+ человек).
+
+    Изменение ``availability`` сразу переиндексирует ресурс в пуле, к которому
+    он принадлежит, поэтому индексы не расходятся с данными. ``version``
+    растёт при каждом изменении доступности (оптимистичные блокировки).
+    """
+
+    __slots__ = ('id', 'type', 'skill_level', '_availability', 'current_project', 'version', '_pool')
+
+    def __init__(self, id: str, type: str, skill_level: int, availability: float,
+                 current_project: Optional[str] = None):
+        self.id = id
+        self.type = type
+        self.skill_level = skill_level
+        self._availability = availability
+        self.current_project = current_project
+        self.version = 0
+        self._pool: Optional['ResourcePool'] = None
+
+    @property
+    def availability(self) -> float:
+        return self._availability
+
+    @availability.setter
+    def availability(self, value: float) -> None:
+        if self._pool is None:
+            self._availability = value
+            self.version += 1
+        else:
+            self._pool._set_availability(self, value)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Resource):
+            return NotImplemented
+        return (self.id, self.type, self.skill_level, self._availability, self.current_project) == \
+            (other.id, other.type, other.skill_level, other._availability, other.current_project)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (f"Resource(id={self.id!r}, type={self.type!r}, skill_level={self.skill_level!r}, "
+                f"availability={self._availability!r}, current_project={self.current_project!r})")
+
+    def __getstate__(self) -> Tuple:
+        # Ссылка на пул не сериализуется - пул заново регистрирует свои ресурсы
+        return self.id, self.type, self.skill_level, self._availability, self.current_project
+
+    def __setstate__(self, state: Tuple) -> None:
+        self.id, self.type, self.skill_level, self._availability, self.current_project = state
+        self.version = 0
+        self._pool = None
+
+
+@dataclass
+class Reservation:
+    # Удержание доли доступности ресурсов: resource_id -> доля
+    id: int
+    owner: Optional[str]
+    holds: Mapping[str, float]
+    state: str = PENDING
+
+
+class ResourcePool(MappingABC):
+    """Реестр ресурсов с индексами по доступности и по (тип, уровень).
+
+    Индексы - отсортированные списки ключей ``(availability, id)``: общий и по
+    каждой паре (тип, уровень), плюс отсортированные уровни каждого типа.
+    Поиск лучшего исполнителя с уровнем >= N и доступностью > X - двоичный
+    поиск по нескольким уровням, выборки по порогу доступности - срез.
+    Для совместимости пул ведёт себя как словарь ``id -> Resource``.
+
+    Доступность меняется только под блокировкой пула. Конкурентные агенты
+    занимают людей через ``reserve`` -> ``commit``/``release``: проверка
+    доступности и её списание атомарны, поэтому двойного бронирования и
+    ухода в минус нет. ``versions`` в ``reserve`` позволяют применить план,
+    посчитанный вне блокировки, только если ресурсы с тех пор не менялись.
+    """
+
+    def __init__(self, resources: Iterable[Resource] = ()):
+        self._lock = RLock()
+        self._resources: Dict[str, Resource] = {}
+        self._by_availability: List[Tuple[float, str]] = []
+        self._by_class: Dict[Tuple[str, int], List[Tuple[float, str]]] = {}
+        self._skills: Dict[str, List[int]] = {}
+        self._reservations: Dict[int, Reservation] = {}
+        self._reservation_ids = itertools.count(1)
+        for resource in resources:
+            self.add(resource)
+
+    def __getitem__(self, resource_id: str) -> Resource:
+        return self._resources[resource_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._resources)
+
+    def __len__(self) -> int:
+        return len(self._resources)
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state['_lock'], state['_reservation_ids']
+        state['_next_reservation_id'] = max(self._reservations, default=0) + 1
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        next_id = state.pop('_next_reservation_id')
+        self.__dict__.update(state)
+        self._lock = RLock()
+        self._reservation_ids = itertools.count(next_id)
+        for resource in self._resources.values():
+            resource._pool = self
+
+    def add(self, resource: Resource) -> None:
+        with self._lock:
+            self._add(resource)
+
+    def _add(self, resource: Resource) -> None:
+        if resource.id in self._resources:
+            self._remove(resource.id)
+        if resource._pool is not None and resource._pool is not self:
+            raise ValueError(f"Resource {resource.id} already belongs to another pool")
+        self._resources[resource.id] = resource
+        resource._pool = self
+        key = (resource.availability, resource.id)
+        insort(self._by_availability, key)
+        class_key = (resource.type, resource.skill_level)
+        if class_key not in self._by_class:
+            self._by_class[class_key] = []
+            insort(self._skills.setdefault(resource.type, []), resource.skill_level)
+        insort(self._by_class[class_key], key)
+
+    def remove(self, resource_id: str) -> Resource:
+        with self._lock:
+            return self._remove(resource_id)
+
+    def _remove(self, resource_id: str) -> Resource:
+        resource = self._resources.pop(resource_id)
+        key = (resource.availability, resource.id)
+        _discard(self._by_availability, key)
+        class_key = (resource.type, resource.skill_level)
+        members = self._by_class[class_key]
+        _discard(members, key)
+        if not members:
+            del self._by_class[class_key]
+            _discard(self._skills[resource.type], resource.skill_level)
+        resource._pool = None
+        return resource
+
+    def _set_availability(self, resource: Resource, value: float) -> None:
+        with self._lock:
+            old = resource._availability
+            resource._availability = value
+            resource.version += 1
+            if old != value:
+                new_key = (value, resource.id)
+                for keys in (self._by_availability, self._by_class[(resource.type, resource.skill_level)]):
+                    _discard(keys, (old, resource.id))
+                    insort(keys, new_key)
+
+    def snapshot(self, resource_id: str) -> Tuple[float, int]:
+        # Согласованная пара (доступность, версия) для последующего reserve(..., versions=...)
+        with self._lock:
+            resource = self._resources[resource_id]
+            return resource._availability, resource.version
+
+    def reserve(self, holds: Mapping[str, float], owner: Optional[str] = None,
+                versions: Optional[Mapping[str, int]] = None) -> Reservation:
+        # Всё или ничего: либо удержаны все доли, либо ни одной
+        with self._lock:
+            for resource_id, amount in holds.items():
+                if amount <= 0:
+                    raise ValueError(f"Reservation amount must be positive: {resource_id}={amount}")
+                resource = self._resources.get(resource_id)
+                if resource is None:
+                    raise ReservationError(f"Unknown resource {resource_id}")
+                if versions is not None and resource_id in versions and versions[resource_id] != resource.version:
+                    raise ReservationError(f"Resource {resource_id} changed since version {versions[resource_id]}")
+                if resource._availability < amount - _EPSILON:
+                    raise ReservationError(
+                        f"Resource {resource_id} has {resource._availability} available, {amount} requested"
+                    )
+            for resource_id, amount in holds.items():
+                resource = self._resources[resource_id]
+                self._set_availability(resource, round(resource._availability - amount, _PRECISION))
+            reservation = Reservation(next(self._reservation_ids), owner, MappingProxyType(dict(holds)))
+            self._reservations[reservation.id] = reservation
+            return reservation
+
+    def reserve_best(self, amount: float, resource_type: str = 'any', min_skill: int = 0,
+                     owner: Optional[str] = None) -> Optional[Reservation]:
+        # Поиск и резерв лучшего подходящего ресурса одной атомарной операцией
+        with self._lock:
+            resource = self._best(resource_type, min_skill, amount - _EPSILON)
+            return self.reserve({resource.id: amount}, owner) if resource else None
+
+    def commit(self, reservation: Reservation) -> None:
+        # Резерв становится назначением: ресурсы закрепляются за владельцем
+        with self._lock:
+            if reservation.state != PENDING or self._reservations.get(reservation.id) is not reservation:
+                raise ReservationError(f"Reservation {reservation.id} is {reservation.state}")
+            for resource_id in reservation.holds:
+                resource = self._resources.get(resource_id)
+                if resource is not None and reservation.owner is not None:
+                    resource.current_project = reservation.owner
+            reservation.state = COMMITTED
+
+    def release(self, reservation: Reservation) -> None:
+        # Возврат удержанной доли - и для отменённого резерва, и для завершённого назначения
+        with self._lock:
+            if self._reservations.pop(reservation.id, None) is not reservation:
+                raise ReservationError(f"Reservation {reservation.id} is {reservation.state}")
+            for resource_id, amount in reservation.holds.items():
+                resource = self._resources.get(resource_id)
+                if resource is None:
+                    continue
+                self._set_availability(resource, round(resource._availability + amount, _PRECISION))
+                if reservation.state == COMMITTED and reservation.owner is not None \
+                        and resource.current_project == reservation.owner:
+                    resource.current_project = None
+            reservation.state = RELEASED
+
+    @contextmanager
+    def transaction(self, holds: Mapping[str, float], owner: Optional[str] = None,
+                    versions: Optional[Mapping[str, int]] = None) -> Iterator[Reservation]:
+        # Фиксация при успешном выходе из блока, возврат - при исключении
+        reservation = self.reserve(holds, owner, versions)
+        try:
+            yield reservation
+        except BaseException:
+            self.release(reservation)
+            raise
+        self.commit(reservation)
+
+    def reservations(self) -> List[Reservation]:
+        with self._lock:
+            return list(self._reservations.values())
+
+    def available(self, min_availability: float = 0.3) -> List[Resource]:
+        # Ресурсы с доступностью строго больше порога
+        with self._lock:
+            start = bisect_right(self._by_availability, (min_availability, _MAX_ID))
+            return [self._resources[resource_id] for _, resource_id in self._by_availability[start:]]
+
+    def below(self, max_availability: float) -> List[Resource]:
+        # Ресурсы с доступностью строго меньше порога, самые загруженные первыми
+        with self._lock:
+            end = bisect_left(self._by_availability, (max_availability, ''))
+            return [self._resources[resource_id] for _, resource_id in self._by_availability[:end]]
+
+    def _types(self, resource_type: str) -> List[str]:
+        if resource_type == 'any':
+            return list(self._skills)
+        return [resource_type] if resource_type in self._skills else []
+
+    def best(self, resource_type: str = 'any', min_skill: int = 0,
+             min_availability: Optional[float] = 0.3) -> Optional[Resource]:
+        # Максимальный уровень, при равенстве - наибольшая доступность
+        with self._lock:
+            return self._best(resource_type, min_skill, min_availability)
+
+    def _best(self, resource_type: str, min_skill: int, min_availability: Optional[float]) -> Optional[Resource]:
+        best_key = None
+        for current_type in self._types(resource_type):
+            skills = self._skills[current_type]
+            for skill in reversed(skills[bisect_left(skills, min_skill):]):
+                if best_key is not None and skill < best_key[0]:
+                    break
+                availability, resource_id = self._by_class[(current_type, skill)][-1]
+                if min_availability is None or availability > min_availability:
+                    key = (skill, availability, resource_id)
+                    if best_key is None or key > best_key:
+                        best_key = key
+                    break
+        return self._resources[best_key[2]] if best_key else None
+
+    def matching(self, resource_type: str = 'any', min_skill: int = 0,
+                 min_availability: Optional[float] = None) -> List[Resource]:
+        # Все подходящие ресурсы, лучшие первыми
+        with self._lock:
+            return self._matching(resource_type, min_skill, min_availability)
+
+    def _matching(self, resource_type: str, min_skill: int, min_availability: Optional[float]) -> List[Resource]:
+        found = []
+        for current_type in self._types(resource_type):
+            skills = self._skills[current_type]
+            for skill in skills[bisect_left(skills, min_skill):]:
+                keys = self._by_class[(current_type, skill)]
+                start = 0 if min_availability is None else bisect_right(keys, (min_availability, _MAX_ID))
+                found.extend((skill, availability, resource_id) for availability, resource_id in keys[start:])
+        found.sort(reverse=True)
+        return [self._resources[resource_id] for _, _, resource_id in found]
+
+
+def _discard(keys: List, key) -> None:
+    index = bisect_left(keys, key)
+    if index < len(keys) and keys[index] == key:
+        del keys[index]
@@ -1,5 +1,5 @@
 from typing import Dict
-from .resource_manager import Resource
+from .resource_pool import Resource
 from enum import Enum
 
 class Action(Enum):
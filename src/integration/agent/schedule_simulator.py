@@ -0,0 +1,225 @@
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import heapq
+import math
+import numpy as np
+from ..models.monte_carlo import MonteCarloSimulator
+from ..utils.step_graph import StepGraph
+from .resource_manager import ResourceManager
+
+
+@dataclass(frozen=True)
+class ScheduledStep:
+    # Моменты в днях от текущего
+    start: float
+    finish: float
+    resource_id: str
+    allocation: float
+
+
+@dataclass
+class PortfolioSchedule:
+    # Интеграция -> дней до завершения
+    completion: Dict[Any, float]
+    steps: Dict[Any, Dict[str, ScheduledStep]]
+    # Ресурс -> ступенчатая функция занятой доли: (момент, доля с этого момента)
+    utilization: Dict[str, List[Tuple[float, float]]]
+    makespan: float
+
+    def completion_dates(self, start: Optional[date] = None) -> Dict[Any, date]:
+        start = start or date.today()
+        return {
+            integration_id: start + timedelta(days=math.ceil(days - 1e-9))
+            for integration_id, days in self.completion.items()
+        }
+
+    def utilization_at(self, resource_id: str, time: float) -> float:
+        timeline = self.utilization.get(resource_id, [])
+        index = bisect_right(timeline, (time, math.inf)) - 1
+        return timeline[index][1] if index >= 0 else 0.0
+
+    def average_utilization(self, resource_id: str) -> float:
+        # Средняя занятая доля на интервале [0, makespan]
+        timeline = self.utilization.get(resource_id, [])
+        if not timeline or self.makespan <= 0:
+            return 0.0
+        total = sum(
+            share * (end - moment)
+            for (moment, share), (end, _) in zip(timeline, timeline[1:] + [(self.makespan, 0.0)])
+        )
+        return total / self.makespan
+
+
+class ScheduleSimulator:
+    """Дискретно-событийное моделирование портфеля интеграций на общем пуле.
+
+    Длительности оставшихся шагов выбираются из распределений
+    StatisticalModel (как в MonteCarloSimulator), исполнители - доли
+    доступности людей из ResourceManager (те же назначения, что у
+    AllocationSolver). Готовый шаг ждёт свободного исполнителя подходящего
+    типа и уровня; из ожидающих первыми запускаются уже идущие шаги, затем -
+    с самым длинным оставшимся путём до конца интеграции. Исполнитель
+    выбирается наименее квалифицированный из подходящих, чтобы старшие
+    оставались для требовательных шагов.
+
+    Очередь событий - куча завершений, ожидающие шаги - кучи по группам
+    требований (их немного), поэтому запуск шага стоит O(log n).
+    """
+
+    def __init__(self, resource_manager: Optional[ResourceManager] = None,
+                 simulator: Optional[MonteCarloSimulator] = None):
+        self.resource_manager = resource_manager or ResourceManager()
+        self.simulator = simulator or MonteCarloSimulator()
+
+    def run(self, portfolio: Iterable[Dict], seed: Optional[int] = None) -> PortfolioSchedule:
+        portfolio = list(portfolio)
+        integration_ids = [source_data.get('source_id', index) for index, source_data in enumerate(portfolio)]
+        if len(set(integration_ids)) != len(integration_ids):
+            raise ValueError("Integration ids in the portfolio must be unique")
+
+        # Шаги всех интеграций в одной нумерации; внутри интеграции - топологический порядок
+        names: List[str] = []
+        owners: List[int] = []
+        pending: List[int] = []
+        successors: List[List[int]] = []
+        elapsed: List[float] = []
+        active: List[bool] = []
+        for index, source_data in enumerate(portfolio):
+            progress = source_data['current_progress']
+            graph = StepGraph.from_dependencies(progress['steps_dependencies'])
+            completed = progress.get('steps_history', {})
+            steps_time = progress.get('steps_time', {})
+            active_steps = set(progress.get('active_parallel_steps', ()))
+            local: Dict[str, int] = {}
+            for step in graph.order:
+                if step in completed:
+                    continue
+                node = local[step] = len(names)
+                names.append(step)
+                owners.append(index)
+                predecessors = [local[p] for p in graph.predecessors[step] if p in local]
+                pending.append(len(predecessors))
+                successors.append([])
+                for predecessor in predecessors:
+                    successors[predecessor].append(node)
+                elapsed.append(float(steps_time.get(step, 0.0)))
+                active.append(step in active_steps)
+
+        durations = self._sample_durations(names, elapsed, np.random.default_rng(
+            self.simulator.seed if seed is None else seed
+        ))
+        # Оставшийся путь до конца интеграции: преемники всегда имеют больший номер
+        tail = [0.0] * len(names)
+        for node in range(len(names) - 1, -1, -1):
+            tail[node] = durations[node] + max((tail[s] for s in successors[node]), default=0.0)
+
+        groups, accepted, free = self._resource_groups(set(names))
+        group_of = [groups[step] for step in names]
+
+        waiting: List[List[Tuple]] = [[] for _ in accepted]
+
+        def make_ready(node: int) -> None:
+            heapq.heappush(waiting[group_of[node]], (not active[node], -tail[node], node))
+
+        for node, count in enumerate(pending):
+            if count == 0:
+                make_ready(node)
+
+        events: List[Tuple[float, int]] = []
+        starts = [0.0] * len(names)
+        slots: List[Optional[Tuple]] = [None] * len(names)
+        busy = {resource_id: 0.0 for resource_id in self.resource_manager.resources}
+        timelines = {resource_id: [(0.0, 0.0)] for resource_id in busy}
+
+        def mark(resource_id: str, now: float, delta: float) -> None:
+            busy[resource_id] = round(busy[resource_id] + delta, 9)
+            timeline = timelines[resource_id]
+            if timeline[-1][0] == now:
+                timeline[-1] = (now, busy[resource_id])
+            else:
+                timeline.append((now, busy[resource_id]))
+
+        def dispatch(now: float) -> None:
+            while True:
+                chosen = None
+                for group, queue in enumerate(waiting):
+                    if queue and (chosen is None or queue[0] < waiting[chosen][0]) \
+                            and any(free[c] for c in accepted[group]):
+                        chosen = group
+                if chosen is None:
+                    return
+                node = heapq.heappop(waiting[chosen])[2]
+                resource_class = next(c for c in accepted[chosen] if free[c])
+                resource_id, share = free[resource_class].pop()
+                slots[node] = (resource_class, resource_id, share)
+                starts[node] = now
+                mark(resource_id, now, share)
+                heapq.heappush(events, (now + durations[node], node))
+
+        completion = [0.0] * len(portfolio)
+        dispatch(0.0)
+        while events:
+            now, node = heapq.heappop(events)
+            resource_class, resource_id, share = slots[node]
+            free[resource_class].append((resource_id, share))
+            mark(resource_id, now, -share)
+            completion[owners[node]] = max(completion[owners[node]], now)
+            for successor in successors[node]:
+                pending[successor] -= 1
+                if pending[successor] == 0:
+                    make_ready(successor)
+            # Все завершения одного момента освобождают ресурсы до следующего распределения
+            if not events or events[0][0] > now:
+                dispatch(now)
+
+        steps: Dict[Any, Dict[str, ScheduledStep]] = {integration_id: {} for integration_id in integration_ids}
+        for node, (_, resource_id, share) in enumerate(slots):
+            steps[integration_ids[owners[node]]][names[node]] = ScheduledStep(
+                starts[node], starts[node] + durations[node], resource_id, share
+            )
+        return PortfolioSchedule(
+            completion=dict(zip(integration_ids, completion)),
+            steps=steps,
+            utilization=timelines,
+            makespan=max(completion, default=0.0)
+        )
+
+    def _sample_durations(self, names: List[str], elapsed: List[float],
+                          rng: np.random.Generator) -> List[float]:
+        # Одна выборка на шаг: из таблицы распределения шага, не меньше уже затраченного времени
+        nodes_by_step: Dict[str, List[int]] = {}
+        for node, step in enumerate(names):
+            nodes_by_step.setdefault(step, []).append(node)
+        durations = np.empty(len(names))
+        for (step, nodes), table in zip(nodes_by_step.items(), self.simulator.step_tables(list(nodes_by_step))):
+            durations[nodes] = table[rng.integers(0, len(table), size=len(nodes))] if len(table) > 1 else table[0]
+        spent = np.asarray(elapsed, dtype=float)
+        return (np.maximum(durations, spent) - spent).tolist()
+
+    def _resource_groups(self, steps: Iterable[str]) -> Tuple[Dict[str, int], List[List[Tuple]], Dict[Tuple, List]]:
+        # Шаги с одинаковыми требованиями ждут в общей очереди; для каждой группы -
+        # подходящие классы (тип, уровень) исполнителей, от младших к старшим
+        manager = self.resource_manager
+        free = {
+            resource_class: list(reversed(class_slots))
+            for resource_class, class_slots in manager.solver.slots(manager.resources.values()).items()
+        }
+        groups: Dict[str, int] = {}
+        keys: Dict[Tuple[str, int], int] = {}
+        accepted: List[List[Tuple]] = []
+        for step in sorted(steps):
+            demand = manager.step_demand(step)
+            key = (demand.preferred_type, demand.min_skill)
+            if key not in keys:
+                classes = sorted((c for c in free if demand.accepts(*c)), key=lambda c: (c[1], c[0]))
+                if not classes:
+                    raise ValueError(
+                        f"No resource can perform step {step}: "
+                        f"needs {demand.preferred_type} with skill >= {demand.min_skill}"
+                    )
+                keys[key] = len(accepted)
+                accepted.append(classes)
+            groups[step] = keys[key]
+        return groups, accepted, free
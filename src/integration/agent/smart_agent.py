@@ -1,9 +1,14 @@
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple
 from enum import Enum
+from .analysis_cache import AnalysisCache, CachedAnalysis, snapshot_inputs
 from .rules import decide_resource_allocation
-from .resource_manager import ResourceManager, Resource
+from .resource_manager import ResourceManager
+from .resource_pool import Resource
 from .ml_predictor import MLPredictor
 from ..predictor import IntegrationPredictor
+from ..utils.context import CONTEXT_KEY, RequestContext
+from ..utils.settings import get_settings
+from ..registry import ComponentRegistry
 from ..handlers import *
 
 class Action(Enum):
@@ -12,14 +17,19 @@ class Action(Enum):
     CONTINUE_MONITORING = "continue"
 
 class IntegrationSmartAgent:
-    def __init__(self):
+    def __init__(self, registry: Optional[ComponentRegistry] = None):
+        # Общие модели создаются один раз и внедряются во все обработчики
+        self.registry = registry or ComponentRegistry()
+        statistical_model = self.registry.get('statistical_model')
+        predictor = self.registry.get('predictor')
+
         # Инициализация обработчиков
-        self.ml_handler = MLPredictorHandler()
-        self.statistical_handler = StatisticalHandler()
-        self.factor_handler = FactorHandler()
-        self.warning_handler = WarningHandler()
-        self.predictor_handler = PredictorHandler()
-        self.target_handler = TargetHandler()
+        self.ml_handler = MLPredictorHandler(self.registry.get('ml_predictor'))
+        self.statistical_handler = StatisticalHandler(statistical_model, predictor)
+        self.factor_handler = FactorHandler(self.registry.get('factor_analysis'), statistical_model)
+        self.warning_handler = WarningHandler(self.registry.get('early_warning'))
+        self.predictor_handler = PredictorHandler(predictor)
+        self.target_handler = TargetHandler(self.registry.get('target'))
         
         # Построение цепочки
         print("Инициализация цепочки обработчиков")
@@ -30,20 +40,81 @@ class IntegrationSmartAgent:
         self.warning_handler.set_next(self.predictor_handler)
         self.predictor_handler.set_next(self.target_handler)
         print("Цепочка обработчиков построена")
+        # Тот же набор обработчиков, скомпилированный в DAG: независимые выполняются параллельно
+        self.pipeline = HandlerPipeline([
+            self.ml_handler,
+            self.statistical_handler,
+            self.factor_handler,
+            self.warning_handler,
+            self.predictor_handler,
+            self.target_handler
+        ])
         
         # Дополнительные компоненты
-        self.resource_manager = ResourceManager()
-        self.ml_model = MLPredictor()
+        self.resource_manager = self.registry.get('resource_manager')
+        self.ml_model = self.registry.get('ml_predictor')
+        self.statistical_model = statistical_model
+        # Прошлые результаты цепочки по source_id - для дельта-пересчёта в reanalyze
+        self.analysis_cache = AnalysisCache()
 
     def analyze_integration(self, source_data: Dict) -> Dict:
         # Запуск цепочки обработки
         print("\nЗапуск цепочки обработки")
         print(f"Первый обработчик: {self.ml_handler.__class__.__name__}")
-        chain_result = self.ml_handler.handle(source_data)
+        RequestContext.attach(source_data)
+        chain_result = self.pipeline.run(source_data)
         print("\nРезультат цепочки обработчиков:", chain_result)
-        # Анализ результатов и генерация рекомендаций
-        risks = chain_result.get('ml_analysis', [])
+        return self.build_result(chain_result, self.resource_manager.get_current_allocation())
+
+    def reanalyze(self, source_data: Dict) -> Dict:
+        # Повторный анализ той же интеграции (цикл мониторинга): перезапускаются только
+        # обработчики, чьи входные поля изменились с прошлого запуска, а значения кэша,
+        # не зависящие от изменений (сложность, метрики шагов, корреляции...), переносятся.
+        # Смена истории шагов в модели, настроек или ML-модели - полный пересчёт.
+        key = source_data.get('source_id')
+        if key is None:
+            return self.analyze_integration(source_data)
+        inputs = snapshot_inputs(source_data)
+        state = self.model_state()
+        entry, changed = self.analysis_cache.lookup(key, inputs, state)
+        if entry is None:
+            RequestContext.attach(source_data)
+            chain_result = self.pipeline.run(source_data)
+        else:
+            print(f"\nДельта-пересчёт {key}, изменились поля: {', '.join(sorted(changed)) or 'нет'}")
+            source_data.update(entry.outputs)
+            source_data[CONTEXT_KEY] = entry.context.carry_over(changed)
+            chain_result = self.pipeline.rerun(source_data, changed)
+        self.analysis_cache.store(key, CachedAnalysis(
+            inputs=inputs,
+            state=state,
+            outputs={name: chain_result[name] for name in self.pipeline.outputs if name in chain_result},
+            context=RequestContext.of(chain_result)
+        ))
+        return self.build_result(chain_result, self.resource_manager.get_current_allocation())
+
+    def model_state(self) -> Tuple:
+        history = self.statistical_model.historical_data
+        return (
+            history,
+            history.revision,
+            get_settings(),
+            # Модель обучается при первом обращении - так же, как при первом анализе
+            self.ml_model.model
+        )
+
+    def analyze_batch(self, batch: Iterable[Dict]) -> List[Dict]:
+        # Пакетный анализ: каждый обработчик обрабатывает весь пакет за один вызов,
+        # состояние ресурсов снимается один раз. Результаты - в порядке входа.
+        items = list(batch)
+        for source_data in items:
+            RequestContext.attach(source_data)
+        chain_results = self.pipeline.run_batch(items)
         resources = self.resource_manager.get_current_allocation()
+        return [self.build_result(chain_result, resources) for chain_result in chain_results]
+
+    def build_result(self, chain_result: Dict, resources: Dict) -> Dict:
+        # Анализ результатов и генерация рекомендаций
         critical_steps = self.identify_critical_steps(chain_result)
         
         # Формируем финальный результат
@@ -55,12 +126,13 @@ class IntegrationSmartAgent:
             'prediction': chain_result.get('prediction', {}),
             'completion_probability': chain_result.get('completion_probability', 0),
             'risks': chain_result.get('risks', []),
-            'resource_status': self.resource_manager.get_current_allocation(),
+            'resource_status': resources,
+            'cache_stats': RequestContext.of(chain_result).stats,
             'recommendations': self.generate_recommendations(
                 chain_result.get('prediction', {}),
                 chain_result.get('risks', []),
-                self.resource_manager.get_current_allocation(),
-                self.identify_critical_steps(chain_result)
+                resources,
+                critical_steps
             )
         }
 
@@ -114,7 +186,7 @@ class IntegrationSmartAgent:
             elif util_data['used'] < 0.3:
                 recommendations.append(f"Низкая загрузка ресурса {resource_id} ({util_data['type']})")
 
-        # Рекомендации по распределению ресурсов
+        # Рекомендации по распределению ресурсов - по тому же снимку, что и resource_status
         available_senior = [r for r in resources['resource_details'].items() 
                            if r[1]['skill_level'] > 7 and r[1]['availability'] > 0.3]
         if available_senior:
@@ -1,7 +1,17 @@
-from .base import IntegrationHandler
-from .ml_handler import MLPredictorHandler
-from .statistical_handler import StatisticalHandler
-from .factor_handler import FactorHandler
-from .warning_handler import WarningHandler
-from .predictor_handler import PredictorHandler
-from .target_handler import TargetHandler
+from ..lazy import lazy_exports
+
+# Модули загружаются при первом обращении к имени - см. lazy_exports
+_EXPORTS = {
+    'IntegrationHandler': '.base',
+    'MLPredictorHandler': '.ml_handler',
+    'StatisticalHandler': '.statistical_handler',
+    'FactorHandler': '.factor_handler',
+    'WarningHandler': '.warning_handler',
+    'PredictorHandler': '.predictor_handler',
+    'TargetHandler': '.target_handler',
+    'HandlerPipeline': '.pipeline',
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,7 +1,18 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
 
 class IntegrationHandler(ABC):
+    # Ключи source_data, которые обработчик читает и в которые пишет.
+    # По ним HandlerPipeline строит граф зависимостей между обработчиками.
+    reads: Tuple[str, ...] = ()
+    writes: Tuple[str, ...] = ()
+    # Входные поля (characteristics и поля current_progress), от которых зависит результат.
+    # None - неизвестно, обработчик перезапускается при любом дельта-пересчёте.
+    input_fields: Optional[Tuple[str, ...]] = None
+    # Обработчики, которые в основном ждут I/O, в asyncio-режиме выполняются в пуле потоков
+    io_bound: bool = False
+
     def __init__(self):
         self._next_handler = None
         
@@ -10,8 +21,31 @@ class IntegrationHandler(ABC):
         self._next_handler = handler
         return handler
         
-    @abstractmethod
     def handle(self, data: Dict) -> Dict:
+        self.process(data)
         if self._next_handler:
             return self._next_handler.handle(data)
         return data
+
+    def analyze_batch(self, batch: Iterable[Dict]) -> List[Dict]:
+        # Пакетная обработка: каждый обработчик проходит весь пакет целиком,
+        # затем передаёт его дальше по цепочке. Порядок элементов сохраняется.
+        items = list(batch)
+        self.process_batch(items)
+        if self._next_handler:
+            return self._next_handler.analyze_batch(items)
+        return items
+
+    @abstractmethod
+    def process(self, data: Dict) -> None:
+        pass
+
+    def process_batch(self, items: List[Dict]) -> None:
+        for data in items:
+            self.process(data)
+
+    async def aprocess(self, data: Dict) -> None:
+        if self.io_bound:
+            await asyncio.to_thread(self.process, data)
+        else:
+            self.process(data)
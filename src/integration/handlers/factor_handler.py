@@ -1,44 +1,78 @@
-from typing import Dict
+from typing import Dict, List, Optional
 from .base import IntegrationHandler
 from ..models.factor import FactorAnalysis
 from ..models.statistical import StatisticalModel
-from ..utils.calculations import calculate_step_correlations
+from ..utils.context import RequestContext
 
 class FactorHandler(IntegrationHandler):
-    def __init__(self):
+    reads = ('characteristics', 'current_progress')
+    writes = ('factor_analysis',)
+    input_fields = ('characteristics', 'active_parallel_steps', 'steps_history', 'steps_dependencies')
+
+    def __init__(self, factor_analysis: Optional[FactorAnalysis] = None,
+                 statistical_model: Optional[StatisticalModel] = None):
         super().__init__()
-        self.factor_analysis = FactorAnalysis()
-        self.statistical_model = StatisticalModel()
+        self.factor_analysis = factor_analysis or FactorAnalysis()
+        self.statistical_model = statistical_model or StatisticalModel()
         
-    def handle(self, data: Dict) -> Dict:
-        complexity = self.factor_analysis.calculate_multiplier(data['characteristics'])
-        trends = self.analyze_trends(data)
-        correlations = calculate_step_correlations(data['current_progress']['steps_history'])
+    def process(self, data: Dict) -> None:
+        complexity = RequestContext.of(data).complexity(self.factor_analysis, data['characteristics'])
+        data['factor_analysis'] = self.analyze(data, complexity)
+
+    def process_batch(self, items: List[Dict]) -> None:
+        # Множители сложности - одним векторным расчетом, тренды - один раз на шаг
+        complexities = self.factor_analysis.calculate_multipliers(
+            [data['characteristics'] for data in items]
+        )
+        steps = {
+            step
+            for data in items
+            for step in data['current_progress']['active_parallel_steps']
+        }
+        step_trends = {
+            step: (
+                self.statistical_model.analyze_trends(step),
+                self.statistical_model.analyze_delay_distribution(step)
+            )
+            for step in steps
+        }
+        for data, complexity in zip(items, complexities):
+            data['factor_analysis'] = self.analyze(data, float(complexity), step_trends)
+
+    def analyze(self, data: Dict, complexity: float, step_trends: Optional[Dict] = None) -> Dict:
+        context = RequestContext.of(data)
+        trends = self.analyze_trends(data, step_trends)
+        correlations = context.correlations(data['current_progress']['steps_history'])
         
-        data['factor_analysis'] = {
+        return {
             'complexity': complexity,
             'trends': trends,
             'correlations': correlations,
             'step_complexity': self.calculate_steps_complexity(data)
         }
-        return super().handle(data)
 
-    def analyze_trends(self, data: Dict) -> Dict:
+    def analyze_trends(self, data: Dict, step_trends: Optional[Dict] = None) -> Dict:
         active_steps = data['current_progress']['active_parallel_steps']
+        if step_trends is None:
+            context = RequestContext.of(data)
+            step_trends = {
+                step: (
+                    context.step_trends(self.statistical_model, step),
+                    context.delay_distribution(self.statistical_model, step)
+                )
+                for step in active_steps
+            }
         return {
             'execution_trends': {
-                step: self.statistical_model.analyze_trends(step) 
+                step: step_trends[step][0]
                 for step in active_steps
             },
             'delay_distribution': {
-                step: self.statistical_model.analyze_delay_distribution(step)
+                step: step_trends[step][1]
                 for step in active_steps
             }
         }
 
     def calculate_steps_complexity(self, data: Dict) -> Dict:
         dependencies = data['current_progress']['steps_dependencies']
-        return {
-            step: self.factor_analysis.calculate_step_complexity(step, dependencies)
-            for step in dependencies.keys()
-        }
+        return RequestContext.of(data).steps_complexity(self.factor_analysis, dependencies)
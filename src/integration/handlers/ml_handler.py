@@ -1,26 +1,39 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from .base import IntegrationHandler
 from ..agent.ml_predictor import MLPredictor
-from ..utils.calculations import analyze_parallel_risks, get_parallel_risk_status
+from ..utils.calculations import get_parallel_risk_status
+from ..utils.context import RequestContext
 
 class MLPredictorHandler(IntegrationHandler):
-    def __init__(self):
+    reads = ('characteristics', 'current_progress')
+    writes = ('ml_analysis',)
+    input_fields = ('characteristics', 'active_parallel_steps', 'steps_time', 'steps_dependencies')
+
+    def __init__(self, ml_predictor: Optional[MLPredictor] = None):
         super().__init__()
-        self.ml_predictor = MLPredictor()
+        self.ml_predictor = ml_predictor or MLPredictor()
         
-    def handle(self, data: Dict) -> Dict:
+    def process(self, data: Dict) -> None:
         patterns = self.ml_predictor.analyze_patterns(data)
+        data['ml_analysis'] = self.build_analysis(data, patterns)
+
+    def process_batch(self, items: List[Dict]) -> None:
+        # Один векторный predict на весь пакет
+        batch_patterns = self.ml_predictor.analyze_patterns_batch(items)
+        for data, patterns in zip(items, batch_patterns):
+            data['ml_analysis'] = self.build_analysis(data, patterns)
+
+    def build_analysis(self, data: Dict, patterns: List[Dict]) -> Dict:
         parallel_risks = self.analyze_parallel_risks(data)
         
-        data['ml_analysis'] = {
+        return {
             'patterns': patterns,
             'parallel_risks': parallel_risks,
             'risks': self.detect_risks(patterns)
         }
-        return super().handle(data)
 
     def analyze_parallel_risks(self, data: Dict) -> Dict:
-        risk = analyze_parallel_risks(
+        risk = RequestContext.of(data).parallel_risk(
             data['current_progress']['active_parallel_steps'],
             data['current_progress']['steps_dependencies']
         )
@@ -0,0 +1,143 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from threading import Lock
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+import asyncio
+import os
+from .base import IntegrationHandler
+
+
+class HandlerPipeline:
+    """Скомпилированный конвейер обработчиков.
+
+    По объявленным ``reads``/``writes`` строит DAG: обработчик зависит от
+    предшествующих в списке, если читает или перезаписывает их результат,
+    либо пишет ключ, который они читают. Независимые обработчики выполняются
+    параллельно, так что задержка запроса определяется самой длинной цепочкой.
+    """
+
+    def __init__(self, handlers: Iterable[IntegrationHandler], max_workers: Optional[int] = None):
+        self.handlers: List[IntegrationHandler] = list(handlers)
+        self.dependencies: List[FrozenSet[int]] = self._compile()
+        self.stages: List[List[IntegrationHandler]] = self._build_stages()
+        self.max_workers = max_workers or max((len(stage) for stage in self.stages), default=1)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_pid = None
+        self._lock = Lock()
+
+    def _compile(self) -> List[FrozenSet[int]]:
+        dependencies = []
+        for i, handler in enumerate(self.handlers):
+            reads, writes = set(handler.reads), set(handler.writes)
+            dependencies.append(frozenset(
+                j for j, previous in enumerate(self.handlers[:i])
+                if set(previous.writes) & (reads | writes) or set(previous.reads) & writes
+            ))
+        return dependencies
+
+    def _build_stages(self) -> List[List[IntegrationHandler]]:
+        # Уровни DAG - для диагностики и подбора размера пула
+        levels = []
+        for deps in self.dependencies:
+            levels.append(1 + max((levels[j] for j in deps), default=-1))
+        stages = [[] for _ in range(max(levels, default=-1) + 1)]
+        for handler, level in zip(self.handlers, levels):
+            stages[level].append(handler)
+        return stages
+
+    def run(self, data: Dict) -> Dict:
+        self._execute(lambda handler: handler.process(data))
+        return data
+
+    @property
+    def outputs(self) -> Tuple[str, ...]:
+        return tuple(key for handler in self.handlers for key in handler.writes)
+
+    def affected(self, changed_fields: Iterable[str]) -> FrozenSet[int]:
+        # Обработчики, чьи входные поля изменились, и те, кто читает их результаты
+        changed = set(changed_fields)
+        affected = set()
+        for index, handler in enumerate(self.handlers):
+            fields = handler.input_fields
+            if fields is None or changed.intersection(fields) or any(
+                set(self.handlers[j].writes) & set(handler.reads) for j in affected
+            ):
+                affected.add(index)
+        return frozenset(affected)
+
+    def rerun(self, data: Dict, changed_fields: Iterable[str]) -> Dict:
+        # Дельта-пересчёт: результаты незатронутых обработчиков уже лежат в data
+        affected = self.affected(changed_fields)
+        if affected:
+            self._execute(lambda handler: handler.process(data), affected)
+        return data
+
+    def run_batch(self, batch: Iterable[Dict]) -> List[Dict]:
+        items = list(batch)
+        self._execute(lambda handler: handler.process_batch(items))
+        return items
+
+    async def arun(self, data: Dict) -> Dict:
+        tasks = []
+
+        async def run_handler(index: int) -> None:
+            await asyncio.gather(*(tasks[j] for j in self.dependencies[index]))
+            await self.handlers[index].aprocess(data)
+
+        for index in range(len(self.handlers)):
+            tasks.append(asyncio.ensure_future(run_handler(index)))
+        await asyncio.gather(*tasks)
+        return data
+
+    def _execute(self, call: Callable[[IntegrationHandler], None],
+                 only: Optional[FrozenSet[int]] = None) -> None:
+        executor = self._get_executor()
+        done = set() if only is None else set(range(len(self.handlers))) - only
+        running = {}
+
+        def submit_ready() -> None:
+            for index, deps in enumerate(self.dependencies):
+                if index not in done and index not in running.values() and deps <= done:
+                    running[executor.submit(call, self.handlers[index])] = index
+
+        submit_ready()
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index = running.pop(future)
+                try:
+                    future.result()
+                except BaseException:
+                    for pending in running:
+                        pending.cancel()
+                    raise
+                done.add(index)
+            submit_ready()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # После fork потоки родительского пула в дочернем процессе не существуют
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='handler-pipeline'
+                    )
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def close(self) -> None:
+        if self._executor is not None:
+            if self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __getstate__(self) -> Dict:
+        # Пул потоков не переносится в другие процессы - там создаётся заново
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        state['_lock'] = None
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = Lock()
@@ -1,13 +1,16 @@
-from typing import Dict
+from typing import Dict, Optional
 from .base import IntegrationHandler
 from ..predictor import IntegrationPredictor
 
 class PredictorHandler(IntegrationHandler):
-    def __init__(self):
+    reads = ('characteristics', 'current_progress')
+    writes = ('prediction',)
+    input_fields = ('characteristics', 'active_parallel_steps', 'steps_time', 'steps_history', 'steps_dependencies')
+
+    def __init__(self, predictor: Optional[IntegrationPredictor] = None):
         super().__init__()
-        self.predictor = IntegrationPredictor()
+        self.predictor = predictor or IntegrationPredictor()
         
-    def handle(self, data: Dict) -> Dict:
+    def process(self, data: Dict) -> None:
         prediction = self.predictor.predict_completion(data)
         data['prediction'] = prediction
-        return super().handle(data)
@@ -1,15 +1,37 @@
-from typing import Dict
+from typing import Callable, Dict, List, Optional
 from .base import IntegrationHandler
 from ..models.statistical import StatisticalModel
-from ..utils.calculations import get_standard_time
+from ..utils.context import RequestContext
 from ..predictor import IntegrationPredictor
 class StatisticalHandler(IntegrationHandler):
-    def __init__(self):
+    reads = ('characteristics', 'current_progress', 'ml_analysis')
+    writes = ('statistical_analysis',)
+    input_fields = ('characteristics', 'active_parallel_steps', 'steps_time', 'steps_history', 'steps_dependencies')
+
+    def __init__(self, statistical_model: Optional[StatisticalModel] = None,
+                 predictor: Optional[IntegrationPredictor] = None):
         super().__init__()
-        self.statistical_model = StatisticalModel()
-        self.predictor = IntegrationPredictor()
+        self.statistical_model = statistical_model or StatisticalModel()
+        self.predictor = predictor or IntegrationPredictor(statistical_model=self.statistical_model)
         
-    def handle(self, data: Dict) -> Dict:
+    def process(self, data: Dict) -> None:
+        context = RequestContext.of(data)
+        data['statistical_analysis'] = self.analyze(
+            data, lambda step: context.step_metrics(self.statistical_model, step)
+        )
+
+    def process_batch(self, items: List[Dict]) -> None:
+        # Метрики шагов считаем один раз на пакет для всех встречающихся шагов
+        steps = {
+            step
+            for data in items
+            for step in data['current_progress']['active_parallel_steps']
+        }
+        metrics = {step: self.statistical_model.calculate_metrics(step) for step in steps}
+        for data in items:
+            data['statistical_analysis'] = self.analyze(data, metrics.__getitem__)
+
+    def analyze(self, data: Dict, step_metrics: Callable[[str], Dict]) -> Dict:
         # print("\n=== StatisticalHandler START ===")
         # print("1. Получены данные:", data)
          # 1. Получаем ML-риски (результат предыдущего обработчика)
@@ -25,7 +47,7 @@ class StatisticalHandler(IntegrationHandler):
         stats = {}
         for step in active_steps:
             # Базовая статистика
-            base_metrics = self.statistical_model.calculate_metrics(step)
+            base_metrics = step_metrics(step)
             # print(f"4. Метрики для {step}:", base_metrics)
 
             # Корректируем с учетом ML-рисков
@@ -35,7 +57,7 @@ class StatisticalHandler(IntegrationHandler):
             stats[step] = {
                 'metrics': base_metrics,
                 'current_time': current_time,
-                'standard_time': get_standard_time(step)
+                'standard_time': RequestContext.of(data).standard_time(step)
             }
 
         # Прогресс и baseline метрики    
@@ -43,13 +65,12 @@ class StatisticalHandler(IntegrationHandler):
         baseline = self.calculate_baseline_metrics(data)
 
         # print("5. Итоговая статистика:", stats)
-        data['statistical_analysis'] = {
+        # print("=== StatisticalHandler END ===\n")
+        return {
             'steps': stats,
             'progress': progress,
             'baseline': baseline
         }
-        # print("=== StatisticalHandler END ===\n")
-        return super().handle(data)
 
     def calculate_progress_metrics(self, data: Dict) -> Dict:
         progress = self.predictor.calculate_progress_estimate(data)
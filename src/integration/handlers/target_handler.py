@@ -1,13 +1,16 @@
-from typing import Dict
+from typing import Dict, Optional
 from .base import IntegrationHandler
 from ..target import IntegrationTarget
 
 class TargetHandler(IntegrationHandler):
-    def __init__(self):
+    reads = ('current_progress',)
+    writes = ('completion_probability',)
+    input_fields = ('active_parallel_steps', 'steps_time', 'steps_history', 'steps_dependencies')
+
+    def __init__(self, target: Optional[IntegrationTarget] = None):
         super().__init__()
-        self.target = IntegrationTarget()
+        self.target = target or IntegrationTarget()
         
-    def handle(self, data: Dict) -> Dict:
+    def process(self, data: Dict) -> None:
         probability = self.target.calculate_completion_probability(data)
         data['completion_probability'] = probability
-        return super().handle(data)
@@ -1,16 +1,21 @@
-from typing import Dict
+from typing import Dict, Optional
 from .base import IntegrationHandler
 from ..models.early_warning import EarlyWarningSystem
+from ..utils.context import RequestContext
 
 class WarningHandler(IntegrationHandler):
-    def __init__(self):
+    reads = ('current_progress',)
+    writes = ('warning_status',)
+    input_fields = ('active_parallel_steps', 'steps_time')
+
+    def __init__(self, early_warning: Optional[EarlyWarningSystem] = None):
         super().__init__()
-        self.early_warning = EarlyWarningSystem()
+        self.early_warning = early_warning or EarlyWarningSystem()
         
-    def handle(self, data: Dict) -> Dict:
-        status = self.early_warning.check_status(
+    def process(self, data: Dict) -> None:
+        status = RequestContext.of(data).warning_status(
+            self.early_warning,
             data['current_progress']['active_parallel_steps'],
             data['current_progress']['steps_time']
         )
         data['warning_status'] = status
-        return super().handle(data)
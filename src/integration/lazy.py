@@ -0,0 +1,24 @@
+from importlib import import_module
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable, Callable]:
+    """``__getattr__``/``__dir__`` пакета, импортирующие модуль экспорта при первом обращении.
+
+    ``exports``: имя -> относительный модуль (``'.statistical'``). Импорт пакета
+    не тянет за собой numpy/sklearn, пока не понадобится конкретный класс.
+    """
+    namespace = import_module(package).__dict__
+
+    def __getattr__(name: str):
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(import_module(module, package), name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
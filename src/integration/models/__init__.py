@@ -1,9 +1,20 @@
-from .statistical import StatisticalModel
-from .early_warning import EarlyWarningSystem
-from .factor import FactorAnalysis
+from ..lazy import lazy_exports
 
-__all__ = [
-    'StatisticalModel',
-    'EarlyWarningSystem',
-    'FactorAnalysis'
-]
+# Модули загружаются при первом обращении к имени - см. lazy_exports
+_EXPORTS = {
+    'StatisticalModel': '.statistical',
+    'StepSummary': '.statistical',
+    'EarlyWarningSystem': '.early_warning',
+    'FactorAnalysis': '.factor',
+    'RunningStats': '.streaming',
+    'QuantileSketch': '.streaming',
+    'StepStream': '.streaming',
+    'MonteCarloSimulator': '.monte_carlo',
+    'CompletionDistribution': '.monte_carlo',
+    'ChunkedMonteCarlo': '.chunked_monte_carlo',
+    'SimulationEstimate': '.chunked_monte_carlo',
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
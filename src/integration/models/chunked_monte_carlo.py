@@ -0,0 +1,211 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from statistics import NormalDist
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+import math
+import multiprocessing
+import os
+import numpy as np
+from ..utils.settings import get_settings
+from ..utils.step_graph import StepGraph
+from .monte_carlo import SIMULATION_QUANTILES, MonteCarloSimulator
+from .streaming import QuantileSketch, RunningStats
+
+
+@dataclass(frozen=True)
+class _Job:
+    simulator: MonteCarloSimulator
+    dependencies: Mapping[str, List[str]]
+    completed: Mapping[str, float]
+    elapsed: Mapping[str, float]
+    target_days: float
+
+
+@dataclass(frozen=True)
+class ChunkResult:
+    # Итог одного чанка - всё, что нужно для слияния без самих выборок
+    index: int
+    count: int
+    on_time: int
+    stats: RunningStats
+    sketch: QuantileSketch
+
+
+# Задание рабочего процесса: передаётся один раз через initializer (при fork - наследуется)
+_worker_job: Optional[_Job] = None
+
+
+def _init_worker(job: _Job) -> None:
+    global _worker_job
+    _worker_job = job
+
+
+def _simulate_chunk(index: int, seed: np.random.SeedSequence, size: int,
+                    job: Optional[_Job] = None) -> ChunkResult:
+    job = job or _worker_job
+    graph = StepGraph.from_dependencies(job.dependencies)
+    samples = job.simulator.sample_completion(
+        graph, size, np.random.default_rng(seed), job.completed, job.elapsed
+    )
+    sketch = QuantileSketch()
+    sketch.add_array(samples)
+    return ChunkResult(
+        index=index,
+        count=size,
+        on_time=int(np.count_nonzero(samples <= job.target_days)),
+        stats=RunningStats.of_array(samples),
+        sketch=sketch
+    )
+
+
+@dataclass(frozen=True)
+class SimulationEstimate:
+    scenarios: int
+    chunks: int
+    target_days: float
+    probability_on_time: float
+    # Доверительный интервал Уилсона для P(срок <= target_days)
+    confidence_interval: Tuple[float, float]
+    mean: float
+    std: float
+    # Квантили по скетчу - относительная погрешность ~1%
+    quantiles: Mapping[str, float]
+    converged: bool
+
+    @property
+    def half_width(self) -> float:
+        low, high = self.confidence_interval
+        return (high - low) / 2
+
+
+class ChunkedMonteCarlo:
+    """Монте-Карло срока завершения по чанкам на пуле процессов.
+
+    Чанки по ``chunk_size`` сценариев считаются в воркерах, у каждого чанка
+    свой независимый поток RNG (``SeedSequence.spawn``). Среднее, дисперсия,
+    квантили и P(в срок) обновляются по мере поступления чанков (в порядке
+    номеров, поэтому результат не зависит от числа воркеров). Моделирование
+    останавливается, когда полуширина доверительного интервала P(в срок)
+    не больше ``tolerance``, или по достижении ``max_scenarios``.
+    """
+
+    def __init__(self, simulator: Optional[MonteCarloSimulator] = None,
+                 chunk_size: int = 50_000, max_scenarios: int = 5_000_000,
+                 tolerance: float = 0.005, confidence: float = 0.95, min_chunks: int = 2,
+                 max_workers: Optional[int] = None, mp_context=None):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be in (0, 1)")
+        self.simulator = simulator or MonteCarloSimulator()
+        self.chunk_size = chunk_size
+        self.max_scenarios = max_scenarios
+        self.tolerance = tolerance
+        self.confidence = confidence
+        self.min_chunks = min_chunks
+        self.max_workers = max_workers or os.cpu_count() or 1
+        if mp_context is None and 'fork' in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context('fork')
+        self.mp_context = mp_context
+        self._z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    def wilson_interval(self, on_time: int, count: int) -> Tuple[float, float]:
+        if count == 0:
+            return 0.0, 1.0
+        z2 = self._z ** 2
+        p = on_time / count
+        center = (p + z2 / (2 * count)) / (1 + z2 / count)
+        spread = self._z * math.sqrt(p * (1 - p) / count + z2 / (4 * count ** 2)) / (1 + z2 / count)
+        return max(0.0, center - spread), min(1.0, center + spread)
+
+    def _chunk_sizes(self) -> List[int]:
+        full, rest = divmod(self.max_scenarios, self.chunk_size)
+        return [self.chunk_size] * full + ([rest] if rest else [])
+
+    def run(self, dependencies: Mapping[str, List[str]],
+            steps_history: Optional[Mapping[str, float]] = None,
+            steps_time: Optional[Mapping[str, float]] = None,
+            target_days: Optional[float] = None,
+            seed: Optional[int] = None) -> SimulationEstimate:
+        if target_days is None:
+            target_days = get_settings().integration.target_days
+        job = _Job(
+            simulator=self.simulator,
+            dependencies=dict(dependencies),
+            completed=dict(steps_history or {}),
+            elapsed=dict(steps_time or {}),
+            target_days=target_days
+        )
+        sizes = self._chunk_sizes()
+        seeds = np.random.SeedSequence(self.simulator.seed if seed is None else seed).spawn(len(sizes))
+        count = on_time = chunks = 0
+        stats = RunningStats()
+        sketch = QuantileSketch()
+        converged = False
+        for result in self._results(job, sizes, seeds):
+            chunks += 1
+            count += result.count
+            on_time += result.on_time
+            stats = stats.merge(result.stats)
+            sketch = sketch.merge(result.sketch)
+            low, high = self.wilson_interval(on_time, count)
+            if chunks >= self.min_chunks and (high - low) / 2 <= self.tolerance:
+                converged = True
+                break
+        return SimulationEstimate(
+            scenarios=count,
+            chunks=chunks,
+            target_days=target_days,
+            probability_on_time=on_time / count,
+            confidence_interval=self.wilson_interval(on_time, count),
+            mean=stats.mean,
+            std=stats.std,
+            quantiles=MappingProxyType({
+                f"p{int(q * 100)}": sketch.quantile(q) for q in SIMULATION_QUANTILES
+            }),
+            converged=converged
+        )
+
+    def run_source(self, source_data: Dict, target_days: Optional[float] = None,
+                   seed: Optional[int] = None) -> SimulationEstimate:
+        progress = source_data['current_progress']
+        return self.run(
+            progress['steps_dependencies'],
+            steps_history=progress.get('steps_history', {}),
+            steps_time=progress.get('steps_time', {}),
+            target_days=target_days,
+            seed=seed
+        )
+
+    def _results(self, job: _Job, sizes: List[int],
+                 seeds: List[np.random.SeedSequence]) -> Iterator[ChunkResult]:
+        # Результаты чанков строго по номерам; при выходе из генератора незапущенные чанки отменяются
+        if self.max_workers == 1:
+            for index, (size, child) in enumerate(zip(sizes, seeds)):
+                yield _simulate_chunk(index, child, size, job)
+            return
+        # Не больше двух чанков на воркер в полёте - память ограничена независимо от max_scenarios
+        max_pending = self.max_workers * 2
+        with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self.mp_context,
+                                 initializer=_init_worker, initargs=(job,)) as executor:
+            submitted = 0
+            pending = set()
+            ready: Dict[int, ChunkResult] = {}
+            next_index = 0
+            try:
+                while next_index < len(sizes):
+                    while submitted < len(sizes) and len(pending) + len(ready) < max_pending:
+                        pending.add(executor.submit(_simulate_chunk, submitted, seeds[submitted], sizes[submitted]))
+                        submitted += 1
+                    if next_index not in ready:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            result = future.result()
+                            ready[result.index] = result
+                    while next_index in ready:
+                        yield ready.pop(next_index)
+                        next_index += 1
+            finally:
+                for future in pending:
+                    future.cancel()
@@ -1,6 +1,5 @@
 from typing import Dict, List
-import yaml
-from pathlib import Path
+from ..utils.settings import get_settings
 
 class EarlyWarningSystem:
     def __init__(self):
@@ -8,12 +7,10 @@ class EarlyWarningSystem:
             'yellow': 1.2,  # 20% превышение
             'red': 1.5      # 50% превышение
         }
-        self.settings = self.load_settings()
 
-    def load_settings(self):
-        config_path = Path(__file__).parent.parent.parent / 'config' / 'settings.yaml'
-        with open(config_path) as f:
-            return yaml.safe_load(f)
+    @property
+    def settings(self):
+        return get_settings()
         
     def check_status(self, active_steps: List[str], steps_time: Dict) -> str:
         # Берем максимальное отношение времени выполнения к стандартному
@@ -31,4 +28,4 @@ class EarlyWarningSystem:
         return 'green'
         
     def get_standard_time(self, step: str) -> int:
-        return self.settings['integration']['steps'][step]
+        return self.settings.integration.steps[step]
@@ -1,4 +1,7 @@
-from typing import Dict
+from typing import TYPE_CHECKING, Dict, List
+
+if TYPE_CHECKING:
+    import numpy as np
 
 class FactorAnalysis:
     def __init__(self):
@@ -23,3 +26,14 @@ class FactorAnalysis:
             if factor in self.factors:
                 multiplier *= self.factors[factor][value]
         return multiplier
+
+    def calculate_multipliers(self, characteristics: List[Dict]) -> 'np.ndarray':
+        # Векторный вариант calculate_multiplier для пакета интеграций: уровни берутся
+        # из словаря factors (любые ключи), неизвестный уровень - KeyError, как в скалярном
+        import numpy as np
+        multipliers = np.ones(len(characteristics))
+        for factor, levels in self.factors.items():
+            rows = [index for index, c in enumerate(characteristics) if factor in c]
+            if rows:
+                multipliers[rows] *= np.array([levels[characteristics[index][factor]] for index in rows])
+        return multipliers
@@ -0,0 +1,162 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
+import numpy as np
+from ..utils.settings import get_settings
+from ..utils.step_graph import StepGraph
+from .statistical import StatisticalModel
+
+SIMULATION_QUANTILES = (0.5, 0.8, 0.95)
+# Размер таблицы квантилей для шагов со взвешенным распределением (история в скетче)
+WEIGHTED_TABLE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class CompletionDistribution:
+    # Смоделированные сроки завершения интеграции (дни от старта), по возрастанию
+    samples: np.ndarray
+    target_days: float
+
+    @property
+    def scenarios(self) -> int:
+        return len(self.samples)
+
+    @property
+    def mean(self) -> float:
+        return float(self.samples.mean())
+
+    @property
+    def std(self) -> float:
+        return float(self.samples.std())
+
+    def probability(self, days: float) -> float:
+        # P(срок <= days)
+        return float(np.searchsorted(self.samples, days, side='right')) / len(self.samples)
+
+    @property
+    def probability_on_time(self) -> float:
+        return self.probability(self.target_days)
+
+    def quantile(self, q: float) -> float:
+        return float(np.quantile(self.samples, q))
+
+    @property
+    def quantiles(self) -> Mapping[str, float]:
+        values = np.quantile(self.samples, SIMULATION_QUANTILES)
+        return MappingProxyType({f"p{int(q * 100)}": float(v) for q, v in zip(SIMULATION_QUANTILES, values)})
+
+    def summary(self) -> Dict:
+        return {
+            **self.quantiles,
+            'mean': self.mean,
+            'std': self.std,
+            'target_days': self.target_days,
+            'probability_on_time': self.probability_on_time,
+            'scenarios': self.scenarios
+        }
+
+
+class MonteCarloSimulator:
+    """Моделирование срока завершения интеграции методом Монте-Карло.
+
+    Длительности шагов выбираются из исторических распределений
+    StatisticalModel (шаги без истории - стандартное время), завершённые шаги
+    берутся по факту, активные - не меньше уже затраченного времени. По DAG
+    ``steps_dependencies`` сроки складываются последовательно и берётся
+    максимум по параллельным веткам - сразу для всех сценариев.
+    """
+
+    def __init__(self, statistical_model: Optional[StatisticalModel] = None,
+                 n_scenarios: int = 100_000, seed: Optional[int] = None):
+        if n_scenarios < 1:
+            raise ValueError("n_scenarios must be positive")
+        self.statistical_model = statistical_model or StatisticalModel()
+        self.n_scenarios = n_scenarios
+        self.seed = seed
+
+    def step_tables(self, steps: List[str]) -> List[np.ndarray]:
+        # Для каждого шага - таблица значений, из которой выбираем равновероятно.
+        # Точная история - сами значения (бутстрэп); взвешенное распределение (скетч)
+        # сводится к таблице квантилей на равномерной сетке.
+        standard = get_settings().integration.steps
+        tables = []
+        for step in steps:
+            distribution = self.statistical_model.distribution(step)
+            if distribution is None:
+                tables.append(np.array([float(standard[step])]))
+                continue
+            values, probabilities = distribution
+            if np.all(probabilities == probabilities[0]):
+                tables.append(values)
+            else:
+                grid = (np.arange(WEIGHTED_TABLE_SIZE) + 0.5) / WEIGHTED_TABLE_SIZE
+                index = np.searchsorted(np.cumsum(probabilities), grid, side='right')
+                tables.append(values[np.minimum(index, len(values) - 1)])
+        return tables
+
+    def sample_durations(self, graph: StepGraph, n: int, rng: np.random.Generator,
+                         completed: Optional[Mapping[str, float]] = None,
+                         elapsed: Optional[Mapping[str, float]] = None) -> np.ndarray:
+        # Матрица (сценарии x шаги в топологическом порядке); колонки непрерывны в памяти
+        completed = completed or {}
+        elapsed = elapsed or {}
+        durations = np.empty((n, len(graph.order)), order='F')
+        tables = iter(self.step_tables([step for step in graph.order if step not in completed]))
+        for j, step in enumerate(graph.order):
+            column = durations[:, j]
+            if step in completed:
+                column.fill(completed[step])
+                continue
+            table = next(tables)
+            if len(table) == 1:
+                column.fill(table[0])
+            else:
+                np.take(table, rng.integers(0, len(table), size=n), out=column)
+            if step in elapsed:
+                np.maximum(column, elapsed[step], out=column)
+        return durations
+
+    def propagate(self, graph: StepGraph, durations: np.ndarray) -> np.ndarray:
+        # Прямой проход по DAG на месте: колонка шага превращается в его ранний финиш
+        for j, step in enumerate(graph.order):
+            predecessors = [graph.index[p] for p in graph.predecessors[step]]
+            if len(predecessors) == 1:
+                durations[:, j] += durations[:, predecessors[0]]
+            elif predecessors:
+                durations[:, j] += durations[:, predecessors].max(axis=1)
+        end = [graph.index[step] for step in graph.end_steps]
+        return durations[:, end].max(axis=1) if len(end) > 1 else durations[:, end[0]].copy()
+
+    def sample_completion(self, graph: StepGraph, n: int, rng: np.random.Generator,
+                          completed: Optional[Mapping[str, float]] = None,
+                          elapsed: Optional[Mapping[str, float]] = None) -> np.ndarray:
+        # Сроки завершения n сценариев (без сортировки)
+        return self.propagate(graph, self.sample_durations(graph, n, rng, completed, elapsed))
+
+    def simulate(self, dependencies: Mapping[str, List[str]],
+                 steps_history: Optional[Mapping[str, float]] = None,
+                 steps_time: Optional[Mapping[str, float]] = None,
+                 target_days: Optional[float] = None,
+                 n_scenarios: Optional[int] = None,
+                 seed: Optional[int] = None) -> CompletionDistribution:
+        graph = StepGraph.from_dependencies(dependencies)
+        rng = np.random.default_rng(self.seed if seed is None else seed)
+        samples = self.sample_completion(graph, n_scenarios or self.n_scenarios, rng, steps_history, steps_time)
+        samples.sort()
+        samples.flags.writeable = False
+        if target_days is None:
+            target_days = get_settings().integration.target_days
+        return CompletionDistribution(samples=samples, target_days=target_days)
+
+    def simulate_source(self, source_data: Dict, target_days: Optional[float] = None,
+                        n_scenarios: Optional[int] = None,
+                        seed: Optional[int] = None) -> CompletionDistribution:
+        progress = source_data['current_progress']
+        return self.simulate(
+            progress['steps_dependencies'],
+            steps_history=progress.get('steps_history', {}),
+            steps_time=progress.get('steps_time', {}),
+            target_days=target_days,
+            n_scenarios=n_scenarios,
+            seed=seed
+        )
@@ -1,11 +1,100 @@
-from typing import Dict, List
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
 import numpy as np
 from ..utils.calculations import get_standard_time
+from .streaming import StepStream
+
+SUMMARY_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+
+@dataclass(frozen=True)
+class StepSummary:
+    # Предрасчитанная статистика по истории одного шага
+    count: int
+    mean: float
+    median: float
+    std: float
+    quantiles: Mapping[float, float]
+    trend_factor: float
+    delay_probability: float
+    standard_time: float
+    high_delay_prob: float
+    critical_delay_prob: float
+
+
+class StepHistory(dict):
+    """История выполнения шагов: шаг -> кортеж длительностей
+    (для массивов NumPy - копия только для чтения, без поэлементной конвертации).
+
+    Любая замена истории шага сбрасывает его предрасчитанную сводку и
+    накопленный поток наблюдений (``add_observation``). ``revision`` растёт
+    при каждом изменении - по нему видно, что ранее посчитанные метрики устарели.
+    """
+
+    def __init__(self, data: Optional[Mapping[str, Iterable[float]]] = None):
+        super().__init__()
+        self.summaries: Dict[str, StepSummary] = {}
+        self.streams: Dict[str, StepStream] = {}
+        self.revision = 0
+        for step, values in (data or {}).items():
+            self[step] = values
+
+    def __setitem__(self, step: str, values: Iterable[float]) -> None:
+        if isinstance(values, np.ndarray):
+            values = np.array(values, dtype=float)
+            values.flags.writeable = False
+        else:
+            values = tuple(values)
+        super().__setitem__(step, values)
+        self._forget(step)
+
+    def __delitem__(self, step: str) -> None:
+        super().__delitem__(step)
+        self._forget(step)
+
+    def _forget(self, step: str) -> None:
+        self.summaries.pop(step, None)
+        self.streams.pop(step, None)
+        self.revision += 1
+
+    def pop(self, step: str, *default):
+        if step not in self:
+            return super().pop(step, *default)
+        values = super().pop(step)
+        self._forget(step)
+        return values
+
+    def popitem(self) -> Tuple[str, Tuple[float, ...]]:
+        step, values = super().popitem()
+        self._forget(step)
+        return step, values
+
+    def setdefault(self, step: str, values: Iterable[float] = ()):
+        if step not in self:
+            self[step] = values
+        return self[step]
+
+    def clear(self) -> None:
+        super().clear()
+        self.summaries.clear()
+        self.streams.clear()
+        self.revision += 1
+
+    def invalidate(self, step: str) -> None:
+        # Наблюдения шага изменились помимо самой истории (поток add_observation)
+        self.summaries.pop(step, None)
+        self.revision += 1
+
+    def update(self, *args, **kwargs) -> None:
+        for step, values in dict(*args, **kwargs).items():
+            self[step] = values
+
 
 class StatisticalModel:
     def __init__(self):
         # Исторические данные по времени выполнения шагов
-        self.historical_data = {
+        self.historical_data = StepHistory({
             # дни выполнения шага 1
             'step1': [3, 4, 3, 5, 3, 4],
             'step2': [7, 8, 9, 7, 8, 10],
@@ -14,38 +103,132 @@ class StatisticalModel:
             'step5': [1, 2, 1, 2, 1, 2],
             'step6': [8, 9, 8, 10, 8, 9],
             'step7': [1, 2, 1, 2, 1, 2]
-        }
+        })
+
+    def set_history(self, step: str, values: Iterable[float]) -> None:
+        self.historical_data[step] = values
+
+    def load_durations(self, durations: Mapping[str, Iterable[float]]) -> None:
+        # Полная замена истории шагов (например, из HistoricalDatabase.step_durations)
+        for step, values in durations.items():
+            self.historical_data[step] = values
+
+    def rebuild_from_database(self, database) -> None:
+        self.load_durations(database.step_durations())
+
+    def add_observation(self, step: str, days: float) -> None:
+        # Новое наблюдение уходит в поток шага (память ограничена), исходная история не растет
+        self.stream(step).add(days)
+        self.historical_data.invalidate(step)
+
+    def merge_stream(self, step: str, stream: StepStream) -> None:
+        # Слияние наблюдений, накопленных на другом шарде/узле
+        self.historical_data.streams[step] = self.stream(step).merge(stream)
+        self.historical_data.invalidate(step)
+
+    def stream(self, step: str) -> StepStream:
+        stream = self.historical_data.streams.get(step)
+        if stream is None:
+            stream = StepStream(self.historical_data.get(step, ()))
+            self.historical_data.streams[step] = stream
+        return stream
+
+    def distribution(self, step: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        # Эмпирическое распределение длительности шага: (значения, вероятности).
+        # Точная история - как есть; после перехода потока на скетч - по корзинам скетча.
+        # None - истории по шагу нет.
+        stream = self.historical_data.streams.get(step)
+        if stream is not None and not stream.is_exact:
+            points = stream.sketch.distribution()
+            values = np.array([value for value, _ in points], dtype=float)
+            weights = np.array([weight for _, weight in points], dtype=float)
+        else:
+            data = stream.values if stream is not None else self.historical_data.get(step)
+            if data is None or not len(data):
+                return None
+            values = np.asarray(data, dtype=float)
+            weights = np.ones(len(values))
+        return values, weights / weights.sum()
+
+    def summary(self, step: str) -> StepSummary:
+        summary = self.historical_data.summaries.get(step)
+        # Сводка зависит и от стандартного времени шага - оно может поменяться при перезагрузке настроек
+        if summary is None or summary.standard_time != get_standard_time(step):
+            stream = self.historical_data.streams.get(step)
+            if stream is None:
+                summary = self._summarize(step, self.historical_data[step])
+            elif stream.is_exact:
+                summary = self._summarize(step, tuple(stream.values))
+            else:
+                summary = self._summarize_stream(step, stream)
+            self.historical_data.summaries[step] = summary
+        return summary
+
+    def _summarize_stream(self, step: str, stream: StepStream) -> StepSummary:
+        # Оценка по Welford и скетчу квантилей, когда точных значений уже нет
+        standard_time = get_standard_time(step)
+        recent_trend = tuple(stream.recent)
+        trend_factor = sum(y - x for x, y in zip(recent_trend, recent_trend[1:])) / len(recent_trend)
+        sketch = stream.sketch
+        return StepSummary(
+            count=stream.count,
+            mean=stream.stats.mean,
+            median=sketch.quantile(0.5),
+            std=stream.stats.std,
+            quantiles=MappingProxyType({q: sketch.quantile(q) for q in SUMMARY_QUANTILES}),
+            trend_factor=trend_factor,
+            delay_probability=sketch.fraction_above(stream.stats.mean),
+            standard_time=standard_time,
+            high_delay_prob=sketch.fraction_above(1.2 * standard_time),
+            critical_delay_prob=sketch.fraction_above(1.5 * standard_time)
+        )
+
+    def _summarize(self, step: str, data: tuple) -> StepSummary:
+        values = np.asarray(data, dtype=float)
+        mean = float(values.mean())
+        standard_time = get_standard_time(step)
+        delays = values / standard_time
+        # Анализ последних 3 значений для тренда
+        recent_trend = [float(x) for x in data[-3:]]
+        trend_factor = sum(y - x for x, y in zip(recent_trend, recent_trend[1:])) / len(recent_trend)
+        return StepSummary(
+            count=len(values),
+            # Среднее арифметическое
+            mean=mean,
+            # Медиана - значение, которое делит набор данных на две равные части
+            median=float(np.median(values)),
+            # Стандартное отклонение - разброс значений относительно среднего
+            std=float(values.std()),
+            quantiles=MappingProxyType(dict(zip(
+                SUMMARY_QUANTILES,
+                (float(q) for q in np.quantile(values, SUMMARY_QUANTILES))
+            ))),
+            trend_factor=trend_factor,
+            delay_probability=float(np.count_nonzero(values > mean)) / len(values),
+            standard_time=standard_time,
+            high_delay_prob=float(np.count_nonzero(delays > 1.2)) / len(values),
+            critical_delay_prob=float(np.count_nonzero(delays > 1.5)) / len(values)
+        )
 
     def calculate_metrics(self, step: str) -> Dict:
-        data = self.historical_data[step]
+        summary = self.summary(step)
         return {
-            # Вычисляет среднее значение (арифметическое) элементов в массиве data.
-            'mean': np.mean(data),
-            # Находит медиану элементов в массиве data. 
-            # Медиана — это значение, которое делит набор данных на две равные части, то есть половина значений меньше медианы, а другая половина — больше.
-            'median': np.median(data),
-            # Вычисляет стандартное отклонение элементов в массиве data. 
-            # Стандартное отклонение показывает, насколько значения в наборе данных разбросаны относительно среднего значения.
-            'std': np.std(data)
+            'mean': summary.mean,
+            'median': summary.median,
+            'std': summary.std
         }
+
     def analyze_trends(self, step: str) -> Dict:
-        data = self.historical_data[step]
-        # Анализ последних 3 значений для тренда
-        recent_trend = data[-3:]
-        trend_factor = sum(y - x for x, y in zip(recent_trend, recent_trend[1:])) / len(recent_trend)
-        
+        summary = self.summary(step)
         return {
-            'trend_factor': trend_factor,
-            'std': np.std(data),
-            'delay_probability': len([x for x in data if x > np.mean(data)]) / len(data)
+            'trend_factor': summary.trend_factor,
+            'std': summary.std,
+            'delay_probability': summary.delay_probability
         }
+
     def analyze_delay_distribution(self, step: str) -> Dict:
-        data = self.historical_data[step]
-        standard_time = get_standard_time(step)
-        delays = [time/standard_time for time in data]
+        summary = self.summary(step)
         return {
-            'high_delay_prob': len([d for d in delays if d > 1.2]) / len(delays),
-            'critical_delay_prob': len([d for d in delays if d > 1.5]) / len(delays)
+            'high_delay_prob': summary.high_delay_prob,
+            'critical_delay_prob': summary.critical_delay_prob
         }
-
-
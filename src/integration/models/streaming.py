@@ -0,0 +1,207 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+import math
+
+
+class RunningStats:
+    # Среднее и дисперсия по алгоритму Уэлфорда, слияние - по формуле Чана
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @classmethod
+    def of_array(cls, values) -> 'RunningStats':
+        # Статистика массива NumPy целиком - для слияния с накопленной через merge
+        if not len(values):
+            return cls()
+        mean = float(values.mean())
+        return cls(len(values), mean, float(((values - mean) ** 2).sum()))
+
+    def merge(self, other: 'RunningStats') -> 'RunningStats':
+        count = self.count + other.count
+        if count == 0:
+            return RunningStats()
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.count / count
+        m2 = self.m2 + other.m2 + delta * delta * self.count * other.count / count
+        return RunningStats(count, mean, m2)
+
+    @property
+    def variance(self) -> float:
+        # Дисперсия генеральной совокупности - как np.var/np.std по умолчанию
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """Сливаемый скетч квантилей с относительной погрешностью (в духе DDSketch).
+
+    Значения раскладываются по логарифмическим корзинам, число корзин
+    ограничено ``max_buckets`` (при переполнении сливаются младшие корзины),
+    поэтому память не зависит от объема истории.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, weight: int = 1) -> None:
+        if value <= 0:
+            self.zero_count += weight
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + weight
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def add_array(self, values) -> None:
+        # Векторное добавление массива NumPy: ключи корзин считаются для всего массива сразу
+        import numpy as np
+        values = np.asarray(values, dtype=float)
+        if not len(values):
+            return
+        positive = values[values > 0]
+        self.zero_count += len(values) - len(positive)
+        if len(positive):
+            keys, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64),
+                                     return_counts=True)
+            for key, count in zip(keys.tolist(), counts.tolist()):
+                self.buckets[key] = self.buckets.get(key, 0) + count
+            while len(self.buckets) > self.max_buckets:
+                self._collapse()
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        merged = QuantileSketch(self.relative_accuracy, max(self.max_buckets, other.max_buckets))
+        merged.buckets = dict(self.buckets)
+        for key, count in other.buckets.items():
+            merged.buckets[key] = merged.buckets.get(key, 0) + count
+        merged.zero_count = self.zero_count + other.zero_count
+        merged.count = self.count + other.count
+        merged.min = min(self.min, other.min)
+        merged.max = max(self.max, other.max)
+        while len(merged.buckets) > merged.max_buckets:
+            merged._collapse()
+        return merged
+
+    def _collapse(self) -> None:
+        # Сливаем две младшие корзины - теряется точность только в нижнем хвосте
+        keys = sorted(self.buckets)
+        lowest, second = keys[0], keys[1]
+        self.buckets[second] += self.buckets.pop(lowest)
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return min(self.max, max(self.min, 0.0))
+        seen = self.zero_count
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return min(self.max, max(self.min, self._value(key)))
+        return self.max
+
+    def distribution(self) -> List[Tuple[float, int]]:
+        # Представительные значения корзин (по возрастанию) и их веса - для выборки из скетча
+        points = [(0.0, self.zero_count)] if self.zero_count else []
+        points.extend(
+            (min(self.max, max(self.min, self._value(key))), self.buckets[key])
+            for key in sorted(self.buckets)
+        )
+        return points
+
+    def fraction_above(self, threshold: float) -> float:
+        # Оценка доли значений строго больше threshold
+        if self.count == 0:
+            return 0.0
+        above = sum(
+            count for key, count in self.buckets.items()
+            if self._value(key) > threshold
+        )
+        if threshold < 0:
+            above += self.zero_count
+        return above / self.count
+
+
+class StepStream:
+    """Потоковая история одного шага с ограниченной памятью.
+
+    Пока наблюдений не больше ``exact_limit``, хранятся сами значения и
+    статистика считается точно; дальше остаются только Welford, скетч квантилей
+    и последние значения для тренда. Потоки разных шардов можно сливать.
+    """
+
+    def __init__(self, values: Iterable[float] = (), exact_limit: int = 256,
+                 relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.exact_limit = exact_limit
+        self.stats = RunningStats()
+        self.sketch = QuantileSketch(relative_accuracy, max_buckets)
+        self.recent = deque(maxlen=3)
+        self.values: Optional[List[float]] = []
+        for value in values:
+            self.add(value)
+
+    def add(self, value: float) -> None:
+        self.stats.add(value)
+        self.sketch.add(value)
+        self.recent.append(value)
+        if self.values is not None:
+            if len(self.values) < self.exact_limit:
+                self.values.append(value)
+            else:
+                self.values = None
+
+    def merge(self, other: 'StepStream') -> 'StepStream':
+        # other считается более поздним потоком - его последние значения определяют тренд
+        merged = StepStream(exact_limit=max(self.exact_limit, other.exact_limit))
+        merged.stats = self.stats.merge(other.stats)
+        merged.sketch = self.sketch.merge(other.sketch)
+        merged.recent.extend(self.recent)
+        merged.recent.extend(other.recent)
+        if (self.values is not None and other.values is not None
+                and len(self.values) + len(other.values) <= merged.exact_limit):
+            merged.values = self.values + other.values
+        else:
+            merged.values = None
+        return merged
+
+    @property
+    def count(self) -> int:
+        return self.stats.count
+
+    @property
+    def is_exact(self) -> bool:
+        return self.values is not None
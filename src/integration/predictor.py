@@ -1,22 +1,33 @@
-from typing import Dict
+from typing import Dict, Optional
 from .models.statistical import StatisticalModel
 from .models.early_warning import EarlyWarningSystem
 from .models.factor import FactorAnalysis
-from .utils.calculations import calculate_final_estimate, calculate_parallel_time, get_standard_time
+from .utils.calculations import calculate_final_estimate, calculate_parallel_time
+from .utils.context import RequestContext, input_key
 
 class IntegrationPredictor:
-    def __init__(self):
-        self.statistical_model = StatisticalModel()
-        self.early_warning = EarlyWarningSystem()
-        self.factor_analysis = FactorAnalysis()
+    def __init__(self, statistical_model: Optional[StatisticalModel] = None,
+                 early_warning: Optional[EarlyWarningSystem] = None,
+                 factor_analysis: Optional[FactorAnalysis] = None):
+        self.statistical_model = statistical_model or StatisticalModel()
+        self.early_warning = early_warning or EarlyWarningSystem()
+        self.factor_analysis = factor_analysis or FactorAnalysis()
         
     def calculate_progress_estimate(self, source_data: Dict) -> Dict:
+        context = RequestContext.of(source_data)
+        progress = source_data['current_progress']
+        return context.memo(
+            ('progress_estimate', input_key(progress['steps_dependencies']), input_key(progress['steps_history'])),
+            lambda: self._progress_estimate(source_data, context)
+        )
+
+    def _progress_estimate(self, source_data: Dict, context: RequestContext) -> Dict:
         # Получаем все шаги
         all_steps = source_data['current_progress']['steps_dependencies'].keys()
         
         # Baseline из статистики (34.8 дней)
         baseline_estimate = sum(
-            self.statistical_model.calculate_metrics(step)['mean'] 
+            context.step_metrics(self.statistical_model, step)['mean'] 
             for step in all_steps
         )
         
@@ -31,7 +42,7 @@ class IntegrationPredictor:
         # Расчет delay_factor
         delays = []
         for step, time in steps_history.items():
-            standard = get_standard_time(step)
+            standard = context.standard_time(step)
             delay = time / standard if standard > 0 else 1.0
             delays.append(delay)
         delay_factor = sum(delays) / len(delays) if delays else 1.0
@@ -55,65 +66,58 @@ class IntegrationPredictor:
         # Получаем максимальное время из активных шагов
         current_step_time = max(steps_time.get(step, 0) for step in active_steps)
     
-        # Получаем метрики для всех активных шагов
-        stats = {
-            step: self.statistical_model.calculate_metrics(step) 
-            for step in active_steps
-        }
-        # Используем максимальные значения из статистики
-        max_stats = {
-            'mean': max(s['mean'] for s in stats.values()),
-            'median': max(s['median'] for s in stats.values()),
-            'std': max(s['std'] for s in stats.values())
-        }
+        # Максимальные значения статистики по активным шагам
+        context = RequestContext.of(source_data)
+        max_stats = context.max_step_metrics(self.statistical_model, active_steps)
     
-        warning_status = self.early_warning.check_status(active_steps, steps_time)
-        complexity = self.factor_analysis.calculate_multiplier(
-            source_data['characteristics']
-        )
+        warning_status = context.warning_status(self.early_warning, active_steps, steps_time)
+        complexity = context.complexity(self.factor_analysis, source_data['characteristics'])
     
         parallel_time = calculate_parallel_time(source_data['current_progress'])
+
+        # Критический путь и резерв времени по шагам (один проход по DAG)
+        schedule = context.schedule(source_data['current_progress']['steps_dependencies'], steps_time)
         
         estimated_days = calculate_final_estimate(
             stats=max_stats,
             complexity=complexity,
-            current_progress=source_data['current_progress']
+            current_progress=source_data['current_progress'],
+            critical_path_time=schedule.length
         )
         return {
             'estimated_days': estimated_days,
             'warning_status': warning_status,
             'complexity_factor': complexity,
-            'statistical_data': max_stats
+            'statistical_data': max_stats,
+            'critical_path': list(schedule.critical_path),
+            'critical_path_time': schedule.length,
+            'steps_slack': dict(schedule.slack)
         }
 
     def initial_estimate(self, source_data: Dict) -> Dict:
+        context = RequestContext.of(source_data)
+        key = (
+            'initial_estimate',
+            input_key(source_data['characteristics']),
+            tuple(source_data['current_progress']['active_parallel_steps'])
+        )
+        return context.memo(key, lambda: self._initial_estimate(source_data, context))
+
+    def _initial_estimate(self, source_data: Dict, context: RequestContext) -> Dict:
         active_steps = source_data['current_progress']['active_parallel_steps']
         
-        # Получаем статистику для активных шагов
-        stats = {
-            step: self.statistical_model.calculate_metrics(step) 
-            for step in active_steps
-        }
-        
-        # Максимальное среднее время из статистики
-        max_stats = {
-            'mean': max(s['mean'] for s in stats.values()),
-            'median': max(s['median'] for s in stats.values()),
-            'std': max(s['std'] for s in stats.values())
-        }
+        # Максимальная статистика для активных шагов
+        max_stats = context.max_step_metrics(self.statistical_model, active_steps)
         
         # Считаем сложность
-        complexity = self.factor_analysis.calculate_multiplier(source_data['characteristics'])
+        complexity = context.complexity(self.factor_analysis, source_data['characteristics'])
         
         # Начальная оценка времени
         initial_time = max_stats['mean'] * complexity
         
         return {
             'initial_estimate': initial_time,
-            'standard_time': max(get_standard_time(step) for step in active_steps),
+            'standard_time': max(context.standard_time(step) for step in active_steps),
             'complexity': complexity,
             'stats': max_stats
         }
-
-
-
@@ -0,0 +1,113 @@
+from threading import RLock
+from typing import Any, Callable, Dict
+
+
+class ComponentRegistry:
+    """Контейнер общих компонентов агента.
+
+    Каждая модель создаётся один раз (при первом запросе) и внедряется во все
+    обработчики. Фабрики можно переопределить через ``register``, готовый
+    экземпляр - подставить через ``provide``.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[['ComponentRegistry'], Any]] = dict(DEFAULT_FACTORIES)
+        self._instances: Dict[str, Any] = {}
+        self._lock = RLock()
+
+    def register(self, name: str, factory: Callable[['ComponentRegistry'], Any]) -> None:
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def provide(self, name: str, instance: Any) -> None:
+        with self._lock:
+            self._instances[name] = instance
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    if name not in self._factories:
+                        raise KeyError(f"Unknown component: {name}")
+                    instance = self._factories[name](self)
+                    self._instances[name] = instance
+        return instance
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = RLock()
+
+
+def _statistical_model(registry: ComponentRegistry):
+    from .models.statistical import StatisticalModel
+    return StatisticalModel()
+
+
+def _factor_analysis(registry: ComponentRegistry):
+    from .models.factor import FactorAnalysis
+    return FactorAnalysis()
+
+
+def _early_warning(registry: ComponentRegistry):
+    from .models.early_warning import EarlyWarningSystem
+    return EarlyWarningSystem()
+
+
+def _ml_predictor(registry: ComponentRegistry):
+    # Модель обучается при первом прогнозе, а не здесь
+    from .agent.ml_predictor import MLPredictor
+    return MLPredictor()
+
+
+def _resource_manager(registry: ComponentRegistry):
+    from .agent.resource_manager import ResourceManager
+    return ResourceManager()
+
+
+def _simulator(registry: ComponentRegistry):
+    from .models.monte_carlo import MonteCarloSimulator
+    return MonteCarloSimulator(registry.get('statistical_model'))
+
+
+def _schedule_simulator(registry: ComponentRegistry):
+    from .agent.schedule_simulator import ScheduleSimulator
+    return ScheduleSimulator(registry.get('resource_manager'), registry.get('simulator'))
+
+
+def _predictor(registry: ComponentRegistry):
+    from .predictor import IntegrationPredictor
+    return IntegrationPredictor(
+        statistical_model=registry.get('statistical_model'),
+        early_warning=registry.get('early_warning'),
+        factor_analysis=registry.get('factor_analysis')
+    )
+
+
+def _target(registry: ComponentRegistry):
+    from .target import IntegrationTarget
+    return IntegrationTarget(
+        statistical_model=registry.get('statistical_model'),
+        factor_analysis=registry.get('factor_analysis'),
+        simulator=registry.get('simulator')
+    )
+
+
+DEFAULT_FACTORIES: Dict[str, Callable[[ComponentRegistry], Any]] = {
+    'statistical_model': _statistical_model,
+    'factor_analysis': _factor_analysis,
+    'early_warning': _early_warning,
+    'ml_predictor': _ml_predictor,
+    'resource_manager': _resource_manager,
+    'simulator': _simulator,
+    'schedule_simulator': _schedule_simulator,
+    'predictor': _predictor,
+    'target': _target,
+}
@@ -1,27 +1,48 @@
-from typing import Dict
+from typing import Dict, Optional
 import math
-from .utils.calculations import get_standard_time
 from .models.statistical import StatisticalModel
 from .models.factor import FactorAnalysis
-from .utils.calculations import calculate_step_correlations, get_standard_time, analyze_parallel_risks
+from .models.monte_carlo import CompletionDistribution, MonteCarloSimulator
+from .utils.calculations import get_standard_time
+from .utils.context import RequestContext, input_key
 
 
 class IntegrationTarget:
-    def __init__(self):
+    def __init__(self, statistical_model: Optional[StatisticalModel] = None,
+                 factor_analysis: Optional[FactorAnalysis] = None,
+                 simulator: Optional[MonteCarloSimulator] = None):
         self.target_days = 30
-        self.statistical_model = StatisticalModel()
-        self.factor_analysis = FactorAnalysis()
+        self.statistical_model = statistical_model or StatisticalModel()
+        self.factor_analysis = factor_analysis or FactorAnalysis()
+        self.simulator = simulator or MonteCarloSimulator(self.statistical_model)
+
+    def simulate_completion(self, source_data: Dict, n_scenarios: Optional[int] = None,
+                            seed: Optional[int] = None) -> CompletionDistribution:
+        # Распределение срока завершения (p50/p80/p95, P(срок <= target_days)) методом Монте-Карло
+        context = RequestContext.of(source_data)
+        progress = source_data['current_progress']
+        inputs = tuple(input_key(progress.get(field, {})) for field in ('steps_dependencies', 'steps_history', 'steps_time'))
+        return context.memo(
+            ('completion_distribution', n_scenarios, seed) + inputs,
+            lambda: self.simulator.simulate_source(source_data, self.target_days, n_scenarios, seed)
+        )
 
-    def calculate_completion_probability(self, source_data: Dict) -> float:
+    def calculate_completion_probability(self, source_data: Dict, mode: str = 'heuristic') -> float:
+        # mode='simulation' - вероятность уложиться в target_days по модели Монте-Карло
+        if mode == 'simulation':
+            return self.simulate_completion(source_data).probability_on_time
+        if mode != 'heuristic':
+            raise ValueError(f"Unknown completion probability mode: {mode}")
         steps_history = source_data['current_progress']['steps_history']
         steps_time = source_data['current_progress'].get('steps_time', {})
         dependencies = source_data['current_progress']['steps_dependencies']
+        context = RequestContext.of(source_data)
         
         # Рассчитываем total_time
         historical_time = sum(steps_history.values())
-        stats = self.statistical_model.calculate_metrics(f'step{max(int(step[-1]) for step in steps_history)}')
+        stats = context.step_metrics(self.statistical_model, f'step{max(int(step[-1]) for step in steps_history)}')
         current_time = sum(steps_time.values())
-        remaining_steps_time = sum(get_standard_time(f'step{i}') for i in range(len(steps_history) + 1, 8))
+        remaining_steps_time = sum(context.standard_time(f'step{i}') for i in range(len(steps_history) + 1, 8))
         
         total_time = (
             historical_time * 1.0 +
@@ -35,27 +56,25 @@ class IntegrationTarget:
         # Анализ трендов для оставшихся шагов
         remaining_steps = set(dependencies.keys()) - set(steps_history.keys())
         trends = [
-            self.statistical_model.analyze_trends(step)
+            context.step_trends(self.statistical_model, step)
             for step in remaining_steps
         ]
         
         # Учитываем сложность оставшихся шагов
-        complexities = [
-            self.factor_analysis.calculate_step_complexity(step, dependencies)
-            for step in remaining_steps
-        ]
+        steps_complexity = context.steps_complexity(self.factor_analysis, dependencies)
+        complexities = [steps_complexity[step] for step in remaining_steps]
         
         # Корреляции между шагами
-        correlations = calculate_step_correlations(steps_history)
+        correlations = context.correlations(steps_history)
         
         # Добавляем анализ параллельных рисков
-        parallel_risk = analyze_parallel_risks(
+        parallel_risk = context.parallel_risk(
             source_data['current_progress'].get('active_parallel_steps', []),
             dependencies
         )
         # Анализ распределения задержек
         delay_distributions = [
-            self.statistical_model.analyze_delay_distribution(step)
+            context.delay_distribution(self.statistical_model, step)
             for step in remaining_steps
         ]
         delay_risk = sum(d['high_delay_prob'] for d in delay_distributions) / len(delay_distributions) if delay_distributions else 0
@@ -64,7 +83,7 @@ class IntegrationTarget:
         completion_rate = (time_factor * 
             (1 - sum(t['trend_factor'] for t in trends) / len(trends)) /
             (sum(complexities) / len(complexities)) *
-            (1 - sum(correlations.values()) / len(correlations) if correlations else 1) /
+            (1 - correlations.mean_off_diagonal() if correlations else 1) /
             parallel_risk *
             (1 - delay_risk)
         )
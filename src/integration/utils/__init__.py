@@ -1,10 +1,20 @@
-from .calculations import (
-    calculate_final_estimate,
-    get_standard_time
-)
+from ..lazy import lazy_exports
 
-__all__ = [
-    'calculate_final_estimate',
-    'get_standard_time',
-    'calculate_parallel_time'
-]
+# Модули загружаются при первом обращении к имени - см. lazy_exports
+_EXPORTS = {
+    'calculate_final_estimate': '.calculations',
+    'get_standard_time': '.calculations',
+    'calculate_parallel_time': '.calculations',
+    'Settings': '.settings',
+    'SettingsStore': '.settings',
+    'get_settings': '.settings',
+    'reload_settings': '.settings',
+    'StepGraph': '.step_graph',
+    'StepSchedule': '.step_graph',
+    'CyclicDependencyError': '.step_graph',
+    'StepCorrelations': '.correlations',
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
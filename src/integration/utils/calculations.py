@@ -1,24 +1,23 @@
-from typing import Dict, List
-import yaml
-from pathlib import Path
+from typing import Dict, List, Optional
+from .settings import get_settings
+from .step_graph import StepGraph
+from .correlations import StepCorrelations
 
 def load_settings():
-    config_path = Path(__file__).parent.parent.parent / 'config' / 'settings.yaml'
-    with open(config_path) as f:
-        return yaml.safe_load(f)
+    # Общий для процесса снимок настроек (только для чтения)
+    return get_settings().raw
+
 def get_parallel_risk_status(risk: float) -> str:
-    settings = load_settings()
-    thresholds = settings['integration']['parallel_risks']
+    thresholds = get_settings().integration.parallel_risks
     
-    if risk < thresholds['safe_threshold']:
+    if risk < thresholds.safe_threshold:
         return 'safe'
-    elif risk < thresholds['warning_threshold']:
+    elif risk < thresholds.warning_threshold:
         return 'warning'
     return 'critical'
 
 def get_standard_time(step: str) -> int:
-    settings = load_settings()
-    return settings['integration']['steps'][step]
+    return get_settings().integration.steps[step]
 
 def calculate_parallel_time(current_progress: Dict) -> float:
     active_parallel = current_progress.get('active_parallel_steps', [])
@@ -30,56 +29,22 @@ def calculate_parallel_time(current_progress: Dict) -> float:
     return max(steps_time.get(step, 0) for step in active_parallel)
 
 def calculate_critical_path(dependencies: Dict, steps_time: Dict) -> float:
-    def get_path_time(step: str, visited: set) -> float:
-        # print(f"Processing step: {step}")  # Debug print
-        if step in visited:
-            return 0
-        visited.add(step)
-        
-        # Получаем время шага из steps_time или стандартное время
-        step_time = steps_time.get(step, get_standard_time(step))
-        # print(f"Step {step} time: {step_time}")
-
-        # Если нет зависимостей, возвращаем время шага
-        if not dependencies[step]:
-            return step_time
-
-        #Иначе время шага + максимальное время зависимостей 
-        max_dep_time = max(
-            get_path_time(dep, visited.copy()) 
-            for dep in dependencies[step]
-        )
-        total_time = step_time + max_dep_time
-        # print(f"Total time for {step}: {total_time}")
-        return total_time
+    # Длина самого длинного пути по DAG шагов (время шага из steps_time или стандартное)
+    return StepGraph.from_dependencies(dependencies).critical_path_time(steps_time)
 
+def calculate_step_correlations(steps_history: Dict) -> StepCorrelations:
+    return StepCorrelations(steps_history)
 
-    # Находим конечные шаги (не имеют зависящих от них)
-    end_steps = {s for s in dependencies if not any(s in deps for deps in dependencies.values())}
-    
-    # Вычисляем максимальное время критического пути
-    return max(get_path_time(step, set()) for step in end_steps)
-    
-def calculate_step_correlations(steps_history: Dict) -> Dict:
-    correlations = {}
-    for step1, time1 in steps_history.items():
-        for step2, time2 in steps_history.items():
-            if step1 != step2:
-                std1 = get_standard_time(step1)
-                std2 = get_standard_time(step2)
-                delay1 = time1 / std1
-                delay2 = time2 / std2
-                correlations[f"{step1}-{step2}"] = delay1 * delay2
-    return correlations
-
-def calculate_final_estimate(stats: Dict, complexity: float, current_progress: Dict) -> float:
+def calculate_final_estimate(stats: Dict, complexity: float, current_progress: Dict,
+                             critical_path_time: Optional[float] = None) -> float:
     dependencies = current_progress['steps_dependencies']
     steps_time = current_progress.get('steps_time', {})
     steps_history = current_progress.get('steps_history', {})
     active_steps = current_progress['active_parallel_steps']
     
     # Рассчитываем базовое время по критическому пути
-    critical_path_time = calculate_critical_path(dependencies, steps_time)
+    if critical_path_time is None:
+        critical_path_time = calculate_critical_path(dependencies, steps_time)
     
     # Максимальное время из активных параллельных шагов
     active_time = max(steps_time.get(step, 0) for step in active_steps)
@@ -0,0 +1,157 @@
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping
+from .calculations import analyze_parallel_risks, calculate_step_correlations, get_standard_time
+from .step_graph import StepGraph, StepSchedule
+
+CONTEXT_KEY = '_context'
+
+# Входные поля (characteristics и поля current_progress), от которых зависит значение
+# в кэше, по имени ключа memo. При дельта-пересчёте (carry_over) переносятся только
+# значения, чьи поля не менялись; ключи, которых здесь нет, не переносятся.
+MEMO_INPUTS = {
+    'step_metrics': (),
+    'step_trends': (),
+    'delay_distribution': (),
+    'standard_time': (),
+    'max_step_metrics': (),
+    'complexity': ('characteristics',),
+    'steps_complexity': ('steps_dependencies',),
+    'schedule': ('steps_dependencies', 'steps_time'),
+    'correlations': ('steps_history',),
+    'parallel_risk': ('active_parallel_steps', 'steps_dependencies'),
+    'warning_status': ('active_parallel_steps', 'steps_time'),
+    'progress_estimate': ('steps_dependencies', 'steps_history'),
+    'initial_estimate': ('characteristics', 'active_parallel_steps'),
+}
+
+
+def input_key(value: Any) -> Hashable:
+    # Хэшируемый снимок входных данных для ключа memo (порядок ключей словаря сохраняется)
+    if isinstance(value, Mapping):
+        return tuple((key, input_key(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(input_key(item) for item in value)
+    return value
+
+
+class RequestContext:
+    """Кэш производных величин в рамках одного анализа source_data.
+
+    Все обработчики и агент берут метрики шагов, множитель сложности,
+    стандартные времена, критический путь и т.п. отсюда, поэтому каждая
+    величина считается один раз на запрос. ``hits``/``misses`` - счетчики кэша.
+
+    Ключ каждого значения включает входные данные, из которых оно получено,
+    поэтому изменение source_data между вызовами не возвращает устаревший
+    результат, даже если контекст не был сброшен через ``attach``.
+    """
+
+    def __init__(self):
+        self._values: Dict[Hashable, Any] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def of(cls, data: Dict) -> 'RequestContext':
+        # Контекст живёт в самом source_data; если анализ запущен не через агента - создаётся на месте
+        context = data.get(CONTEXT_KEY)
+        if context is None:
+            context = data.setdefault(CONTEXT_KEY, cls())
+        return context
+
+    @classmethod
+    def attach(cls, data: Dict) -> 'RequestContext':
+        # Новый контекст на каждый запуск анализа - входные данные могли измениться
+        context = cls()
+        data[CONTEXT_KEY] = context
+        return context
+
+    def memo(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._values:
+                self.hits += 1
+                return self._values[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            return self._values.setdefault(key, value)
+
+    def carry_over(self, changed: Iterable[str]) -> 'RequestContext':
+        # Новый контекст с теми значениями, на которые изменения входных полей не влияют
+        changed = set(changed)
+        context = RequestContext()
+        with self._lock:
+            for key, value in self._values.items():
+                inputs = MEMO_INPUTS.get(key[0] if isinstance(key, tuple) else key)
+                if inputs is not None and not changed.intersection(inputs):
+                    context._values[key] = value
+        return context
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def step_metrics(self, statistical_model, step: str) -> Dict:
+        return self.memo(('step_metrics', step), lambda: statistical_model.calculate_metrics(step))
+
+    def step_trends(self, statistical_model, step: str) -> Dict:
+        return self.memo(('step_trends', step), lambda: statistical_model.analyze_trends(step))
+
+    def delay_distribution(self, statistical_model, step: str) -> Dict:
+        return self.memo(('delay_distribution', step),
+                         lambda: statistical_model.analyze_delay_distribution(step))
+
+    def max_step_metrics(self, statistical_model, steps: List[str]) -> Dict:
+        # Максимальные значения статистики среди шагов (обычно активных)
+        def compute():
+            stats = [self.step_metrics(statistical_model, step) for step in steps]
+            return {
+                'mean': max(s['mean'] for s in stats),
+                'median': max(s['median'] for s in stats),
+                'std': max(s['std'] for s in stats)
+            }
+        return self.memo(('max_step_metrics', tuple(steps)), compute)
+
+    def complexity(self, factor_analysis, characteristics: Dict) -> float:
+        return self.memo(('complexity', input_key(characteristics)),
+                         lambda: factor_analysis.calculate_multiplier(characteristics))
+
+    def steps_complexity(self, factor_analysis, dependencies: Dict) -> Dict:
+        return self.memo(('steps_complexity', input_key(dependencies)), lambda: {
+            step: factor_analysis.calculate_step_complexity(step, dependencies)
+            for step in dependencies.keys()
+        })
+
+    def standard_time(self, step: str) -> int:
+        return self.memo(('standard_time', step), lambda: get_standard_time(step))
+
+    def schedule(self, dependencies: Dict, steps_time: Dict) -> StepSchedule:
+        def compute():
+            graph = StepGraph.from_dependencies(dependencies)
+            return graph.schedule(graph.durations(steps_time))
+        return self.memo(('schedule', input_key(dependencies), input_key(steps_time)), compute)
+
+    def correlations(self, steps_history: Dict):
+        return self.memo(('correlations', input_key(steps_history)),
+                         lambda: calculate_step_correlations(steps_history))
+
+    def parallel_risk(self, active_steps: List[str], dependencies: Dict) -> float:
+        return self.memo(('parallel_risk', tuple(active_steps), input_key(dependencies)),
+                         lambda: analyze_parallel_risks(active_steps, dependencies))
+
+    def warning_status(self, early_warning, active_steps: List[str], steps_time: Dict) -> str:
+        return self.memo(('warning_status', tuple(active_steps), input_key(steps_time)),
+                         lambda: early_warning.check_status(active_steps, steps_time))
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return f"RequestContext(hits={self.hits}, misses={self.misses})"
@@ -0,0 +1,70 @@
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional, Tuple
+import numpy as np
+from .settings import get_settings
+
+
+class StepCorrelations(Mapping):
+    """Корреляции задержек шагов: outer product вектора задержек.
+
+    Вектор задержек (факт / стандарт) считается один раз, матрица строится
+    лениво. Для совместимости объект ведёт себя как словарь
+    ``{"stepA-stepB": delayA * delayB}`` без диагонали.
+    """
+
+    def __init__(self, steps_history: Dict[str, float]):
+        standard = get_settings().integration.steps
+        self.steps: Tuple[str, ...] = tuple(steps_history)
+        self.index: Dict[str, int] = {step: i for i, step in enumerate(self.steps)}
+        self.delays = np.fromiter(
+            (steps_history[step] / standard[step] for step in self.steps),
+            dtype=float,
+            count=len(self.steps)
+        )
+        self._matrix: Optional[np.ndarray] = None
+
+    @property
+    def matrix(self) -> np.ndarray:
+        if self._matrix is None:
+            self._matrix = np.outer(self.delays, self.delays)
+            self._matrix.flags.writeable = False
+        return self._matrix
+
+    def pair(self, step1: str, step2: str) -> float:
+        return float(self.delays[self.index[step1]] * self.delays[self.index[step2]])
+
+    def off_diagonal_sum(self) -> float:
+        # sum_{i != j} d_i * d_j = (sum d)^2 - sum d^2, без построения матрицы
+        total = self.delays.sum()
+        return float(total * total - np.dot(self.delays, self.delays))
+
+    def mean_off_diagonal(self) -> float:
+        n = len(self.steps)
+        if n < 2:
+            return 0.0
+        return self.off_diagonal_sum() / (n * (n - 1))
+
+    def _split_key(self, key: str) -> Tuple[str, str]:
+        if isinstance(key, str):
+            for i, char in enumerate(key):
+                if char == '-':
+                    step1, step2 = key[:i], key[i + 1:]
+                    if step1 != step2 and step1 in self.index and step2 in self.index:
+                        return step1, step2
+        raise KeyError(key)
+
+    def __getitem__(self, key: str) -> float:
+        return self.pair(*self._split_key(key))
+
+    def __iter__(self) -> Iterator[str]:
+        for step1 in self.steps:
+            for step2 in self.steps:
+                if step1 != step2:
+                    yield f"{step1}-{step2}"
+
+    def __len__(self) -> int:
+        n = len(self.steps)
+        return n * (n - 1)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
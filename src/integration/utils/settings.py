@@ -0,0 +1,127 @@
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+import os
+import time
+
+DEFAULT_SETTINGS_PATH = Path(__file__).parent.parent.parent / 'config' / 'settings.yaml'
+
+
+@dataclass(frozen=True)
+class ParallelRiskSettings:
+    safe_threshold: float
+    warning_threshold: float
+
+
+@dataclass(frozen=True)
+class IntegrationSettings:
+    parallel_risks: ParallelRiskSettings
+    target_days: int
+    steps: Mapping[str, int]
+
+
+@dataclass(frozen=True)
+class ThresholdSettings:
+    yellow_multiplier: float
+    red_multiplier: float
+
+
+@dataclass(frozen=True)
+class FactorSettings:
+    weights: Mapping[str, float]
+
+
+@dataclass(frozen=True)
+class ProbabilitySettings:
+    trend_weight: float
+    complexity_weight: float
+    correlation_weight: float
+
+
+@dataclass(frozen=True)
+class Settings:
+    integration: IntegrationSettings
+    thresholds: ThresholdSettings
+    factors: FactorSettings
+    probability: ProbabilitySettings
+    # Исходное содержимое yaml (только для чтения) - для кода, который обращается по ключам
+    raw: Mapping[str, Any]
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'Settings':
+        integration = data['integration']
+        return cls(
+            integration=IntegrationSettings(
+                parallel_risks=ParallelRiskSettings(**integration['parallel_risks']),
+                target_days=integration['target_days'],
+                steps=MappingProxyType(dict(integration['steps']))
+            ),
+            thresholds=ThresholdSettings(**data['thresholds']),
+            factors=FactorSettings(weights=MappingProxyType(dict(data['factors']['weights']))),
+            probability=ProbabilitySettings(**data['probability']),
+            raw=_freeze(data)
+        )
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class SettingsStore:
+    """Один снимок настроек на процесс.
+
+    Файл перечитывается только при смене mtime/inode (проверка не чаще
+    ``check_interval`` секунд) или при явном вызове ``reload()``.
+    """
+
+    def __init__(self, path: Path = DEFAULT_SETTINGS_PATH, check_interval: float = 1.0):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._lock = Lock()
+        self._settings: Optional[Settings] = None
+        self._file_key = None
+        self._next_check = 0.0
+
+    def get(self) -> Settings:
+        settings = self._settings
+        if settings is not None and time.monotonic() < self._next_check:
+            return settings
+        with self._lock:
+            if self._settings is None or self._stat() != self._file_key:
+                self._load()
+            self._next_check = time.monotonic() + self.check_interval
+            return self._settings
+
+    def reload(self) -> Settings:
+        with self._lock:
+            self._load()
+            self._next_check = time.monotonic() + self.check_interval
+            return self._settings
+
+    def _stat(self):
+        st = os.stat(self.path)
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _load(self) -> None:
+        file_key = self._stat()
+        import yaml
+        with open(self.path) as f:
+            self._settings = Settings.from_dict(yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader)))
+        self._file_key = file_key
+
+
+_store = SettingsStore()
+
+
+def get_settings() -> Settings:
+    return _store.get()
+
+
+def reload_settings() -> Settings:
+    return _store.reload()
@@ -0,0 +1,142 @@
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+from .settings import get_settings
+
+
+class CyclicDependencyError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class StepSchedule:
+    earliest_start: Mapping[str, float]
+    latest_start: Mapping[str, float]
+    slack: Mapping[str, float]
+    critical_path: Tuple[str, ...]
+    length: float
+
+
+class StepGraph:
+    """Скомпилированный DAG шагов интеграции.
+
+    Строится один раз из ``steps_dependencies`` (шаг -> список шагов, от которых
+    он зависит). Топологический порядок и смежность кэшируются, расписание
+    (ранние/поздние старты, резерв, критический путь) считается за O(V+E).
+    """
+
+    _max_cached_schedules = 256
+
+    def __init__(self, dependencies: Mapping[str, List[str]]):
+        steps = list(dependencies)
+        known = set(steps)
+        for deps in dependencies.values():
+            for dep in deps:
+                if dep not in known:
+                    known.add(dep)
+                    steps.append(dep)
+
+        self.steps: Tuple[str, ...] = tuple(steps)
+        self.predecessors: Dict[str, Tuple[str, ...]] = {
+            step: tuple(dependencies.get(step, ())) for step in steps
+        }
+        successors: Dict[str, List[str]] = {step: [] for step in steps}
+        for step, deps in self.predecessors.items():
+            for dep in deps:
+                successors[dep].append(step)
+        self.successors: Dict[str, Tuple[str, ...]] = {
+            step: tuple(succ) for step, succ in successors.items()
+        }
+
+        self.order: Tuple[str, ...] = self._topological_order()
+        self.index: Dict[str, int] = {step: i for i, step in enumerate(self.order)}
+        self.start_steps = tuple(s for s in self.order if not self.predecessors[s])
+        self.end_steps = tuple(s for s in self.order if not self.successors[s])
+        self._schedules: Dict[Tuple, StepSchedule] = {}
+
+    @classmethod
+    def from_dependencies(cls, dependencies: Mapping[str, List[str]]) -> 'StepGraph':
+        # Один и тот же граф приходит с каждым запросом - компилируем его один раз
+        key = tuple((step, tuple(deps)) for step, deps in dependencies.items())
+        return _compile(key)
+
+    def _topological_order(self) -> Tuple[str, ...]:
+        in_degree = {step: len(deps) for step, deps in self.predecessors.items()}
+        queue = deque(step for step in self.steps if in_degree[step] == 0)
+        order = []
+        while queue:
+            step = queue.popleft()
+            order.append(step)
+            for succ in self.successors[step]:
+                in_degree[succ] -= 1
+                if in_degree[succ] == 0:
+                    queue.append(succ)
+
+        if len(order) != len(self.steps):
+            cyclic = sorted(step for step, degree in in_degree.items() if degree > 0)
+            raise CyclicDependencyError(f"Циклическая зависимость между шагами: {', '.join(cyclic)}")
+        return tuple(order)
+
+    def durations(self, steps_time: Optional[Mapping[str, float]] = None) -> Dict[str, float]:
+        # Фактическое время шага, если есть, иначе стандартное из настроек
+        steps_time = steps_time or {}
+        standard = get_settings().integration.steps
+        return {
+            step: steps_time[step] if step in steps_time else standard[step]
+            for step in self.order
+        }
+
+    def schedule(self, durations: Mapping[str, float]) -> StepSchedule:
+        key = tuple(durations[step] for step in self.order)
+        cached = self._schedules.get(key)
+        if cached is not None:
+            return cached
+
+        # Прямой проход - ранние старты
+        earliest_start = {}
+        earliest_finish = {}
+        for step in self.order:
+            start = max((earliest_finish[p] for p in self.predecessors[step]), default=0)
+            earliest_start[step] = start
+            earliest_finish[step] = start + durations[step]
+        length = max((earliest_finish[s] for s in self.end_steps), default=0)
+
+        # Обратный проход - поздние старты
+        latest_start = {}
+        for step in reversed(self.order):
+            finish = min((latest_start[s] for s in self.successors[step]), default=length)
+            latest_start[step] = finish - durations[step]
+        slack = {step: latest_start[step] - earliest_start[step] for step in self.order}
+
+        schedule = StepSchedule(
+            earliest_start=MappingProxyType(earliest_start),
+            latest_start=MappingProxyType(latest_start),
+            slack=MappingProxyType(slack),
+            critical_path=self._trace_critical_path(earliest_start, earliest_finish, length),
+            length=length
+        )
+        if len(self._schedules) >= self._max_cached_schedules:
+            self._schedules.clear()
+        self._schedules[key] = schedule
+        return schedule
+
+    def _trace_critical_path(self, earliest_start: Dict, earliest_finish: Dict, length: float) -> Tuple[str, ...]:
+        step = next((s for s in self.end_steps if earliest_finish[s] == length), None)
+        path = []
+        while step is not None:
+            path.append(step)
+            step = next(
+                (p for p in self.predecessors[step] if earliest_finish[p] == earliest_start[step]),
+                None
+            )
+        return tuple(reversed(path))
+
+    def critical_path_time(self, steps_time: Optional[Mapping[str, float]] = None) -> float:
+        return self.schedule(self.durations(steps_time)).length
+
+
+@lru_cache(maxsize=256)
+def _compile(key: Tuple) -> StepGraph:
+    return StepGraph({step: list(deps) for step, deps in key})
@@ -0,0 +1,95 @@
+import random
+import time
+import unittest
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from integration.agent import ResourceManager, Resource
+from integration.agent.allocation import AllocationSolver, StepDemand
+from test_batch import make_source
+
+def random_pool(count, seed=0):
+    rng = random.Random(seed)
+    return {
+        f'R{i}': Resource(f'R{i}', rng.choice(['developer', 'analyst']), rng.randint(3, 10),
+                          round(rng.uniform(0, 1), 2))
+        for i in range(count)
+    }
+
+def random_demands(manager, count, seed=0):
+    rng = random.Random(seed)
+    return [
+        manager.step_demand(f'step{rng.randint(1, 7)}', f'I{i // 3}', rng.uniform(0, 40))
+        for i in range(count)
+    ]
+
+class TestAllocationSolver(unittest.TestCase):
+    def setUp(self):
+        self.manager = ResourceManager()
+
+    def test_availability_is_consumed(self):
+        # Раньше R1 (единственный старший разработчик) назначался на все шаги сразу
+        plan = self.manager.optimize_allocation(self.manager.find_available(), ['step2', 'step6', 'step3', 'step4'])
+        used = {}
+        for assignment in plan.values():
+            resource = assignment['resource']
+            used[resource.id] = used.get(resource.id, 0) + assignment['allocation']
+        for resource_id, allocation in used.items():
+            self.assertLessEqual(allocation, self.manager.resources[resource_id].availability + 1e-9)
+        self.assertEqual(plan['step2']['resource'].id, 'R1')
+        self.assertNotIn('step4', plan)
+
+    def test_skill_threshold_and_type(self):
+        resources = [Resource('A', 'analyst', 9, 1.0), Resource('D', 'developer', 6, 1.0)]
+        demands = [StepDemand('I', 'step2', 7, 'developer'), StepDemand('I', 'step1', 5, 'analyst')]
+        plan = AllocationSolver().solve(demands, resources)
+        self.assertEqual([(a.step, a.resource_id) for a in plan.assignments], [('step1', 'A')])
+        self.assertEqual([d.step for d in plan.unassigned], ['step2'])
+
+    def test_critical_steps_get_scarce_resources(self):
+        resources = [Resource('R', 'developer', 8, 0.4)]
+        demands = [StepDemand('I1', 'step3', 6, 'developer', slack=5),
+                   StepDemand('I2', 'step3', 6, 'developer', slack=0)]
+        plan = AllocationSolver().solve(demands, resources)
+        self.assertEqual([a.integration_id for a in plan.assignments], ['I2'])
+
+    def test_matches_exact_assignment(self):
+        self.manager.resources = random_pool(30, seed=1)
+        demands = random_demands(self.manager, 60, seed=2)
+        solver = self.manager.solver
+        plan = solver.solve(demands, self.manager.resources.values())
+        # Точное решение: венгерский алгоритм на развёрнутых слотах
+        slots = [(key, slot) for key, class_slots in solver.slots(self.manager.resources.values()).items()
+                 for slot in class_slots]
+        values = np.zeros((len(demands), len(slots)))
+        for i, demand in enumerate(demands):
+            for j, (key, _) in enumerate(slots):
+                if demand.accepts(*key):
+                    values[i, j] = solver.value(
+                        (demand.preferred_type, demand.min_skill, demand.slack_level, demand.priority), key)
+        rows, cols = linear_sum_assignment(values, maximize=True)
+        self.assertAlmostEqual(plan.objective, values[rows, cols].sum())
+
+    def test_large_portfolio_is_fast_and_consistent(self):
+        self.manager.resources = random_pool(500)
+        demands = random_demands(self.manager, 5000)
+        self.manager.solver.solve(demands[:10], self.manager.resources.values())
+        started = time.perf_counter()
+        plan = self.manager.solver.solve(demands, self.manager.resources.values())
+        # Порог с большим запасом (обычно десятки мс) - ловит только регресс сложности, не шум машины
+        self.assertLess(time.perf_counter() - started, 10.0)
+        self.assertEqual(len(plan.assignments) + len(plan.unassigned), 5000)
+        for resource_id, allocation in plan.allocated().items():
+            self.assertLessEqual(allocation, self.manager.resources[resource_id].availability + 1e-9)
+
+    def test_plan_allocation_uses_critical_path_slack(self):
+        self.manager.resources = {'R': Resource('R', 'developer', 8, 0.4)}
+        # step3 не на критическом пути (резерв 4 дня), step2 - на нём
+        source_a = make_source(1, ['step3'], {'step3': 1}, {'step1': 3})
+        source_a['source_id'] = 'A'
+        source_b = make_source(1, ['step2'], {'step2': 1}, {'step1': 3})
+        source_b['source_id'] = 'B'
+        plan = self.manager.plan_allocation([source_a, source_b])
+        self.assertEqual([(a.integration_id, a.step) for a in plan.assignments], [('B', 'step2')])
+
+if __name__ == '__main__':
+    unittest.main()
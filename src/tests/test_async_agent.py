@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+import unittest
+from integration.agent import AsyncIntegrationAgent, IntegrationSmartAgent
+from test_batch import make_source
+
+class CountingAgent:
+    # Заглушка агента: считает вызовы и одновременные расчёты
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def analyze_integration(self, source_data):
+        with self.lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        if source_data.get('fail'):
+            raise RuntimeError('analysis failed')
+        return {'source_id': source_data.get('source_id'), 'volume': source_data['characteristics']['data_volume']}
+
+def source(source_id, data_volume=1, **extra):
+    data = make_source(data_volume, ['step3'], {'step3': 5}, {'step1': 3, 'step2': 7})
+    data['source_id'] = source_id
+    data.update(extra)
+    return data
+
+class TestAsyncIntegrationAgent(unittest.TestCase):
+    def run_async(self, coroutine):
+        return asyncio.run(coroutine)
+
+    def test_identical_requests_are_coalesced(self):
+        agent = CountingAgent()
+        service = AsyncIntegrationAgent(agent, max_concurrency=4)
+
+        async def scenario():
+            return await asyncio.gather(*(service.analyze(source('s1')) for _ in range(10)))
+
+        results = self.run_async(scenario())
+        service.close()
+        self.assertEqual(agent.calls, 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(service.stats, {'computed': 1, 'coalesced': 9, 'inflight': 0})
+
+    def test_different_snapshots_are_computed_separately(self):
+        agent = CountingAgent()
+        service = AsyncIntegrationAgent(agent, max_concurrency=4)
+
+        async def scenario():
+            return await asyncio.gather(
+                service.analyze(source('s1', 1)),
+                service.analyze(source('s1', 2)),
+                service.analyze(source('s2', 1))
+            )
+
+        results = self.run_async(scenario())
+        service.close()
+        self.assertEqual(agent.calls, 3)
+        self.assertEqual([r['volume'] for r in results], [1, 2, 1])
+
+    def test_concurrency_is_bounded(self):
+        agent = CountingAgent(delay=0.02)
+        service = AsyncIntegrationAgent(agent, max_concurrency=2)
+
+        async def scenario():
+            await asyncio.gather(*(service.analyze(source(f's{i}')) for i in range(8)))
+
+        self.run_async(scenario())
+        service.close()
+        self.assertEqual(agent.calls, 8)
+        self.assertLessEqual(agent.max_active, 2)
+
+    def test_error_reaches_all_waiters_and_is_not_cached(self):
+        agent = CountingAgent()
+        service = AsyncIntegrationAgent(agent)
+
+        async def scenario():
+            results = await asyncio.gather(
+                service.analyze(source('s1', fail=True)),
+                service.analyze(source('s1', fail=True)),
+                return_exceptions=True
+            )
+            retry = await asyncio.gather(service.analyze(source('s1', fail=True)), return_exceptions=True)
+            return results + retry
+
+        results = self.run_async(scenario())
+        service.close()
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(agent.calls, 2)
+
+    def test_matches_sync_agent_and_keeps_input(self):
+        agent = IntegrationSmartAgent()
+        data = source('s1')
+        expected = agent.analyze_integration(source('s1'))
+
+        async def scenario():
+            async with AsyncIntegrationAgent(agent) as service:
+                return await service.analyze(data)
+
+        result = self.run_async(scenario())
+        self.assertEqual(result['prediction'], expected['prediction'])
+        self.assertEqual(result['completion_probability'], expected['completion_probability'])
+        self.assertNotIn('prediction', data)
+
+if __name__ == '__main__':
+    unittest.main()
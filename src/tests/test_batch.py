@@ -0,0 +1,70 @@
+import copy
+import unittest
+from integration.agent import IntegrationSmartAgent
+from integration.models.factor import FactorAnalysis
+
+DEPENDENCIES = {
+    'step1': [],
+    'step2': ['step1'],
+    'step3': ['step1'],
+    'step4': ['step2', 'step3'],
+    'step5': ['step4'],
+    'step6': ['step4'],
+    'step7': ['step5', 'step6']
+}
+
+def make_source(data_volume, active_steps, steps_time, steps_history):
+    return {
+        'characteristics': {
+            'data_volume': data_volume,
+            'api_complexity': 2,
+            'data_quality': 0
+        },
+        'current_progress': {
+            'active_parallel_steps': active_steps,
+            'steps_time': steps_time,
+            'steps_history': steps_history,
+            'steps_dependencies': DEPENDENCIES
+        }
+    }
+
+class TestBatchAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.agent = IntegrationSmartAgent()
+        self.sources = [
+            make_source(1, ['step3', 'step4'], {'step3': 3, 'step4': 1}, {'step1': 3, 'step2': 1}),
+            make_source(0, ['step2'], {'step2': 9}, {'step1': 4}),
+            make_source(2, ['step5', 'step6'], {'step5': 1, 'step6': 12},
+                        {'step1': 3, 'step2': 8, 'step3': 5, 'step4': 6}),
+        ]
+
+    def test_batch_matches_single(self):
+        batch_results = self.agent.analyze_batch(copy.deepcopy(self.sources))
+        self.assertEqual(len(batch_results), len(self.sources))
+        for source, batch_result in zip(self.sources, batch_results):
+            single = self.agent.analyze_integration(copy.deepcopy(source))
+            for key in ('statistical_analysis', 'warning_status', 'prediction',
+                        'completion_probability', 'recommendations'):
+                self.assertEqual(batch_result[key], single[key], key)
+            self.assertAlmostEqual(batch_result['factor_analysis']['complexity'],
+                                   single['factor_analysis']['complexity'])
+            self.assertEqual(batch_result['ml_analysis']['patterns'],
+                             single['ml_analysis']['patterns'])
+
+    def test_multipliers_use_level_keys(self):
+        factor = FactorAnalysis()
+        factor.factors['data_volume'] = {-1: 0.8, 0: 1.0, 5: 2.0}
+        characteristics = [{'data_volume': -1}, {'data_volume': 5, 'api_complexity': 2}, {}]
+        self.assertEqual(list(factor.calculate_multipliers(characteristics)),
+                         [factor.calculate_multiplier(c) for c in characteristics])
+        for unknown in (1, 7):
+            with self.assertRaises(KeyError):
+                factor.calculate_multiplier({'data_volume': unknown})
+            with self.assertRaises(KeyError):
+                factor.calculate_multipliers([{'data_volume': 0}, {'data_volume': unknown}])
+
+    def test_empty_batch(self):
+        self.assertEqual(self.agent.analyze_batch([]), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import numpy as np
+from integration.models import (
+    ChunkedMonteCarlo, MonteCarloSimulator, QuantileSketch, RunningStats, StatisticalModel
+)
+from test_batch import DEPENDENCIES
+
+def two_step_model():
+    model = StatisticalModel()
+    model.historical_data.clear()
+    model.set_history('a', [1, 3])
+    model.set_history('b', [1, 3])
+    model.set_history('c', [2])
+    return model
+
+TWO_BRANCHES = {'a': [], 'b': [], 'c': ['a', 'b']}
+
+class TestStreamingArrays(unittest.TestCase):
+    def test_running_stats_of_array(self):
+        values = np.random.default_rng(0).normal(10, 2, 1000)
+        stats = RunningStats.of_array(values[:400]).merge(RunningStats.of_array(values[400:]))
+        self.assertAlmostEqual(stats.mean, values.mean())
+        self.assertAlmostEqual(stats.std, values.std())
+
+    def test_sketch_add_array_matches_add(self):
+        values = np.random.default_rng(1).exponential(5, 2000)
+        one_by_one = QuantileSketch()
+        for value in values:
+            one_by_one.add(value)
+        vectorized = QuantileSketch()
+        vectorized.add_array(np.append(values[:1000], 0.0))
+        vectorized.add_array(values[1000:])
+        self.assertEqual(vectorized.count, 2001)
+        self.assertEqual(vectorized.zero_count, 1)
+        for q in (0.5, 0.9):
+            self.assertAlmostEqual(vectorized.quantile(q), one_by_one.quantile(q), delta=0.02 * one_by_one.quantile(q))
+
+class TestChunkedMonteCarlo(unittest.TestCase):
+    def test_stops_when_interval_is_tight(self):
+        runner = ChunkedMonteCarlo(MonteCarloSimulator(two_step_model()), chunk_size=5000,
+                                   max_scenarios=1_000_000, tolerance=0.01, max_workers=1)
+        estimate = runner.run(TWO_BRANCHES, target_days=3, seed=1)
+        self.assertTrue(estimate.converged)
+        self.assertLess(estimate.scenarios, 1_000_000)
+        self.assertLessEqual(estimate.half_width, 0.01)
+        low, high = estimate.confidence_interval
+        self.assertTrue(low <= 0.25 <= high)
+        self.assertAlmostEqual(estimate.mean, 0.25 * 3 + 0.75 * 5, delta=0.05)
+        self.assertEqual(estimate.quantiles['p50'], 5.0)
+
+    def test_max_scenarios_limits_sampling(self):
+        runner = ChunkedMonteCarlo(MonteCarloSimulator(two_step_model()), chunk_size=300,
+                                   max_scenarios=1000, tolerance=0.0001, max_workers=1)
+        estimate = runner.run(TWO_BRANCHES, target_days=3, seed=1)
+        self.assertFalse(estimate.converged)
+        self.assertEqual(estimate.scenarios, 1000)
+        self.assertEqual(estimate.chunks, 4)
+
+    def test_process_pool_matches_serial(self):
+        simulator = MonteCarloSimulator()
+        kwargs = dict(chunk_size=2000, max_scenarios=40_000, tolerance=0.01)
+        serial = ChunkedMonteCarlo(simulator, max_workers=1, **kwargs).run(
+            DEPENDENCIES, steps_history={'step1': 4}, target_days=26, seed=5)
+        parallel = ChunkedMonteCarlo(simulator, max_workers=2, **kwargs).run(
+            DEPENDENCIES, steps_history={'step1': 4}, target_days=26, seed=5)
+        self.assertEqual(serial, parallel)
+
+    def test_seed_reproducibility(self):
+        runner = ChunkedMonteCarlo(MonteCarloSimulator(two_step_model()), chunk_size=1000,
+                                   max_scenarios=2000, tolerance=0.0, max_workers=1)
+        first = runner.run(TWO_BRANCHES, target_days=3, seed=2)
+        self.assertEqual(runner.run(TWO_BRANCHES, target_days=3, seed=2), first)
+        other = runner.run(TWO_BRANCHES, target_days=3, seed=3)
+        self.assertNotEqual(first.probability_on_time, other.probability_on_time)
+
+if __name__ == '__main__':
+    unittest.main()
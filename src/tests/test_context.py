@@ -0,0 +1,58 @@
+import copy
+import unittest
+from integration.agent import IntegrationSmartAgent
+from integration.predictor import IntegrationPredictor
+from integration.utils.context import RequestContext, CONTEXT_KEY
+from test_batch import make_source
+
+class TestRequestContext(unittest.TestCase):
+    def setUp(self):
+        self.source = make_source(1, ['step3', 'step4'], {'step3': 3, 'step4': 1}, {'step1': 3, 'step2': 1})
+
+    def test_memo_counts_hits(self):
+        context = RequestContext()
+        calls = []
+        for _ in range(3):
+            value = context.memo('key', lambda: calls.append(1) or 42)
+        self.assertEqual(value, 42)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(context.stats, {'hits': 2, 'misses': 1})
+
+    def test_estimates_share_derived_values(self):
+        data = copy.deepcopy(self.source)
+        predictor = IntegrationPredictor()
+        predictor.initial_estimate(data)
+        predictor.predict_completion(data)
+        context = RequestContext.of(data)
+        # max_step_metrics и complexity взяты из кэша во втором вызове
+        self.assertGreaterEqual(context.hits, 2)
+        self.assertIs(predictor.initial_estimate(data), predictor.initial_estimate(data))
+
+    def test_direct_calls_see_changed_inputs(self):
+        # Контекст, созданный в source_data прямым вызовом, не отдаёт значения для старых входных данных
+        data = copy.deepcopy(self.source)
+        predictor = IntegrationPredictor()
+        first = predictor.predict_completion(data)
+        data['current_progress']['steps_time'] = {'step3': 25, 'step4': 2}
+        second = predictor.predict_completion(data)
+        fresh = IntegrationPredictor().predict_completion(
+            copy.deepcopy({key: value for key, value in data.items() if key != CONTEXT_KEY})
+        )
+        self.assertEqual(first['warning_status'], 'green')
+        for key in ('warning_status', 'critical_path_time', 'estimated_days'):
+            self.assertEqual(second[key], fresh[key], key)
+        self.assertEqual(second['warning_status'], 'red')
+
+    def test_agent_reports_hits_and_resets_context(self):
+        agent = IntegrationSmartAgent()
+        data = copy.deepcopy(self.source)
+        result = agent.analyze_integration(data)
+        self.assertGreater(result['cache_stats']['hits'], 0)
+        first_context = data[CONTEXT_KEY]
+        data['current_progress']['steps_time']['step3'] = 6.5
+        second = agent.analyze_integration(data)
+        self.assertIsNot(data[CONTEXT_KEY], first_context)
+        self.assertEqual(second['warning_status'], 'yellow')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+import numpy as np
+from integration.utils.calculations import calculate_step_correlations, get_standard_time
+
+STEPS_HISTORY = {'step1': 3, 'step2': 9, 'step3': 4}
+
+class TestStepCorrelations(unittest.TestCase):
+    def setUp(self):
+        self.correlations = calculate_step_correlations(STEPS_HISTORY)
+        self.expected = {
+            f"{s1}-{s2}": (t1 / get_standard_time(s1)) * (t2 / get_standard_time(s2))
+            for s1, t1 in STEPS_HISTORY.items()
+            for s2, t2 in STEPS_HISTORY.items()
+            if s1 != s2
+        }
+
+    def test_dict_view(self):
+        self.assertEqual(len(self.correlations), len(self.expected))
+        self.assertEqual(set(self.correlations), set(self.expected))
+        for key, value in self.expected.items():
+            self.assertAlmostEqual(self.correlations[key], value)
+        with self.assertRaises(KeyError):
+            self.correlations['step1-step1']
+
+    def test_matrix(self):
+        matrix = self.correlations.matrix
+        self.assertEqual(matrix.shape, (3, 3))
+        i, j = self.correlations.index['step2'], self.correlations.index['step3']
+        self.assertAlmostEqual(matrix[i, j], self.expected['step2-step3'])
+        self.assertTrue(np.allclose(matrix, matrix.T))
+
+    def test_mean_off_diagonal(self):
+        expected_mean = sum(self.expected.values()) / len(self.expected)
+        self.assertAlmostEqual(self.correlations.mean_off_diagonal(), expected_mean)
+
+    def test_empty_history(self):
+        correlations = calculate_step_correlations({})
+        self.assertFalse(correlations)
+        self.assertEqual(correlations.mean_off_diagonal(), 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import copy
+import unittest
+from unittest import mock
+from integration.agent.smart_agent import IntegrationSmartAgent
+from integration.utils.context import RequestContext
+from test_batch import make_source
+
+RESULT_KEYS = ('statistical_analysis', 'warning_status', 'prediction', 'completion_probability',
+               'factor_analysis', 'recommendations')
+
+class TestDeltaAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.agent = IntegrationSmartAgent()
+        self.source = dict(
+            make_source(1, ['step3', 'step4'], {'step3': 3, 'step4': 1}, {'step1': 3, 'step2': 8}),
+            source_id='INT-1'
+        )
+
+    def assertMatchesFullRun(self, result, source):
+        # reanalyze дописывает результаты в source_data - полный прогон только по входным полям
+        inputs = {key: source[key] for key in ('source_id', 'characteristics', 'current_progress')}
+        full = self.agent.analyze_integration(copy.deepcopy(inputs))
+        for key in RESULT_KEYS:
+            self.assertEqual(result[key], full[key], key)
+        self.assertEqual(result['ml_analysis']['patterns'], full['ml_analysis']['patterns'])
+
+    def test_pipeline_affected_handlers(self):
+        names = lambda indices: {self.agent.pipeline.handlers[i].__class__.__name__ for i in indices}
+        self.assertEqual(names(self.agent.pipeline.affected({'steps_time'})), {
+            'MLPredictorHandler', 'StatisticalHandler', 'WarningHandler', 'PredictorHandler', 'TargetHandler'
+        })
+        self.assertIn('FactorHandler', names(self.agent.pipeline.affected({'steps_history'})))
+        self.assertEqual(self.agent.pipeline.affected(set()), frozenset())
+
+    def test_steps_time_change_reuses_static_parts(self):
+        self.agent.reanalyze(self.source)
+        # Цикл мониторинга меняет тот же словарь на месте
+        self.source['current_progress']['steps_time'] = {'step3': 9, 'step4': 2}
+        model = self.agent.statistical_model
+        factor = self.agent.factor_handler.factor_analysis
+        with mock.patch.object(self.agent.factor_handler, 'process') as factor_process, \
+                mock.patch.object(model, 'calculate_metrics', wraps=model.calculate_metrics) as metrics, \
+                mock.patch.object(factor, 'calculate_multiplier', wraps=factor.calculate_multiplier) as multiplier, \
+                mock.patch('integration.utils.context.calculate_step_correlations') as correlations:
+            result = self.agent.reanalyze(self.source)
+        factor_process.assert_not_called()
+        metrics.assert_not_called()
+        multiplier.assert_not_called()
+        correlations.assert_not_called()
+        self.assertEqual(result['warning_status'], 'red')
+        self.assertEqual(result['statistical_analysis']['steps']['step3']['current_time'], 9)
+        self.assertMatchesFullRun(result, self.source)
+
+    def test_history_change_recomputes_dependent_parts(self):
+        self.agent.reanalyze(copy.deepcopy(self.source))
+        source = copy.deepcopy(self.source)
+        source['current_progress']['steps_history']['step2'] = 12
+        with mock.patch.object(self.agent.factor_handler, 'process',
+                               wraps=self.agent.factor_handler.process) as factor_process:
+            result = self.agent.reanalyze(source)
+        factor_process.assert_called_once()
+        self.assertMatchesFullRun(result, source)
+
+    def test_model_change_forces_full_run(self):
+        self.agent.reanalyze(copy.deepcopy(self.source))
+        self.agent.statistical_model.add_observation('step3', 20)
+        with mock.patch.object(self.agent.pipeline, 'rerun') as rerun:
+            result = self.agent.reanalyze(copy.deepcopy(self.source))
+        rerun.assert_not_called()
+        self.assertMatchesFullRun(result, self.source)
+
+    def test_unchanged_inputs(self):
+        first = self.agent.reanalyze(copy.deepcopy(self.source))
+        with mock.patch.object(self.agent.pipeline, '_execute') as execute:
+            second = self.agent.reanalyze(copy.deepcopy(self.source))
+        execute.assert_not_called()
+        for key in RESULT_KEYS:
+            self.assertEqual(first[key], second[key], key)
+
+    def test_carry_over_drops_dependent_values(self):
+        context = RequestContext()
+        context.memo('complexity', lambda: 1.5)
+        context.memo('schedule', lambda: 'old')
+        context.memo(('step_metrics', 'step3'), lambda: {'mean': 5})
+        context.memo('unknown', lambda: 1)
+        carried = context.carry_over({'steps_time'})
+        self.assertEqual(carried.memo('complexity', lambda: 0), 1.5)
+        self.assertEqual(carried.memo(('step_metrics', 'step3'), lambda: None), {'mean': 5})
+        self.assertEqual(carried.memo('schedule', lambda: 'new'), 'new')
+        self.assertEqual(carried.memo('unknown', lambda: 2), 2)
+
+    def test_cache_is_bounded(self):
+        self.agent.analysis_cache.max_entries = 2
+        for index in range(3):
+            self.agent.reanalyze(dict(copy.deepcopy(self.source), source_id=index))
+        self.assertEqual(len(self.agent.analysis_cache), 2)
+
+if __name__ == '__main__':
+    unittest.main()
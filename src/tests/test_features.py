@@ -0,0 +1,50 @@
+import importlib.util
+import unittest
+import numpy as np
+from integration.agent import FeatureSchema, MLPredictor
+from test_batch import make_source
+
+class TestFeatureSchema(unittest.TestCase):
+    def setUp(self):
+        self.predictor = MLPredictor()
+        self.source = make_source(1, ['step3', 'step4'], {'step3': 3, 'step4': 6}, {'step1': 3})
+
+    def test_vector_layout(self):
+        vector = self.predictor.feature_row(self.source)
+        self.assertEqual(vector.dtype, np.float32)
+        self.assertEqual(vector.tolist(), [1, 2, 0, 4, 6, 2])
+        self.assertEqual(self.predictor.schema.index['days_spent'], 4)
+
+    def test_schema_is_compiled_once_per_columns(self):
+        schema = FeatureSchema.for_columns(self.predictor.feature_columns)
+        self.assertIs(schema, self.predictor.schema)
+        self.assertEqual(FeatureSchema.for_columns(['days_spent', 'data_volume']).vector(self.source).tolist(), [6, 1])
+        with self.assertRaises(ValueError):
+            FeatureSchema(['unknown'])
+
+    def test_preallocated_output(self):
+        out = np.zeros(self.predictor.schema.width, dtype=np.float32)
+        self.assertIs(self.predictor.schema.vector(self.source, out), out)
+        batch = [self.source, make_source(0, ['step2'], {'step2': 9}, {})]
+        matrix = self.predictor.extract_features_batch(batch)
+        self.assertEqual(matrix.shape, (2, 6))
+        self.assertEqual(matrix[1].tolist(), [0, 2, 0, 2, 9, 1])
+
+    def test_training_records_and_batch_prediction(self):
+        self.predictor.train(self.predictor.initial_data)
+        single = self.predictor.analyze_patterns(self.source)
+        batch = self.predictor.analyze_patterns_batch([self.source])
+        self.assertEqual(single, batch[0])
+        self.assertFalse(hasattr(self.predictor.model, 'feature_names_in_'))
+
+    @unittest.skipUnless(importlib.util.find_spec('pandas'), 'pandas is not installed')
+    def test_train_from_dataframe(self):
+        import pandas as pd
+        records = MLPredictor().initial_data
+        from_frame = MLPredictor()
+        from_frame.train(pd.DataFrame(records))
+        self.predictor.train(records)
+        self.assertEqual(from_frame.analyze_patterns(self.source), self.predictor.analyze_patterns(self.source))
+
+if __name__ == '__main__':
+    unittest.main()
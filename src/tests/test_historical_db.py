@@ -0,0 +1,185 @@
+import json
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from pathlib import Path
+import time
+import numpy as np
+from integration.agent import HistoricalDatabase, MLPredictor
+from integration.models import StatisticalModel
+
+def integration(i, status='completed'):
+    return {
+        'source_id': f'source{i}',
+        'start_date': '2024-01-01',
+        'completion_date': f'2024-03-{1 + i % 28:02d}',
+        'steps_data': {'step1': 3, 'step2': 7 + i % 3},
+        'resources_used': ['R1'],
+        'status': status
+    }
+
+class TestHistoricalDatabase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = HistoricalDatabase(str(Path(self.tmp.name) / 'history.db'))
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_bulk_insert_and_stream(self):
+        rows = [integration(i) for i in range(2000)] + [integration(i, 'active') for i in range(2000, 2100)]
+        self.assertEqual(self.db.add_integrations(rows), 2100)
+        streamed = list(self.db.iter_completed_integrations(batch_size=128))
+        self.assertEqual(len(streamed), 2000)
+        dates = [row['completion_date'] for row in streamed]
+        self.assertEqual(dates, sorted(dates))
+        self.assertEqual(json.loads(streamed[0]['steps_data'])['step1'], 3)
+        self.assertEqual(len(self.db.get_completed_integrations()), 2000)
+
+    def test_since_filter(self):
+        self.db.add_integrations(integration(i) for i in range(56))
+        recent = list(self.db.iter_completed_integrations(since='2024-03-20'))
+        self.assertTrue(recent)
+        self.assertTrue(all(row['completion_date'] > '2024-03-20' for row in recent))
+
+    def test_inserted_seq_is_monotonic(self):
+        self.db.add_integrations(integration(i) for i in range(3))
+        self.db.add_integrations([integration(0)])
+        sequences = {row['source_id']: row['inserted_seq'] for row in self.db.iter_completed_integrations()}
+        self.assertEqual(sequences, {'source1': 2, 'source2': 3, 'source0': 4})
+        recent = list(self.db.iter_completed_integrations(after_seq=3))
+        self.assertEqual([row['source_id'] for row in recent], ['source0'])
+
+    def test_baseline_schema_gets_insert_sequence(self):
+        path = str(Path(self.tmp.name) / 'baseline.db')
+        with sqlite3.connect(path) as conn:
+            conn.execute("CREATE TABLE integrations (source_id TEXT PRIMARY KEY, start_date TEXT, "
+                         "completion_date TEXT, steps_data TEXT, resources_used TEXT, status TEXT)")
+            conn.executemany("INSERT INTO integrations VALUES (?, ?, ?, '{}', '[]', 'completed')",
+                             [('a', '2024-01-01', '2024-02-01'), ('b', '2024-01-01', '2024-02-01')])
+        conn.close()
+        db = HistoricalDatabase(path)
+        try:
+            self.assertEqual([row['source_id'] for row in db.iter_completed_integrations(after_seq=1)], ['b'])
+        finally:
+            db.close()
+
+    def test_training_features_backfilled_on_open(self):
+        steps_data = json.dumps({'characteristics': {'data_volume': 2}, 'days_spent': 4})
+        with sqlite3.connect(self.db.db_path) as conn:
+            conn.execute(
+                "INSERT INTO integrations (source_id, start_date, completion_date, steps_data, status) "
+                "VALUES ('legacy', '2024-01-01', '2024-01-21', ?, 'completed')", (steps_data,)
+            )
+        conn.close()
+        columns = ['data_volume', 'days_spent', 'completion_time']
+        # Строка без разложенных признаков читается из JSON, после переоткрытия - из training_features
+        self.assertEqual(self.db.get_training_records(columns),
+                         [{'data_volume': 2.0, 'days_spent': 4.0, 'completion_time': 20.0}])
+        reopened = HistoricalDatabase(self.db.db_path)
+        try:
+            with mock.patch('integration.agent.historical_db.json.loads') as loads:
+                records = reopened.get_training_records(columns)
+            loads.assert_not_called()
+            self.assertEqual(records, [{'data_volume': 2.0, 'days_spent': 4.0, 'completion_time': 20.0}])
+        finally:
+            reopened.close()
+
+    def test_wal_and_indexes(self):
+        conn = self.db.connection()
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+        plan = ' '.join(
+            row['detail'] for row in
+            conn.execute("EXPLAIN QUERY PLAN SELECT * FROM integrations WHERE status = 'completed'")
+        )
+        self.assertIn('idx_integrations_status', plan)
+
+    def test_connection_per_thread(self):
+        main = self.db.connection()
+        self.assertIs(self.db.connection(), main)
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.db.connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], main)
+
+class TestStepExecutions(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = HistoricalDatabase(str(Path(self.tmp.name) / 'history.db'))
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_steps_are_normalized_on_insert(self):
+        record = integration(1)
+        record['steps'] = {
+            'step1': 3,
+            'step2': {'days': 8, 'started': '2024-01-04', 'finished': '2024-01-12', 'resources': ['R1']}
+        }
+        self.db.add_integrations([record])
+        rows = self.db.connection().execute(
+            "SELECT step, days, finished, resources FROM step_executions ORDER BY step"
+        ).fetchall()
+        self.assertEqual([tuple(row) for row in rows],
+                         [('step1', 3.0, None, None), ('step2', 8.0, '2024-01-12', '["R1"]')])
+
+    def test_migrate_steps_data(self):
+        record = integration(2)
+        record['steps_data'] = {'steps': {'step1': 4, 'step3': 6}}
+        self.db.add_integrations([record])
+        self.assertEqual(self.db.migrate_steps_data(), 2)
+        self.assertEqual(list(self.db.export_step_columns('step3')['days']), [6.0])
+        # Перенесённые шаги из JSON удалены, повторный запуск ничего не переносит
+        self.assertIsNone(self.db.get_completed_integrations()[0]['steps_data'])
+        self.assertEqual(self.db.migrate_steps_data(), 0)
+
+    def test_columnar_export_rebuilds_models(self):
+        rng = np.random.default_rng(1)
+        steps = ['step1', 'step2', 'step3']
+        executions = [
+            {'source_id': f's{i}', 'step': step, 'days': float(rng.integers(1, 12))}
+            for i in range(100000) for step in steps
+        ]
+        self.db.add_step_executions(executions)
+
+        started = time.perf_counter()
+        columns = self.db.export_step_columns()
+        durations = self.db.step_durations()
+        model = StatisticalModel()
+        model.rebuild_from_database(self.db)
+        model.calculate_metrics('step2')
+        self.assertLess(time.perf_counter() - started, 10)
+
+        self.assertEqual(len(columns['days']), 300000)
+        self.assertEqual(sorted(durations), steps)
+        expected = np.mean([e['days'] for e in executions if e['step'] == 'step2'])
+        self.assertAlmostEqual(model.calculate_metrics('step2')['mean'], expected)
+
+    def test_training_arrays(self):
+        rows = []
+        for i in range(10):
+            record = integration(i)
+            record['steps_data'] = {
+                'characteristics': {'data_volume': i % 3, 'api_complexity': 1, 'data_quality': 0},
+                'current_step': 3, 'days_spent': 5, 'parallel_steps_count': 1, 'completion_time': 20 + i
+            }
+            rows.append(record)
+        self.db.add_integrations(rows)
+        predictor = MLPredictor()
+        # Признаки выгружаются из training_features, JSON не разбирается
+        with mock.patch('integration.agent.historical_db.json.loads') as loads:
+            X, y = self.db.export_training_arrays(predictor.feature_columns, predictor.target_column)
+        loads.assert_not_called()
+        self.assertEqual(X.shape, (10, len(predictor.feature_columns)))
+        self.assertEqual(sorted(y), [20 + i for i in range(10)])
+        self.assertEqual(self.db.get_training_records(['data_volume', 'completion_time'])[0],
+                         {'data_volume': 0.0, 'completion_time': 20.0})
+        self.assertEqual(predictor.train_from_database(self.db), 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('numpy', 'pandas', 'sklearn', 'yaml', 'joblib')
+# Бюджет на импорт пакетов (секунды) - с большим запасом относительно ~20 мс на рабочей машине,
+# чтобы не зависеть от скорости машины; основная проверка - тяжёлые модули не загружены
+IMPORT_BUDGET = 10.0
+
+def measure(statement):
+    # Замер в чистом интерпретаторе: в процессе тестов всё уже импортировано
+    code = (
+        "import json, sys, time\n"
+        "started = time.perf_counter()\n"
+        f"{statement}\n"
+        "elapsed = time.perf_counter() - started\n"
+        f"print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=SRC_DIR, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+class TestImportTime(unittest.TestCase):
+    def test_models_and_utils_import_budget(self):
+        result = measure("import integration.models, integration.utils")
+        self.assertEqual(result['loaded'], [])
+        self.assertLess(result['elapsed'], IMPORT_BUDGET)
+
+    def test_packages_do_not_import_agent_stack(self):
+        result = measure("import integration, integration.handlers, integration.agent")
+        self.assertEqual(result['loaded'], [])
+        self.assertLess(result['elapsed'], IMPORT_BUDGET)
+
+    def test_light_models_do_not_need_numpy(self):
+        result = measure(
+            "from integration.models import FactorAnalysis, EarlyWarningSystem\n"
+            "FactorAnalysis().calculate_multiplier({'data_volume': 1, 'api_complexity': 2})"
+        )
+        self.assertEqual(result['loaded'], [])
+
+    def test_sklearn_is_loaded_on_first_training(self):
+        result = measure("from integration.agent import IntegrationSmartAgent\nIntegrationSmartAgent()")
+        self.assertNotIn('sklearn', result['loaded'])
+        self.assertNotIn('pandas', result['loaded'])
+
+    def test_lazy_exports(self):
+        import integration.agent as agent
+        from integration.agent.ml_predictor import MLPredictor
+        self.assertIn('MLPredictor', dir(agent))
+        self.assertIs(agent.MLPredictor, MLPredictor)
+        with self.assertRaises(AttributeError):
+            agent.Missing
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from integration.agent import HistoricalDatabase, IncrementalTrainer, MLPredictor
+from test_batch import make_source
+
+def completed(i, day):
+    return {
+        'source_id': f's{i}',
+        'start_date': '2024-01-01',
+        'completion_date': f'2024-02-{day:02d}',
+        'steps_data': {
+            'characteristics': {'data_volume': i % 3, 'api_complexity': 1, 'data_quality': 1},
+            'current_step': 3,
+            'days_spent': 3 + i % 5,
+            'parallel_steps_count': 1,
+            'completion_time': 20 + 3 * i
+        },
+        'resources_used': [],
+        'status': 'completed'
+    }
+
+class TestIncrementalTrainer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = HistoricalDatabase(str(Path(self.tmp.name) / 'history.db'))
+        self.db.add_integrations(completed(i, 1 + i) for i in range(10))
+        self.predictor = MLPredictor()
+        self.trainer = IncrementalTrainer(self.predictor, self.db, trees_per_update=5, max_estimators=110)
+
+    def tearDown(self):
+        self.trainer.stop()
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_first_run_trains_and_sets_checkpoint(self):
+        self.assertEqual(self.trainer.run_once(), 10)
+        self.assertTrue(self.predictor.is_trained)
+        self.assertEqual(self.db.get_checkpoint('ml_predictor'), 10)
+        # Без новых интеграций модель не трогаем
+        model = self.predictor.model
+        self.assertEqual(self.trainer.run_once(), 0)
+        self.assertIs(self.predictor.model, model)
+
+    def test_first_run_replaces_default_model(self):
+        source = make_source(1, ['step3'], {'step3': 5}, {'step1': 3, 'step2': 7})
+        self.predictor.analyze_patterns(source)
+        self.trainer.run_once()
+        fresh = MLPredictor()
+        fresh.train_from_database(self.db)
+        self.assertEqual(self.predictor.analyze_patterns(source), fresh.analyze_patterns(source))
+
+    def test_only_new_rows_are_used(self):
+        self.trainer.run_once()
+        first = self.predictor.model
+        self.db.add_integrations(completed(i, 10 + i) for i in range(10, 14))
+        self.assertEqual(self.trainer.run_once(), 4)
+        # Старая модель не изменилась, новая - копия с добавленными деревьями
+        self.assertEqual(len(first.estimators_), 100)
+        self.assertEqual(len(self.predictor.model.estimators_), 105)
+        self.assertEqual(self.db.get_checkpoint('ml_predictor'), 14)
+
+    def test_rows_with_checkpoint_date_are_not_lost(self):
+        # Интеграция, завершённая в тот же день, что и последняя учтённая, но вставленная позже
+        self.trainer.run_once()
+        self.db.add_integrations([completed(10, 10)])
+        self.assertEqual(self.trainer.run_once(), 1)
+        self.assertEqual(self.db.get_checkpoint('ml_predictor'), 11)
+        # Повторная вставка (замена) строки тоже считается новой
+        self.db.add_integrations([completed(3, 4)])
+        self.assertEqual(self.trainer.run_once(), 1)
+        self.assertEqual(self.trainer.run_once(), 0)
+
+    def test_max_estimators_drops_oldest_trees(self):
+        self.trainer.run_once()
+        for batch in range(3):
+            self.db.add_integrations([completed(20 + batch, 20 + batch)])
+            self.trainer.run_once()
+        model = self.predictor.model
+        self.assertEqual(len(model.estimators_), 110)
+        self.assertEqual(model.n_estimators, 110)
+        source = make_source(1, ['step3'], {'step3': 5}, {'step1': 3, 'step2': 7})
+        self.assertEqual(len(self.predictor.analyze_patterns(source)), 1)
+
+    def test_background_thread_keeps_predictions_available(self):
+        source = make_source(1, ['step3'], {'step3': 5}, {'step1': 3, 'step2': 7})
+        self.predictor.analyze_patterns(source)
+        default_model = self.predictor.model
+        self.trainer.interval = 0.01
+        errors = []
+        stop = threading.Event()
+
+        def predict():
+            while not stop.is_set():
+                try:
+                    self.predictor.analyze_patterns(source)
+                except Exception as e:
+                    errors.append(e)
+
+        reader = threading.Thread(target=predict)
+        reader.start()
+        self.trainer.start()
+        self.assertTrue(self.trainer.running)
+        deadline = time.time() + 10
+        while self.db.get_checkpoint('ml_predictor') is None and time.time() < deadline:
+            time.sleep(0.01)
+        self.trainer.stop()
+        stop.set()
+        reader.join()
+        self.assertFalse(self.trainer.running)
+        self.assertEqual(errors, [])
+        self.assertEqual(self.db.get_checkpoint('ml_predictor'), 10)
+        # Первый запуск обучает новый лес, а не дописывает деревья к модели по умолчанию
+        self.assertIsNot(self.predictor.model, default_model)
+        self.assertEqual(len(self.predictor.model.estimators_), 100)
+
+if __name__ == '__main__':
+    unittest.main()
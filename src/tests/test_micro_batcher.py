@@ -0,0 +1,108 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from integration.agent import IntegrationSmartAgent, MLPredictor, PredictionBatcher
+from integration.handlers import MLPredictorHandler
+from test_batch import make_source
+
+def sources(count):
+    return [
+        make_source(i % 3, [f'step{2 + i % 4}'], {f'step{2 + i % 4}': 1 + i % 7}, {'step1': 3})
+        for i in range(count)
+    ]
+
+class CountingPredictor(MLPredictor):
+    def __init__(self):
+        super().__init__()
+        self.batch_sizes = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def analyze_feature_rows(self, rows):
+        self.release.wait()
+        self.batch_sizes.append(len(rows))
+        return super().analyze_feature_rows(rows)
+
+class TestPredictionBatcher(unittest.TestCase):
+    def test_results_match_direct_prediction(self):
+        predictor = MLPredictor()
+        items = sources(20)
+        expected = [predictor.analyze_patterns(item) for item in items]
+        with PredictionBatcher(predictor, max_batch_size=8, max_wait_ms=5) as batcher:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(batcher.analyze_patterns, items))
+        self.assertEqual(
+            [[round(p['risk_level'], 9) for p in r] for r in results],
+            [[round(p['risk_level'], 9) for p in r] for r in expected]
+        )
+
+    def test_concurrent_requests_share_predict(self):
+        predictor = CountingPredictor()
+        predictor.model
+        batcher = PredictionBatcher(predictor, max_batch_size=4, max_wait_ms=1000)
+        # Пока первый пакет "считается", остальные запросы копятся в очереди
+        predictor.release.clear()
+        futures = [batcher.submit(item) for item in sources(9)]
+        predictor.release.set()
+        for future in futures:
+            self.assertEqual(len(future.result(timeout=10)), 1)
+        batcher.close()
+        self.assertEqual(sum(predictor.batch_sizes), 9)
+        self.assertLessEqual(max(predictor.batch_sizes), 4)
+        self.assertLess(len(predictor.batch_sizes), 9)
+        stats = batcher.latency_stats()
+        self.assertEqual(stats['batches'], {'count': len(predictor.batch_sizes), 'requests': 9})
+        self.assertLessEqual(stats['batch_size']['max'], 4)
+        self.assertGreaterEqual(stats['total_ms']['p99'], stats['total_ms']['p50'])
+
+    def test_cancelled_request_does_not_stop_batcher(self):
+        predictor = CountingPredictor()
+        predictor.model
+        items = sources(3)
+        with PredictionBatcher(predictor, max_batch_size=1, max_wait_ms=0) as batcher:
+            predictor.release.clear()
+            running = batcher.submit(items[0])
+            # Ждём, пока поток заберёт первый запрос из очереди
+            while not batcher._queue.empty():
+                threading.Event().wait(0.001)
+            # Второй запрос ещё в очереди - его можно отменить
+            cancelled = batcher.submit(items[1])
+            self.assertTrue(cancelled.cancel())
+            predictor.release.set()
+            self.assertEqual(len(running.result(timeout=10)), 1)
+            self.assertEqual(len(batcher.submit(items[2]).result(timeout=10)), 1)
+            self.assertTrue(batcher._thread.is_alive())
+        self.assertEqual(predictor.batch_sizes, [1, 1])
+
+    def test_bad_input_fails_only_its_caller(self):
+        with PredictionBatcher(MLPredictor()) as batcher:
+            with self.assertRaises(KeyError):
+                batcher.submit({'characteristics': {}})
+            self.assertEqual(len(batcher.analyze_patterns(sources(1)[0])), 1)
+
+    def test_predict_error_reaches_callers(self):
+        class Failing(MLPredictor):
+            def analyze_feature_rows(self, rows):
+                raise RuntimeError('predict failed')
+
+        with PredictionBatcher(Failing()) as batcher:
+            with self.assertRaises(RuntimeError):
+                batcher.analyze_patterns(sources(1)[0])
+
+    def test_closed_batcher_rejects_requests(self):
+        batcher = PredictionBatcher(MLPredictor())
+        batcher.close()
+        with self.assertRaises(RuntimeError):
+            batcher.submit(sources(1)[0])
+
+    def test_handler_accepts_batcher(self):
+        agent = IntegrationSmartAgent()
+        item = sources(1)[0]
+        expected = agent.analyze_integration(dict(item))['ml_analysis']
+        with PredictionBatcher(agent.ml_model) as batcher:
+            data = dict(item)
+            MLPredictorHandler(batcher).process(data)
+        self.assertEqual(data['ml_analysis']['patterns'], expected['patterns'])
+
+if __name__ == '__main__':
+    unittest.main()
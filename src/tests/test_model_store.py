@@ -0,0 +1,84 @@
+import json
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+from integration.agent import HistoricalDatabase, MLPredictor, ModelStore
+from test_batch import make_source
+
+def completed_row(source_id, data_volume, days_spent, completion_time):
+    steps_data = {
+        'characteristics': {'data_volume': data_volume, 'api_complexity': 1, 'data_quality': 1},
+        'current_step': 3,
+        'days_spent': days_spent,
+        'parallel_steps_count': 1,
+        'completion_time': completion_time
+    }
+    return (source_id, '2024-01-01', '2024-02-01', json.dumps(steps_data), '{}', 'completed')
+
+class TestModelStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.db = HistoricalDatabase(str(root / 'history.db'))
+        with sqlite3.connect(self.db.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO integrations (source_id, start_date, completion_date, steps_data, resources_used, status) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [completed_row(f's{i}', i % 3, 3 + i % 5, 20 + 3 * i) for i in range(12)]
+            )
+        self.store = ModelStore(root / 'models')
+        self.source = make_source(1, ['step3'], {'step3': 5}, {'step1': 3, 'step2': 7})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_train_save_load(self):
+        predictor = MLPredictor()
+        self.assertEqual(predictor.train_from_database(self.db), 12)
+        artifact = self.store.save(predictor)
+        self.assertEqual(artifact.version, 'v0001')
+        self.assertEqual(self.store.save(predictor).version, 'v0002')
+
+        loaded = self.store.load('v0001')
+        self.assertEqual(loaded.analyze_patterns(self.source), predictor.analyze_patterns(self.source))
+        self.assertEqual(self.store.versions(), ['v0001', 'v0002'])
+
+    def test_named_versions_do_not_break_numbering(self):
+        predictor = MLPredictor()
+        predictor.train_from_database(self.db)
+        self.store.save(predictor, version='prod')
+        for number in range(1, 11):
+            self.store.save(predictor, version=f'v{number}')
+        self.assertEqual(self.store.save(predictor).version, 'v0011')
+        self.assertEqual(self.store.versions()[-3:], ['v9', 'v10', 'v0011'])
+        self.assertEqual(self.store.load('prod').analyze_patterns(self.source),
+                         predictor.analyze_patterns(self.source))
+
+    def test_failed_save_can_be_retried(self):
+        predictor = MLPredictor()
+        predictor.train_from_database(self.db)
+        with mock.patch('joblib.dump', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                self.store.save(predictor)
+        self.assertEqual(list(self.store.root.iterdir()), [])
+        self.assertEqual(self.store.save(predictor).version, 'v0001')
+
+    def test_same_data_gives_same_model(self):
+        first, second = MLPredictor(), MLPredictor()
+        first.train_from_database(self.db)
+        second.train_from_database(self.db)
+        self.assertEqual(first.analyze_patterns(self.source), second.analyze_patterns(self.source))
+
+    def test_schema_mismatch(self):
+        predictor = MLPredictor()
+        predictor.train_from_database(self.db)
+        self.store.save(predictor)
+        other = MLPredictor()
+        other.feature_columns = other.feature_columns[:-1]
+        with self.assertRaises(ValueError):
+            self.store.load(predictor=other)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import time
+import unittest
+import numpy as np
+from integration.models import MonteCarloSimulator, StatisticalModel
+from integration.target import IntegrationTarget
+from test_batch import DEPENDENCIES, make_source
+
+def fixed_model(durations):
+    model = StatisticalModel()
+    for step, days in durations.items():
+        model.set_history(step, [days])
+    return model
+
+class TestMonteCarloSimulator(unittest.TestCase):
+    def test_constant_durations_give_critical_path(self):
+        durations = {'step1': 3, 'step2': 7, 'step3': 5, 'step4': 5, 'step5': 1, 'step6': 8, 'step7': 1}
+        simulator = MonteCarloSimulator(fixed_model(durations), n_scenarios=1000, seed=1)
+        distribution = simulator.simulate(DEPENDENCIES, target_days=24)
+        self.assertTrue(np.all(distribution.samples == 24))
+        self.assertEqual(distribution.probability_on_time, 1.0)
+        self.assertEqual(distribution.probability(23.9), 0.0)
+
+    def test_parallel_max_and_serial_sum(self):
+        model = StatisticalModel()
+        model.historical_data.clear()
+        model.set_history('a', [1, 3])
+        model.set_history('b', [1, 3])
+        model.set_history('c', [2])
+        simulator = MonteCarloSimulator(model, n_scenarios=200_000, seed=7)
+        distribution = simulator.simulate({'a': [], 'b': [], 'c': ['a', 'b']}, target_days=3)
+        # Срок = max(a, b) + c; max = 1 только если оба шага заняли 1 день
+        self.assertEqual(set(np.unique(distribution.samples)), {3.0, 5.0})
+        self.assertAlmostEqual(distribution.probability_on_time, 0.25, delta=0.01)
+        self.assertEqual(distribution.quantiles['p50'], 5.0)
+
+    def test_seed_reproducibility(self):
+        simulator = MonteCarloSimulator(n_scenarios=5000, seed=3)
+        first = simulator.simulate(DEPENDENCIES)
+        second = simulator.simulate(DEPENDENCIES)
+        other = simulator.simulate(DEPENDENCIES, seed=4)
+        self.assertTrue(np.array_equal(first.samples, second.samples))
+        self.assertFalse(np.array_equal(first.samples, other.samples))
+        self.assertFalse(first.samples.flags.writeable)
+
+    def test_completed_and_active_steps(self):
+        durations = {'step1': 3, 'step2': 7, 'step3': 5, 'step4': 5, 'step5': 1, 'step6': 8, 'step7': 1}
+        simulator = MonteCarloSimulator(fixed_model(durations), n_scenarios=100, seed=0)
+        # step1 факт 10 дней, step2 идёт уже 9 дней (> исторических 7)
+        distribution = simulator.simulate(DEPENDENCIES, steps_history={'step1': 10}, steps_time={'step2': 9})
+        self.assertTrue(np.all(distribution.samples == 10 + 9 + 5 + 8 + 1))
+
+    def test_sketch_history(self):
+        model = StatisticalModel()
+        del model.historical_data['step3']
+        for value in np.tile([4.0, 6.0], 200):
+            model.add_observation('step3', value)
+        self.assertFalse(model.stream('step3').is_exact)
+        values, probabilities = model.distribution('step3')
+        self.assertAlmostEqual(probabilities.sum(), 1.0)
+        self.assertEqual(len(values), 2)
+        distribution = MonteCarloSimulator(model, n_scenarios=20_000, seed=5).simulate({'step3': []}, target_days=5)
+        self.assertAlmostEqual(distribution.probability_on_time, 0.5, delta=0.02)
+
+    def test_large_simulation_is_fast(self):
+        rng = np.random.default_rng(1)
+        dependencies = {
+            f's{i}': [f's{j}' for j in rng.choice(i, size=min(i, 3), replace=False)] if i else []
+            for i in range(100)
+        }
+        model = StatisticalModel()
+        for step in dependencies:
+            model.set_history(step, rng.integers(1, 10, size=50))
+        simulator = MonteCarloSimulator(model, n_scenarios=100_000, seed=42)
+        simulator.simulate(dependencies, n_scenarios=100)
+        started = time.perf_counter()
+        distribution = simulator.simulate(dependencies, target_days=100)
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual(distribution.scenarios, 100_000)
+        summary = distribution.summary()
+        self.assertLessEqual(summary['p50'], summary['p80'])
+        self.assertLessEqual(summary['p80'], summary['p95'])
+
+class TestTargetSimulation(unittest.TestCase):
+    def test_simulation_mode(self):
+        target = IntegrationTarget(simulator=None)
+        target.simulator.n_scenarios = 20_000
+        target.simulator.seed = 11
+        source = make_source(1, ['step3', 'step4'], {'step3': 3, 'step4': 1}, {'step1': 3, 'step2': 1})
+        probability = target.calculate_completion_probability(source, mode='simulation')
+        distribution = target.simulate_completion(source)
+        self.assertEqual(probability, distribution.probability_on_time)
+        self.assertEqual(distribution.target_days, target.target_days)
+        self.assertTrue(0 <= probability <= 1)
+        with self.assertRaises(ValueError):
+            target.calculate_completion_probability(source, mode='unknown')
+
+if __name__ == '__main__':
+    unittest.main()
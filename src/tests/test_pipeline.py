@@ -0,0 +1,61 @@
+import asyncio
+import copy
+import threading
+import time
+import unittest
+from typing import Dict
+from integration.agent import IntegrationSmartAgent
+from integration.handlers import HandlerPipeline, IntegrationHandler
+from test_batch import make_source
+
+class SleepHandler(IntegrationHandler):
+    def __init__(self, reads, writes, delay=0.1):
+        super().__init__()
+        self.reads = reads
+        self.writes = writes
+        self.delay = delay
+
+    def process(self, data: Dict) -> None:
+        time.sleep(self.delay)
+        for key in self.writes:
+            data[key] = {'thread': threading.get_ident(), 'inputs': sorted(k for k in self.reads if k in data)}
+
+class TestHandlerPipeline(unittest.TestCase):
+    def test_agent_stages(self):
+        agent = IntegrationSmartAgent()
+        stages = [[h.__class__.__name__ for h in stage] for stage in agent.pipeline.stages]
+        self.assertEqual(len(stages), 2)
+        self.assertEqual(stages[1], ['StatisticalHandler'])
+
+    def test_matches_sequential_chain(self):
+        agent = IntegrationSmartAgent()
+        source = make_source(1, ['step3', 'step4'], {'step3': 3, 'step4': 1}, {'step1': 3, 'step2': 1})
+        chained = agent.ml_handler.handle(copy.deepcopy(source))
+        compiled = agent.pipeline.run(copy.deepcopy(source))
+        for key in ('statistical_analysis', 'warning_status', 'prediction', 'completion_probability'):
+            self.assertEqual(compiled[key], chained[key], key)
+
+    def test_independent_handlers_run_concurrently(self):
+        pipeline = HandlerPipeline([
+            SleepHandler(('source',), ('a',)),
+            SleepHandler(('source',), ('b',)),
+            SleepHandler(('source',), ('c',)),
+            SleepHandler(('a', 'b'), ('d',)),
+        ])
+        started = time.perf_counter()
+        result = pipeline.run({'source': 1})
+        elapsed = time.perf_counter() - started
+        self.assertLess(elapsed, 0.35)
+        self.assertEqual(result['d']['inputs'], ['a', 'b'])
+        self.assertEqual(pipeline.dependencies[3], frozenset({0, 1}))
+        pipeline.close()
+
+    def test_arun(self):
+        handlers = [SleepHandler(('source',), ('a',), 0), SleepHandler(('a',), ('b',), 0)]
+        for handler in handlers:
+            handler.io_bound = True
+        result = asyncio.run(HandlerPipeline(handlers).arun({'source': 1}))
+        self.assertEqual(result['b']['inputs'], ['a'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import copy
+import multiprocessing
+import os
+import tempfile
+import unittest
+from unittest import mock
+from integration.agent import IntegrationSmartAgent, MLPredictor, PortfolioRunner
+from test_batch import make_source
+
+class TestPortfolioRunner(unittest.TestCase):
+    def test_results_match_batch(self):
+        agent = IntegrationSmartAgent()
+        portfolio = [
+            make_source(i % 3, ['step3', 'step4'], {'step3': 1 + i % 5, 'step4': 2},
+                        {'step1': 3, 'step2': 5 + i % 4})
+            for i in range(11)
+        ]
+        expected = agent.analyze_batch(copy.deepcopy(portfolio))
+
+        runner = PortfolioRunner(agent, max_workers=2, chunk_size=3)
+        streamed = list(runner.run(copy.deepcopy(portfolio)))
+        self.assertEqual(sorted(index for index, _ in streamed), list(range(11)))
+
+        ordered = runner.run_ordered(copy.deepcopy(portfolio))
+        for result, reference in zip(ordered, expected):
+            self.assertEqual(result['prediction'], reference['prediction'])
+            self.assertEqual(result['ml_analysis']['patterns'], reference['ml_analysis']['patterns'])
+            self.assertEqual(result['completion_probability'], reference['completion_probability'])
+
+    @unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(), 'requires fork')
+    def test_workers_do_not_retrain(self):
+        agent = IntegrationSmartAgent()
+        self.assertFalse(agent.ml_model.is_trained)
+        train = MLPredictor.train
+        with tempfile.TemporaryDirectory() as tmp:
+            log = os.path.join(tmp, 'train.log')
+
+            def logged_train(predictor, data):
+                with open(log, 'a') as f:
+                    f.write(f"{os.getpid()}\n")
+                train(predictor, data)
+
+            portfolio = [make_source(i % 3, ['step3'], {'step3': 2}, {'step1': 3, 'step2': 6}) for i in range(8)]
+            with mock.patch.object(MLPredictor, 'train', logged_train):
+                PortfolioRunner(agent, max_workers=2, chunk_size=2).run_ordered(portfolio)
+            with open(log) as f:
+                self.assertEqual(f.read().split(), [str(os.getpid())])
+
+    def test_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            PortfolioRunner(IntegrationSmartAgent(), chunk_size=0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import copy
+import unittest
+from integration import ComponentRegistry
+from integration.agent import IntegrationSmartAgent
+from test_batch import make_source
+
+class TestComponentRegistry(unittest.TestCase):
+    def test_components_are_shared(self):
+        agent = IntegrationSmartAgent()
+        model = agent.registry.get('statistical_model')
+        self.assertIs(agent.statistical_handler.statistical_model, model)
+        self.assertIs(agent.factor_handler.statistical_model, model)
+        self.assertIs(agent.predictor_handler.predictor.statistical_model, model)
+        self.assertIs(agent.target_handler.target.statistical_model, model)
+        self.assertIs(agent.statistical_handler.predictor, agent.predictor_handler.predictor)
+        self.assertIs(agent.ml_handler.ml_predictor, agent.ml_model)
+
+    def test_ml_training_is_deferred(self):
+        agent = IntegrationSmartAgent()
+        self.assertFalse(agent.ml_model.is_trained)
+        agent.analyze_integration(copy.deepcopy(
+            make_source(1, ['step3'], {'step3': 3}, {'step1': 3, 'step2': 7})
+        ))
+        self.assertTrue(agent.ml_model.is_trained)
+
+    def test_provide_and_register(self):
+        registry = ComponentRegistry()
+        sentinel = object()
+        registry.provide('statistical_model', sentinel)
+        self.assertIs(registry.get('predictor').statistical_model, sentinel)
+        registry.register('custom', lambda r: [r.get('factor_analysis')])
+        self.assertIs(registry.get('custom'), registry.get('custom'))
+        with self.assertRaises(KeyError):
+            registry.get('missing')
+
+if __name__ == '__main__':
+    unittest.main()
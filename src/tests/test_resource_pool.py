@@ -0,0 +1,221 @@
+import pickle
+import random
+import threading
+import time
+import unittest
+from integration.agent import IntegrationSmartAgent, ResourceManager, Resource, ResourcePool, ReservationError
+from test_allocation import random_pool
+
+def brute_best(resources, resource_type, min_skill, min_availability):
+    suitable = [
+        r for r in resources
+        if r.skill_level >= min_skill and r.availability > min_availability
+        and resource_type in ('any', r.type)
+    ]
+    return max(suitable, key=lambda r: (r.skill_level, r.availability, r.id), default=None)
+
+class TestResourcePool(unittest.TestCase):
+    def setUp(self):
+        self.pool = ResourcePool(random_pool(10_000).values())
+
+    def test_queries_match_linear_scan(self):
+        resources = list(self.pool.values())
+        for threshold in (0.0, 0.3, 0.55, 0.99):
+            self.assertEqual(
+                {r.id for r in self.pool.available(threshold)},
+                {r.id for r in resources if r.availability > threshold}
+            )
+            self.assertEqual(
+                {r.id for r in self.pool.below(threshold)},
+                {r.id for r in resources if r.availability < threshold}
+            )
+        for resource_type in ('developer', 'analyst', 'any', 'tester'):
+            for min_skill in (0, 7, 10, 11):
+                self.assertIs(self.pool.best(resource_type, min_skill, 0.3),
+                              brute_best(resources, resource_type, min_skill, 0.3))
+                expected = sorted(
+                    (r for r in resources if r.skill_level >= min_skill and resource_type in ('any', r.type)),
+                    key=lambda r: (r.skill_level, r.availability, r.id), reverse=True
+                )
+                self.assertEqual([r.id for r in self.pool.matching(resource_type, min_skill)],
+                                 [r.id for r in expected])
+
+    def test_availability_change_reindexes(self):
+        rng = random.Random(1)
+        ids = list(self.pool)
+        for _ in range(2000):
+            self.pool[rng.choice(ids)].availability = round(rng.uniform(0, 1), 2)
+        resources = list(self.pool.values())
+        self.assertEqual({r.id for r in self.pool.available(0.3)},
+                         {r.id for r in resources if r.availability > 0.3})
+        self.assertIs(self.pool.best('developer', 7), brute_best(resources, 'developer', 7, 0.3))
+
+    def test_add_and_remove(self):
+        pool = ResourcePool([Resource('A', 'developer', 9, 0.9), Resource('B', 'developer', 7, 0.5)])
+        self.assertEqual(pool.best('developer', 7).id, 'A')
+        removed = pool.remove('A')
+        self.assertEqual(pool.best('developer', 7).id, 'B')
+        self.assertIsNone(pool.best('developer', 8))
+        # Ресурс, удалённый из пула, больше не переиндексирует его
+        removed.availability = 0.0
+        self.assertEqual(len(pool), 1)
+        pool.add(Resource('B', 'developer', 9, 0.4))
+        self.assertEqual([r.skill_level for r in pool.values()], [9])
+        with self.assertRaises(ValueError):
+            ResourcePool([pool['B']])
+
+    def test_best_lookup_is_fast(self):
+        started = time.perf_counter()
+        for _ in range(10_000):
+            self.pool.best('developer', 7, 0.3)
+        # Порог с большим запасом: индекс укладывается в десятки мс, линейный перебор - десятки секунд
+        self.assertLess(time.perf_counter() - started, 5.0)
+
+    def test_compact_resource(self):
+        resource = Resource('R', 'developer', 8, 0.4)
+        self.assertFalse(hasattr(resource, '__dict__'))
+        copy = pickle.loads(pickle.dumps(self.pool['R1']))
+        self.assertEqual(copy, self.pool['R1'])
+        copy.availability = 0.0
+        self.assertNotEqual(copy.availability, self.pool['R1'].availability)
+
+class TestResourceManagerPool(unittest.TestCase):
+    def setUp(self):
+        self.manager = ResourceManager()
+
+    def test_manager_uses_pool(self):
+        self.assertIsInstance(self.manager.resources, ResourcePool)
+        self.assertEqual([r.id for r in self.manager.find_available()], ['R2', 'R1', 'R3'])
+        requirements = self.manager.get_step_requirements('step2')
+        self.assertEqual(self.manager.find_best_resource(None, requirements).id, 'R1')
+        self.manager.resources['R1'].availability = 0.05
+        self.assertEqual(self.manager.identify_bottlenecks(),
+                         ["Critical utilization of developer (ID: R1)"])
+        self.assertNotIn('R1', [r.id for r in self.manager.find_available()])
+
+    def test_recommendations_use_resource_snapshot(self):
+        agent = IntegrationSmartAgent()
+        agent.resource_manager.resources = {
+            'R1': Resource('R1', 'developer', 8, 0.5), 'R2': Resource('R2', 'developer', 9, 0.9)
+        }
+        snapshot = agent.resource_manager.get_current_allocation()
+        # Пул меняется после снимка - рекомендации остаются согласованы с resource_status
+        agent.resource_manager.resources['R1'].availability = 0.0
+        recommendations = agent.generate_recommendations({}, [], snapshot, [{'step': 'step2'}])
+        self.assertIn("Доступны старшие специалисты: R1, R2", recommendations)
+        self.assertIn("Для шага step2 рекомендуются ресурсы: R1, R2", recommendations)
+
+class TestReservations(unittest.TestCase):
+    def setUp(self):
+        self.pool = ResourcePool([Resource('A', 'developer', 9, 1.0), Resource('B', 'analyst', 7, 0.4)])
+
+    def test_reserve_commit_release(self):
+        reservation = self.pool.reserve({'A': 0.5, 'B': 0.25}, owner='INT-1')
+        self.assertAlmostEqual(self.pool['A'].availability, 0.5)
+        self.assertIsNone(self.pool['A'].current_project)
+        self.pool.commit(reservation)
+        self.assertEqual(self.pool['B'].current_project, 'INT-1')
+        self.pool.release(reservation)
+        self.assertEqual((self.pool['A'].availability, self.pool['B'].availability), (1.0, 0.4))
+        self.assertIsNone(self.pool['B'].current_project)
+        with self.assertRaises(ReservationError):
+            self.pool.release(reservation)
+        self.assertEqual(self.pool.reservations(), [])
+
+    def test_reserve_is_all_or_nothing(self):
+        with self.assertRaises(ReservationError):
+            self.pool.reserve({'A': 0.5, 'B': 0.5})
+        self.assertEqual((self.pool['A'].availability, self.pool['B'].availability), (1.0, 0.4))
+        self.assertEqual(self.pool.below(0.3), [])
+
+    def test_version_conflict(self):
+        _, version = self.pool.snapshot('A')
+        self.pool['A'].availability = 0.8
+        with self.assertRaises(ReservationError):
+            self.pool.reserve({'A': 0.5}, versions={'A': version})
+        _, version = self.pool.snapshot('A')
+        self.pool.reserve({'A': 0.5}, versions={'A': version})
+
+    def test_transaction_releases_on_error(self):
+        with self.assertRaises(KeyError):
+            with self.pool.transaction({'A': 0.5}, owner='INT-1'):
+                raise KeyError('step')
+        self.assertEqual(self.pool['A'].availability, 1.0)
+        with self.pool.transaction({'A': 0.5}, owner='INT-1') as reservation:
+            pass
+        self.assertEqual(reservation.state, 'committed')
+        self.assertEqual(self.pool.reserve_best(0.5, 'developer', 8).holds, {'A': 0.5})
+        self.assertIsNone(self.pool.reserve_best(0.5, 'developer', 8))
+
+    def test_concurrent_reservations_lose_no_updates(self):
+        pool = ResourcePool(
+            Resource(f'R{i}', 'developer' if i % 2 else 'analyst', 5 + i % 5, 1.0) for i in range(20)
+        )
+        threads_count, iterations = 8, 2000
+        held = [[] for _ in range(threads_count)]
+        counts = [[0, 0] for _ in range(threads_count)]
+        barrier = threading.Barrier(threads_count)
+
+        def worker(index):
+            rng = random.Random(index)
+            barrier.wait()
+            for _ in range(iterations):
+                if held[index] and rng.random() < 0.45:
+                    pool.release(held[index].pop(rng.randrange(len(held[index]))))
+                    counts[index][1] += 1
+                    continue
+                reservation = pool.reserve_best(0.25, rng.choice(['developer', 'analyst', 'any']),
+                                                rng.randint(5, 9), owner=f'T{index}')
+                if reservation is not None:
+                    pool.commit(reservation)
+                    held[index].append(reservation)
+                    counts[index][0] += 1
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        outstanding = [reservation for reservations in held for reservation in reservations]
+        self.assertEqual(len(outstanding), sum(c[0] - c[1] for c in counts))
+        self.assertEqual(sorted(r.id for r in pool.reservations()), sorted(r.id for r in outstanding))
+        held_by_resource = {resource_id: 0.0 for resource_id in pool}
+        for reservation in outstanding:
+            for resource_id, amount in reservation.holds.items():
+                held_by_resource[resource_id] += amount
+        for resource_id, resource in pool.items():
+            self.assertGreaterEqual(resource.availability, 0.0)
+            self.assertAlmostEqual(resource.availability + held_by_resource[resource_id], 1.0)
+        self.assertEqual({r.id for r in pool.available(0.0)}, {r.id for r in pool.values() if r.availability > 0})
+        self.assertLess(elapsed, 5.0)
+
+    def test_assign_senior_under_contention(self):
+        manager = ResourceManager()
+        barrier = threading.Barrier(16)
+        results = []
+
+        def worker(index):
+            barrier.wait()
+            results.append(manager.assign_senior(list(manager.resources.values()), owner=f'INT-{index}'))
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Единственный старший (R1, доступность 0.7) вмещает только одно назначение 0.5
+        assigned = [reservation for reservation in results if reservation is not None]
+        self.assertEqual(len(assigned), 1)
+        self.assertAlmostEqual(manager.resources['R1'].availability, 0.2)
+        self.assertEqual(manager.assignments, {assigned[0].owner: assigned})
+        # Назначение можно освободить - доля возвращается, резерв не копится в пуле
+        self.assertEqual(manager.release_assignments(assigned[0].owner), 1)
+        self.assertAlmostEqual(manager.resources['R1'].availability, 0.7)
+        self.assertEqual(manager.resources.reservations(), [])
+        self.assertEqual(manager.assignments, {})
+
+if __name__ == '__main__':
+    unittest.main()
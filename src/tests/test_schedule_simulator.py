@@ -0,0 +1,110 @@
+import random
+import time
+import unittest
+from datetime import date
+from integration.agent import ResourceManager, Resource, ScheduleSimulator
+from integration.models import MonteCarloSimulator, StatisticalModel
+from integration.models.statistical import StepHistory
+from integration.registry import ComponentRegistry
+from integration.utils.step_graph import StepGraph
+from test_batch import make_source, DEPENDENCIES
+
+def standard_time_simulator():
+    # Без истории длительность шага - стандартное время, моделирование детерминировано
+    model = StatisticalModel()
+    model.historical_data = StepHistory()
+    return MonteCarloSimulator(model)
+
+def random_dag(rng, size):
+    return {
+        f'step{k}': [f'step{j}' for j in rng.sample(range(max(1, k - 5), k), min(k - 1, rng.randint(1, 2)))]
+        for k in range(1, size + 1)
+    }
+
+class TestScheduleSimulator(unittest.TestCase):
+    def setUp(self):
+        self.manager = ResourceManager()
+
+    def test_uncontended_matches_critical_path(self):
+        self.manager.resources = {
+            f'R{i}': Resource(f'R{i}', kind, 9, 1.0)
+            for i, kind in enumerate(['developer', 'analyst'] * 10)
+        }
+        simulator = ScheduleSimulator(self.manager, standard_time_simulator())
+        schedule = simulator.run([make_source(1, [], {}, {})])
+        self.assertEqual(schedule.completion[0], StepGraph.from_dependencies(DEPENDENCIES).critical_path_time())
+        steps = schedule.steps[0]
+        for step, deps in DEPENDENCIES.items():
+            for dep in deps:
+                self.assertGreaterEqual(steps[step].start, steps[dep].finish)
+
+    def test_shared_resource_serializes_integrations(self):
+        # Один исполнитель на одно назначение - шаги обеих интеграций идут строго друг за другом
+        self.manager.resources = {'R': Resource('R', 'developer', 9, 0.4)}
+        model = StatisticalModel()
+        model.historical_data = StepHistory({'a': [2], 'b': [3], 'c': [4]})
+        simulator = ScheduleSimulator(self.manager, MonteCarloSimulator(model))
+        portfolio = [
+            {'source_id': name, 'current_progress': {'steps_dependencies': {'a': [], 'b': ['a'], 'c': ['a']}}}
+            for name in ('A', 'B')
+        ]
+        schedule = simulator.run(portfolio)
+        self.assertEqual(schedule.makespan, 18.0)
+        self.assertLess(min(schedule.completion.values()), schedule.makespan)
+        self.assertAlmostEqual(schedule.average_utilization('R'), 0.4)
+        self.assertEqual(schedule.utilization_at('R', 5.0), 0.4)
+        self.assertEqual(schedule.completion_dates(date(2024, 1, 1))['B'], date(2024, 1, 19))
+
+    def test_progress_and_utilization_limits(self):
+        rng = random.Random(3)
+        self.manager.resources = {
+            f'R{i}': Resource(f'R{i}', rng.choice(['developer', 'analyst']), rng.randint(5, 10),
+                              round(rng.uniform(0.2, 1.0), 2))
+            for i in range(6)
+        }
+        portfolio = [
+            dict(make_source(1, ['step3', 'step4'], {'step3': 3, 'step4': 1}, {'step1': 3, 'step2': 1}), source_id='X'),
+            dict(make_source(0, ['step2'], {'step2': 30}, {'step1': 4}), source_id='Y'),
+        ]
+        schedule = ScheduleSimulator(self.manager).run(portfolio, seed=7)
+        self.assertNotIn('step1', schedule.steps['X'])
+        # Шаг 2 уже превысил любую историческую длительность - остаток 0
+        self.assertEqual(schedule.steps['Y']['step2'].finish, 0.0)
+        for resource_id, resource in self.manager.resources.items():
+            for _, share in schedule.utilization[resource_id]:
+                self.assertLessEqual(share, resource.availability + 1e-9)
+            self.assertEqual(schedule.utilization_at(resource_id, schedule.makespan + 1), 0.0)
+        self.assertEqual(schedule.completion, ScheduleSimulator(self.manager).run(portfolio, seed=7).completion)
+
+    def test_unstaffable_step(self):
+        self.manager.resources = {'R': Resource('R', 'developer', 9, 1.0)}
+        with self.assertRaises(ValueError):
+            ScheduleSimulator(self.manager).run([make_source(1, [], {}, {})])
+
+    def test_registry_component(self):
+        registry = ComponentRegistry()
+        simulator = registry.get('schedule_simulator')
+        self.assertIs(simulator.resource_manager, registry.get('resource_manager'))
+        self.assertIs(simulator.simulator, registry.get('simulator'))
+
+    def test_large_portfolio(self):
+        rng = random.Random(0)
+        model = StatisticalModel()
+        for k in range(8, 51):
+            model.set_history(f'step{k}', [rng.randint(1, 10) for _ in range(6)])
+        self.manager.resources = {
+            f'R{i}': Resource(f'R{i}', rng.choice(['developer', 'analyst']), rng.randint(3, 10), 1.0)
+            for i in range(500)
+        }
+        portfolio = [
+            {'source_id': f'I{i}', 'current_progress': {'steps_dependencies': random_dag(rng, 50)}}
+            for i in range(1000)
+        ]
+        started = time.perf_counter()
+        schedule = ScheduleSimulator(self.manager, MonteCarloSimulator(model)).run(portfolio, seed=1)
+        self.assertLess(time.perf_counter() - started, 10.0)
+        self.assertEqual(len(schedule.completion), 1000)
+        self.assertEqual(sum(len(steps) for steps in schedule.steps.values()), 50_000)
+
+if __name__ == '__main__':
+    unittest.main()
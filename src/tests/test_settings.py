@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from integration.utils.settings import SettingsStore, get_settings
+from integration.utils.calculations import get_standard_time, load_settings
+
+SETTINGS_TEMPLATE = """
+integration:
+  parallel_risks:
+    safe_threshold: 1.3
+    warning_threshold: 1.6
+  target_days: {target_days}
+  steps:
+    step1: 3
+thresholds:
+  yellow_multiplier: 1.2
+  red_multiplier: 1.5
+factors:
+  weights:
+    data_volume: 0.4
+    api_complexity: 0.4
+    data_quality: 0.2
+probability:
+  trend_weight: 0.3
+  complexity_weight: 0.4
+  correlation_weight: 0.3
+"""
+
+class TestSettings(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'settings.yaml'
+        self.write(30)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, target_days):
+        self.path.write_text(SETTINGS_TEMPLATE.format(target_days=target_days))
+
+    def test_shared_snapshot(self):
+        self.assertIs(get_settings(), get_settings())
+        self.assertEqual(get_standard_time('step2'), 7)
+        self.assertEqual(load_settings()['integration']['steps']['step2'], 7)
+
+    def test_snapshot_is_immutable(self):
+        settings = get_settings()
+        with self.assertRaises(Exception):
+            settings.integration.target_days = 10
+        with self.assertRaises(TypeError):
+            settings.integration.steps['step1'] = 10
+
+    def test_reload_on_file_change(self):
+        store = SettingsStore(self.path, check_interval=0)
+        first = store.get()
+        self.assertIs(store.get(), first)
+        self.write(45)
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(store.get().integration.target_days, 45)
+
+    def test_explicit_reload(self):
+        store = SettingsStore(self.path, check_interval=3600)
+        self.assertEqual(store.get().integration.target_days, 30)
+        self.write(50)
+        self.assertEqual(store.get().integration.target_days, 30)
+        self.assertEqual(store.reload().integration.target_days, 50)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import numpy as np
+from integration.models.statistical import StatisticalModel
+
+class TestStatisticalModel(unittest.TestCase):
+    def setUp(self):
+        self.model = StatisticalModel()
+
+    def test_metrics_match_raw_history(self):
+        data = self.model.historical_data['step2']
+        metrics = self.model.calculate_metrics('step2')
+        self.assertAlmostEqual(metrics['mean'], np.mean(data))
+        self.assertAlmostEqual(metrics['median'], np.median(data))
+        self.assertAlmostEqual(metrics['std'], np.std(data))
+        trends = self.model.analyze_trends('step2')
+        self.assertAlmostEqual(trends['trend_factor'], 1.0)
+        self.assertAlmostEqual(trends['delay_probability'], 2 / 6)
+        self.assertAlmostEqual(self.model.analyze_delay_distribution('step2')['high_delay_prob'], 2 / 6)
+
+    def test_summary_is_cached(self):
+        self.assertIs(self.model.summary('step1'), self.model.summary('step1'))
+
+    def test_history_change_invalidates_only_that_step(self):
+        step1 = self.model.summary('step1')
+        step2 = self.model.summary('step2')
+        self.model.set_history('step2', [10, 10, 10])
+        self.assertIs(self.model.summary('step1'), step1)
+        self.assertIsNot(self.model.summary('step2'), step2)
+        self.assertEqual(self.model.calculate_metrics('step2')['mean'], 10)
+
+    def test_history_is_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.model.historical_data['step1'].append(100)
+
+if __name__ == '__main__':
+    unittest.main()
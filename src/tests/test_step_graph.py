@@ -0,0 +1,53 @@
+import unittest
+from integration.utils.calculations import calculate_critical_path
+from integration.utils.step_graph import StepGraph, CyclicDependencyError
+
+DEPENDENCIES = {
+    'step1': [],
+    'step2': ['step1'],
+    'step3': ['step1'],
+    'step4': ['step2', 'step3'],
+    'step5': ['step4'],
+    'step6': ['step4'],
+    'step7': ['step5', 'step6']
+}
+
+class TestStepGraph(unittest.TestCase):
+    def test_order_and_end_steps(self):
+        graph = StepGraph(DEPENDENCIES)
+        for step, deps in DEPENDENCIES.items():
+            for dep in deps:
+                self.assertLess(graph.index[dep], graph.index[step])
+        self.assertEqual(graph.start_steps, ('step1',))
+        self.assertEqual(graph.end_steps, ('step7',))
+        self.assertEqual(graph.successors['step4'], ('step5', 'step6'))
+
+    def test_critical_path_and_slack(self):
+        graph = StepGraph(DEPENDENCIES)
+        schedule = graph.schedule(graph.durations({'step3': 3, 'step4': 1}))
+        self.assertEqual(schedule.length, 20)
+        self.assertEqual(schedule.critical_path, ('step1', 'step2', 'step4', 'step6', 'step7'))
+        self.assertEqual(schedule.slack['step3'], 4)
+        self.assertEqual(schedule.slack['step5'], 7)
+        self.assertTrue(all(schedule.slack[s] == 0 for s in schedule.critical_path))
+        self.assertEqual(calculate_critical_path(DEPENDENCIES, {'step3': 3, 'step4': 1}), 20)
+
+    def test_cycle_detected(self):
+        with self.assertRaises(CyclicDependencyError):
+            StepGraph({'a': ['b'], 'b': ['a'], 'c': []})
+
+    def test_diamond_chain_is_linear(self):
+        # 100 последовательных "ромбов" - экспоненциально для рекурсивного обхода
+        dependencies = {'n0': []}
+        durations = {'n0': 1}
+        for i in range(1, 101):
+            dependencies[f'a{i}'] = [f'n{i - 1}']
+            dependencies[f'b{i}'] = [f'n{i - 1}']
+            dependencies[f'n{i}'] = [f'a{i}', f'b{i}']
+            durations.update({f'a{i}': 2, f'b{i}': 1, f'n{i}': 1})
+        schedule = StepGraph.from_dependencies(dependencies).schedule(durations)
+        self.assertEqual(schedule.length, 1 + 100 * 3)
+        self.assertEqual(schedule.slack['b50'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
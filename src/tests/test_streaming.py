@@ -0,0 +1,89 @@
+import random
+import unittest
+import numpy as np
+from integration.models.statistical import StatisticalModel
+from integration.models.streaming import QuantileSketch, RunningStats, StepStream
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.values = [rng.lognormvariate(2, 0.4) for _ in range(5000)]
+
+    def test_running_stats_merge(self):
+        left, right = RunningStats(), RunningStats()
+        for value in self.values[:1234]:
+            left.add(value)
+        for value in self.values[1234:]:
+            right.add(value)
+        merged = left.merge(right)
+        self.assertEqual(merged.count, len(self.values))
+        self.assertAlmostEqual(merged.mean, np.mean(self.values))
+        self.assertAlmostEqual(merged.std, np.std(self.values))
+
+    def test_sketch_quantiles_within_accuracy(self):
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in self.values:
+            sketch.add(value)
+        for q in (0.5, 0.9):
+            expected = np.quantile(self.values, q)
+            self.assertLess(abs(sketch.quantile(q) - expected) / expected, 0.03)
+
+    def test_sketch_memory_is_bounded(self):
+        sketch = QuantileSketch(max_buckets=64)
+        for value in self.values:
+            sketch.add(value)
+        self.assertLessEqual(len(sketch.buckets), 64)
+
+    def test_stream_merge_matches_single_stream(self):
+        single = StepStream(self.values, exact_limit=100)
+        left = StepStream(self.values[:2000], exact_limit=100)
+        right = StepStream(self.values[2000:], exact_limit=100)
+        merged = left.merge(right)
+        self.assertFalse(merged.is_exact)
+        self.assertAlmostEqual(merged.stats.mean, single.stats.mean)
+        self.assertEqual(merged.sketch.buckets, single.sketch.buckets)
+        self.assertEqual(list(merged.recent), list(single.recent))
+
+    def test_add_observation(self):
+        model = StatisticalModel()
+        base = model.calculate_metrics('step2')
+        model.add_observation('step2', 14)
+        data = list(model.historical_data['step2']) + [14]
+        metrics = model.calculate_metrics('step2')
+        self.assertNotEqual(metrics['mean'], base['mean'])
+        self.assertAlmostEqual(metrics['mean'], np.mean(data))
+        self.assertAlmostEqual(metrics['median'], np.median(data))
+
+    def test_history_mutations_reset_summaries(self):
+        model = StatisticalModel()
+        history = model.historical_data
+        model.add_observation('step2', 14)
+        model.summary('step2')
+        revision = history.revision
+        history.pop('step2')
+        self.assertNotIn('step2', history.summaries)
+        self.assertNotIn('step2', history.streams)
+        self.assertIsNone(history.pop('step2', None))
+        history.setdefault('step2', [1, 2])
+        self.assertEqual(model.calculate_metrics('step2')['mean'], 1.5)
+        self.assertEqual(history.setdefault('step2', [9]), (1, 2))
+        step, _ = history.popitem()
+        self.assertNotIn(step, history.summaries)
+        history.clear()
+        self.assertEqual((history.summaries, history.streams), ({}, {}))
+        self.assertEqual(history.revision, revision + 4)
+
+    def test_add_observation_beyond_exact_limit(self):
+        model = StatisticalModel()
+        for value in self.values:
+            model.add_observation('step3', value)
+        stream = model.stream('step3')
+        self.assertFalse(stream.is_exact)
+        data = list(model.historical_data['step3']) + self.values
+        summary = model.summary('step3')
+        self.assertEqual(summary.count, len(data))
+        self.assertAlmostEqual(summary.mean, np.mean(data))
+        self.assertLess(abs(summary.quantiles[0.9] - np.quantile(data, 0.9)) / np.quantile(data, 0.9), 0.03)
+
+if __name__ == '__main__':
+    unittest.main()